@@ -1,124 +1,51 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fetch_current_polymarket import fetch_polymarket_data_struct
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fetch_current_polymarket import fetch_polymarket_data_struct_async, get_market_tokens_async, run_market_prefetch
+from market_schedule import SCHEDULE
+from async_fetch import create_client, gather_results
+from fetch_current_kalshi import get_binance_hour_open_async
+from streaming import BookStore, PolymarketMarketFeed, build_polymarket_data
 import asyncio
-import datetime
-import numpy as np
+import os
+import time
+from strategy import StrategySimulator
+from sim_manager import SimulatorManager, DEFAULT_SWEEP, market_views
+from recorder import TickRecorder, RECORD_DIR
+from ttl_cache import cache_stats
+from metrics import span, timed, render_prometheus
+from scheduler import AdaptiveCadence
+from venue_client import bucket_for
+from fetch_current_polymarket import CLOB_BOOKS_URL
+from broadcast import Broadcaster
+from snapshot import SnapshotCell, BOOT_ID
+from shared_state import SharedState, SharedSnapshotCell
+from decoders import dumps, loads
 
 # --- GLOBAL MEMORY ---
 DAILY_BANKED_PROFIT = 0.0
 
-class StrategySimulator:
-    def __init__(self):
-        # Portfolio State
-        self.qty_yes = 0
-        self.qty_no = 0
-        self.total_cost_yes = 0.0
-        self.total_cost_no = 0.0
-        
-        self.buy_size = 0.05 
-        self.safety_margin = 0.99 
-        self.window_size = 10 
-        self.min_price_threshold = 0.05  
-        
-        self.price_history_yes = []
-        self.price_history_no = []
-        self.history = []
-
-    @property
-    def avg_cost_yes(self):
-        return (self.total_cost_yes / self.qty_yes) if self.qty_yes > 0 else 0.0
-
-    @property
-    def avg_cost_no(self):
-        return (self.total_cost_no / self.qty_no) if self.qty_no > 0 else 0.0
-
-    @property
-    def pair_cost(self):
-        return self.avg_cost_yes + self.avg_cost_no
-
-    @property
-    def locked_profit(self):
-        matched_pairs = min(self.qty_yes, self.qty_no)
-        if matched_pairs == 0: return 0.0
-        cost_of_pairs = matched_pairs * self.pair_cost
-        return matched_pairs - cost_of_pairs
-
-    def tick(self, market_data):
-        if not market_data or 'prices' not in market_data:
-            return "No Data"
-
-        price_yes = market_data['prices'].get('Up')
-        price_no = market_data['prices'].get('Down')
-        
-        if price_yes is None or price_no is None:  
-            return "No liquidity"
+# Set USE_STREAMING=1 to drive the simulator from the Polymarket WebSocket feed
+USE_STREAMING = os.environ.get("USE_STREAMING") == "1"
+ROLLOVER_CHECK_INTERVAL = 1.0
+# A missing Binance hour open (price to beat) is fetched again this often
+OPEN_RETRY_INTERVAL = 5.0
 
-        # Update Price History
-        self.price_history_yes.append(price_yes)
-        self.price_history_no.append(price_no)
-        if len(self.price_history_yes) > self.window_size:
-            self.price_history_yes.pop(0)
-            self.price_history_no.pop(0)
+# Polling mode: one fetch every POLL_MIN_INTERVAL to POLL_MAX_INTERVAL seconds,
+# faster near the end of the hour and when prices move (see AdaptiveCadence).
+# A fetch still running after POLL_TIMEOUT is abandoned and the next tick
+# starts a fresh one
+POLL_MIN_INTERVAL = 0.5
+POLL_MAX_INTERVAL = 2.0
+POLL_TIMEOUT = 5.0
 
-        action = "Hold"
-        
-        # 1. Identify "Cheapness"
-        avg_recent_yes = np.mean(self.price_history_yes)
-        avg_recent_no = np.mean(self.price_history_no)
-        
-        is_cheap_yes = price_yes < (avg_recent_yes - 0.005) 
-        is_cheap_no = price_no < (avg_recent_no - 0.005)
-        
-        if price_yes < self.min_price_threshold: is_cheap_yes = False
-        if price_no < self.min_price_threshold: is_cheap_no = False
-        
-        # 2. Check Pair Cost Impact
-        if is_cheap_yes:
-            cost = price_yes * self.buy_size
-            potential_pair_cost = ((self.total_cost_yes + cost)/(self.qty_yes + self.buy_size)) + self.avg_cost_no if self.qty_no > 0 else 0
-            
-            if self.qty_no == 0 or potential_pair_cost < self.safety_margin:
-                self._execute_trade("YES", price_yes)
-                action = f"Bought YES @ {price_yes:.3f}"
-
-        elif is_cheap_no:
-            cost = price_no * self.buy_size
-            potential_pair_cost = self.avg_cost_yes + ((self.total_cost_no + cost)/(self.qty_no + self.buy_size)) if self.qty_yes > 0 else 0
-            
-            if self.qty_yes == 0 or potential_pair_cost < self.safety_margin:
-                self._execute_trade("NO", price_no)
-                action = f"Bought NO @ {price_no:.3f}"
-        
-        return action
-
-    def _execute_trade(self, side, price):
-        cost = price * self.buy_size
-        
-        if side == "YES":
-            self.qty_yes += self.buy_size
-            self.total_cost_yes += cost
-        else:
-            self.qty_no += self.buy_size
-            self.total_cost_no += cost
-            
-        self.history.append({
-            "timestamp": datetime.datetime.now().strftime("%H:%M:%S"),
-            "side": side,
-            "price": price,
-            "size": self.buy_size
-        })
-
-    def get_state(self):
-        return {
-            "qty_yes": self.qty_yes,
-            "qty_no": self.qty_no,
-            "avg_cost_yes": self.avg_cost_yes,
-            "avg_cost_no": self.avg_cost_no,
-            "pair_cost": self.pair_cost,
-            "locked_profit": self.locked_profit, 
-            "history": self.history[-10:]
-        }
+# Multi-worker deployment (serve.py): one "ingest" process runs the loop and
+# writes published state into the SHARED_STATE segment; "reader" workers serve
+# it without polling any venue. "standalone" is the single-process server.
+API_ROLE = os.environ.get("API_ROLE", "standalone")
+SHARED_STATE = os.environ.get("SHARED_STATE")
+SHARED_POLL_INTERVAL = 0.05   # How often readers check the dashboard slot / ingest checks for resets
+SHARED_STATS_INTERVAL = 5.0   # How often ingest publishes /metrics and /cache
 
 # --- FASTAPI APP ---
 app = FastAPI()
@@ -135,48 +62,325 @@ sim = StrategySimulator()
 latest_market_data = None
 last_action = "Waiting for market..."
 
-async def run_simulation_loop():
-    global latest_market_data, last_action, sim, DAILY_BANKED_PROFIT
-    while True:
-        try:
-            data, err = fetch_polymarket_data_struct()
-            if data:
-                if latest_market_data and data['slug'] != latest_market_data['slug']:
-                    print(f"Market Rollover detected. New market: {data['slug']}.")
-                    DAILY_BANKED_PROFIT += sim.locked_profit
-                    sim = StrategySimulator()
-                    
-                latest_market_data = data
-                action = sim.tick(data)
-                last_action = action
-            else:
-                print(f"Fetch error: {err}")
-        except Exception as e:
-            print(f"Loop error: {e}")
-        await asyncio.sleep(2)
+# Parameter variants ticked on the same market data as `sim`
+manager = SimulatorManager()
+manager.add_sweep(**DEFAULT_SWEEP)
 
-@app.on_event("startup")
-async def startup_event():
-    asyncio.create_task(run_simulation_loop())
+# Every snapshot is recorded when RECORD_DIR is set (by whichever process runs the loop)
+recorder = TickRecorder(RECORD_DIR) if RECORD_DIR and API_ROLE != "reader" else None
 
-@app.get("/simulation")
-def get_simulation_state():
+# Read endpoints serve the last published snapshot; only the loop writes state
+simulation_snapshot = SnapshotCell()
+simulations_snapshot = SnapshotCell()
+
+# Dashboard updates pushed over /stream
+dashboard = Broadcaster()
+published_fills = 0
+
+# Set in the ingest and reader processes of a multi-worker deployment
+shared_state = None
+dashboard_snapshot = SnapshotCell()
+
+def dashboard_state():
+    """
+    What the dashboard shows: the /simulation payload without the fill history
+    (streamed as events) or the fields that change on every fetch.
+    """
+    portfolio = sim.get_state()
+    portfolio.pop('history')
+    portfolio['locked_profit'] += DAILY_BANKED_PROFIT
+    market = None
+    if latest_market_data:
+        market = {"slug": latest_market_data['slug'], "prices": latest_market_data['prices']}
+    return {"market": market, "portfolio": portfolio, "last_action": last_action}
+
+def simulation_state():
     state = sim.get_state()
-    current_run_profit = state['locked_profit']
-    state['locked_profit'] = DAILY_BANKED_PROFIT + current_run_profit
-    
+    state['locked_profit'] += DAILY_BANKED_PROFIT
     return {
-        "timestamp": datetime.datetime.now().isoformat(),
         "market": latest_market_data,
         "portfolio": state,
         "last_action": last_action
     }
 
-@app.post("/reset")
-def reset_simulation():
+def publish_state():
+    """
+    Called by the loop once per tick (and after a reset) with the state settled:
+    swaps in new read snapshots and pushes the dashboard delta.
+    """
+    simulation_snapshot.publish(simulation_state(), stamp_key="timestamp")
+    simulations_snapshot.publish({"simulations": manager.summaries()}, stamp_key="timestamp")
+    publish_dashboard()
+    if shared_state:
+        publish_shared()
+
+def publish_shared():
+    """
+    Copies the snapshots that changed into shared memory for the reader workers.
+    """
+    for slot, cell in (("simulation", simulation_snapshot), ("simulations", simulations_snapshot)):
+        snapshot = cell.current
+        if shared_state.version(slot) != snapshot.version:
+            shared_state.write(slot, snapshot.version, snapshot.body)
+    # Readers rebuild the SSE stream from the dashboard state plus recent fills
+    snapshot = dashboard_snapshot.publish({
+        "state": dashboard_state(),
+        "fills": sim.history[-dashboard.recent.maxlen:],
+        "fills_total": sim.fills,
+    })
+    if shared_state.version("dashboard") != snapshot.version:
+        shared_state.write("dashboard", snapshot.version, snapshot.body)
+
+def publish_dashboard():
+    global published_fills
+    if sim.fills < published_fills:
+        # New simulator (rollover or reset): clients start over from a snapshot
+        dashboard.publish(dashboard_state(), sim.history[-dashboard.recent.maxlen:], snapshot=True)
+    else:
+        dashboard.publish(dashboard_state(), sim.history[published_fills:])
+    published_fills = sim.fills
+
+@timed("process_tick")
+async def process_market_data(data):
+    global latest_market_data, last_action, sim, DAILY_BANKED_PROFIT
+    if latest_market_data and data['slug'] != latest_market_data['slug']:
+        print(f"Market Rollover detected. New market: {data['slug']}.")
+        DAILY_BANKED_PROFIT += sim.locked_profit
+        sim = StrategySimulator()
+        
+    latest_market_data = data
+    if recorder:
+        recorder.record_polymarket(data)
+    with span("strategy_tick"):
+        action = sim.tick(data)
+    last_action = action
+    with span("sim_manager_tick"):
+        await manager.tick(market_views(poly_data=data))
+    publish_state()
+
+async def fetch_market_data(client):
+    """
+    Polymarket prices plus the hour's price to beat (the Binance hour open,
+    cached once found), so recorded hours can be settled. A missing open is
+    logged and left as None.
+    """
+    target_time = SCHEDULE.current().target_time_utc
+    try:
+        (data, err), (price_to_beat, open_err) = await asyncio.wait_for(gather_results(
+            fetch_polymarket_data_struct_async(client),
+            get_binance_hour_open_async(client, target_time)
+        ), POLL_TIMEOUT)
+    except asyncio.TimeoutError:
+        return None, f"Fetch timed out after {POLL_TIMEOUT:.0f}s"
+    if data:
+        data['price_to_beat'] = price_to_beat
+        if open_err:
+            print(f"Price to beat error: {open_err}")
+    return data, err
+
+async def run_simulation_loop():
+    """
+    Polls Polymarket on an adaptive cadence. The fetch is async I/O on the
+    shared client, so however slow a venue is the event loop keeps serving the
+    API; the compute step (process_market_data) only runs once the data is in.
+    A failed fetch is retried without waiting out the interval.
+    """
+    cadence = AdaptiveCadence(POLL_MIN_INTERVAL, POLL_MAX_INTERVAL, budgets=[(bucket_for(CLOB_BOOKS_URL), 1)],
+                              name="sim_loop")
+    async with create_client() as client:
+        while True:
+            data, err = await fetch_market_data(client)
+            try:
+                if data:
+                    cadence.observe(data['prices'].get('Up'))
+                    await process_market_data(data)
+                else:
+                    print(f"Fetch error: {err}")
+            except Exception as e:
+                print(f"Loop error: {e}")
+            await cadence.wait(SCHEDULE.seconds_to_rollover(), retry=data is None)
+
+async def run_streaming_loop():
+    """
+    Ticks the simulator on every book change from the Polymarket market channel.
+    The feed is restarted with the new token ids when the hourly market rolls over.
+    """
+    async with create_client() as client:
+        while True:
+            market = SCHEDULE.current()
+            outcome_tokens, err = await get_market_tokens_async(client, market)
+            if err:
+                print(f"Fetch error: {err}")
+                await asyncio.sleep(ROLLOVER_CHECK_INTERVAL)
+                continue
+
+            store = BookStore()
+            listener = store.subscribe()
+            feed = PolymarketMarketFeed(store, outcome_tokens.values())
+            tasks = [asyncio.create_task(feed.run()), asyncio.create_task(run_market_prefetch(client))]
+            price_to_beat = None
+            retry_open_at = 0.0
+            try:
+                while SCHEDULE.current() is market:
+                    try:
+                        await asyncio.wait_for(listener.wait(), timeout=ROLLOVER_CHECK_INTERVAL)
+                    except asyncio.TimeoutError:
+                        continue
+                    if not all(store.book(t).synced for t in outcome_tokens.values()):
+                        continue
+                    try:
+                        if price_to_beat is None and time.monotonic() >= retry_open_at:
+                            price_to_beat, open_err = await get_binance_hour_open_async(client, market.target_time_utc)
+                            if price_to_beat is None:
+                                print(f"Price to beat error: {open_err}")
+                                retry_open_at = time.monotonic() + OPEN_RETRY_INTERVAL
+                        await process_market_data(build_polymarket_data(store, market.poly_slug, outcome_tokens,
+                                                                        price_to_beat))
+                    except Exception as e:
+                        print(f"Loop error: {e}")
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+def run_loop():
+    if USE_STREAMING:
+        return asyncio.create_task(run_streaming_loop())
+    return asyncio.create_task(run_simulation_loop())
+
+# --- MULTI-WORKER (see serve.py) ---
+
+async def follow_shared_dashboard():
+    """
+    Reader side of /stream: replays the ingest process's dashboard slot into
+    this worker's Broadcaster, as a snapshot after a reset or rollover and as
+    deltas with the new fills otherwise. Event ids are the slot version, which
+    every worker sees alike, so a client can resume on any worker; one whose
+    id this worker skipped gets a snapshot.
+    """
+    version, fills_total = 0, None
+    while True:
+        if shared_state.version("dashboard") != version:
+            last_version = version
+            version, body = shared_state.read("dashboard")
+            update = loads(body)
+            if fills_total is None or update["fills_total"] < fills_total or version < last_version:
+                dashboard.publish(update["state"], update["fills"], snapshot=True, seq=version)
+            else:
+                new = update["fills_total"] - fills_total
+                dashboard.publish(update["state"], update["fills"][-new:] if new else (), seq=version)
+            fills_total = update["fills_total"]
+        await asyncio.sleep(SHARED_POLL_INTERVAL)
+
+async def watch_reset_requests():
+    handled = shared_state.reset_requests()
+    while True:
+        requested = shared_state.reset_requests()
+        if requested != handled:
+            handled = requested
+            reset_simulation_state()
+        await asyncio.sleep(SHARED_POLL_INTERVAL)
+
+async def publish_shared_stats():
+    while True:
+        shared_state.write("metrics", 0, render_prometheus().encode())
+        shared_state.write("cache", 0, dumps(cache_stats()))
+        await asyncio.sleep(SHARED_STATS_INTERVAL)
+
+async def run_ingest(state_name):
+    """
+    The single writer of a multi-worker deployment: runs the simulation loop
+    and publishes into the shared segment. No HTTP server of its own.
+    """
+    global shared_state
+    shared_state = SharedState.attach(state_name)
+    shared_state.set_boot_id(BOOT_ID)
+    publish_state()
+    tasks = [run_loop(), asyncio.create_task(watch_reset_requests()),
+             asyncio.create_task(publish_shared_stats())]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if recorder:
+            recorder.close()
+
+@app.on_event("startup")
+async def startup_event():
+    global shared_state, simulation_snapshot, simulations_snapshot
+    if API_ROLE == "reader":
+        shared_state = SharedState.attach(SHARED_STATE)
+        simulation_snapshot = SharedSnapshotCell(shared_state, "simulation")
+        simulations_snapshot = SharedSnapshotCell(shared_state, "simulations")
+        asyncio.create_task(follow_shared_dashboard())
+        return
+    publish_state()
+    run_loop()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    if recorder:
+        recorder.close()
+
+def snapshot_response(cell, request):
+    """
+    Serves a SnapshotCell's current bytes, or 304 when the client's ETag is current.
+    """
+    snapshot = cell.current
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if snapshot.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
+
+@app.get("/simulation")
+async def get_simulation_state(request: Request):
+    # "timestamp" is when the state last changed
+    return snapshot_response(simulation_snapshot, request)
+
+@app.get("/stream")
+async def stream_simulation(request: Request):
+    """
+    Server-Sent Events: a snapshot, then a delta (changed fields and new fills)
+    whenever the simulation state changes. Browsers resume with Last-Event-ID.
+    """
+    last_id = request.headers.get("last-event-id", "")
+    return StreamingResponse(
+        dashboard.frames(int(last_id) if last_id.isdigit() else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/simulations")
+async def get_simulation_variants(request: Request):
+    return snapshot_response(simulations_snapshot, request)
+
+@app.get("/cache")
+def get_cache_stats():
+    if API_ROLE == "reader":
+        # The ingest process's caches, as of its last stats publish
+        return Response(shared_state.read("cache")[1] or b"{}", media_type="application/json")
+    return cache_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    # Prometheus text format; see metrics.render_prometheus
+    body = shared_state.read("metrics")[1] if API_ROLE == "reader" else render_prometheus()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+def reset_simulation_state():
     global sim, DAILY_BANKED_PROFIT
     DAILY_BANKED_PROFIT += sim.locked_profit
     sim = StrategySimulator()
+    publish_state()
+
+@app.post("/reset")
+async def reset_simulation():
+    # async so the dashboard broadcast happens on the event loop
+    if API_ROLE == "reader":
+        # Carried out by the ingest process; readers see it on its next publish
+        shared_state.request_reset()
+    else:
+        reset_simulation_state()
     return {"message": "Simulation reset"}
 
 if __name__ == "__main__":
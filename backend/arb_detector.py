@@ -0,0 +1,170 @@
+import time
+from bisect import bisect_left, insort
+import numpy as np
+from arb_scanner import POLY_DOWN_KALSHI_YES, POLY_UP_KALSHI_NO, PAIR_DTYPE
+
+OPEN = "open"
+CLOSE = "close"
+
+# Prices are kept as integer mils ($0.001): Polymarket quotes in mils and Kalshi
+# in cents, so pair costs are exact and ties at $1.00 are never float noise.
+MILS = 1000
+
+def to_mils(price):
+    return int(round(price * MILS)) if price else 0
+
+class ArbEvent:
+    __slots__ = ("kind", "ts", "strategy", "strike", "poly_strike", "poly_cost", "kalshi_cost", "margin", "opened_at")
+
+    def __init__(self, kind, ts, strategy, strike, poly_strike, poly_mils, kalshi_mils, opened_at):
+        self.kind = kind
+        self.ts = ts
+        self.strategy = strategy
+        self.strike = strike
+        self.poly_strike = poly_strike
+        self.poly_cost = poly_mils / MILS
+        self.kalshi_cost = kalshi_mils / MILS
+        self.margin = (MILS - poly_mils - kalshi_mils) / MILS
+        self.opened_at = opened_at
+
+class ArbDetector:
+    """
+    Keeps the set of open Poly/Kalshi pairs up to date from single-input updates
+    instead of rescanning every pair.
+
+    Pairs on each side are kept as a sorted list of (kalshi_ask, strike):
+    Down+YES for strikes <= price_to_beat and Up+NO for strikes >= it. A pair is
+    open while kalshi_ask < threshold = $1 - min_margin - poly_ask, so a Poly
+    update only touches the pairs whose ask lies between the old and new
+    threshold (two bisects), and a Kalshi update only re-checks that strike.
+
+    Every update returns the ArbEvents it caused: OPEN when a pair starts
+    costing less than $1 - min_margin and CLOSE when it stops.
+    """
+    def __init__(self, min_margin=0.0, clock=time.time):
+        self.min_margin_mils = min_margin * MILS
+        self.clock = clock
+        self.market = None      # Identifies the market pair, e.g. the Poly slug
+        self.poly_strike = None
+        self.poly = {POLY_DOWN_KALSHI_YES: 0, POLY_UP_KALSHI_NO: 0}
+        self.sides = {POLY_DOWN_KALSHI_YES: [], POLY_UP_KALSHI_NO: []}
+        self.kalshi = {}        # strike -> (yes_mils, no_mils)
+        self.open = {}          # (strategy, strike) -> opened_at
+
+    # --- UPDATES ---
+
+    def reset(self, poly_strike, poly_up, poly_down, kalshi_quotes=(), market=None):
+        """
+        Starts a new market pair. kalshi_quotes are (strike, yes_ask, no_ask) in dollars.
+        Every opportunity still open is closed first.
+        """
+        now = self.clock()
+        events = [self._event(CLOSE, now, strategy, strike) for strategy, strike in list(self.open)]
+        self.open.clear()
+        self.market = market
+        self.poly_strike = poly_strike
+        self.poly = {POLY_DOWN_KALSHI_YES: to_mils(poly_down), POLY_UP_KALSHI_NO: to_mils(poly_up)}
+        self.sides = {POLY_DOWN_KALSHI_YES: [], POLY_UP_KALSHI_NO: []}
+        self.kalshi = {}
+        for strike, yes_ask, no_ask in kalshi_quotes:
+            events += self.update_kalshi(strike, yes_ask, no_ask, now)
+        return events
+
+    def update_poly(self, up=None, down=None):
+        """
+        New Polymarket Up and/or Down asks in dollars (0 for no ask, None to
+        leave that side unchanged).
+        """
+        now = self.clock()
+        events = []
+        for strategy, price in ((POLY_UP_KALSHI_NO, up), (POLY_DOWN_KALSHI_YES, down)):
+            if price is None:
+                continue
+            old = self._threshold(strategy)
+            self.poly[strategy] = to_mils(price)
+            new = self._threshold(strategy)
+            if new == old:
+                continue
+            side = self.sides[strategy]
+            lo, hi = sorted((old, new))
+            kind = OPEN if new > old else CLOSE
+            for _, strike in side[bisect_left(side, (lo,)):bisect_left(side, (hi,))]:
+                events.append(self._set(strategy, strike, kind == OPEN, now))
+        return [e for e in events if e]
+
+    def update_kalshi(self, strike, yes_ask, no_ask, now=None):
+        """
+        New quotes for one Kalshi strike, in dollars (0 for no ask).
+        """
+        now = self.clock() if now is None else now
+        old_yes, old_no = self.kalshi.get(strike, (0, 0))
+        yes, no = to_mils(yes_ask), to_mils(no_ask)
+        if (yes, no) == (old_yes, old_no) and strike in self.kalshi:
+            return []
+        self.kalshi[strike] = (yes, no)
+        events = []
+        for strategy, old, new, qualifies in (
+            (POLY_DOWN_KALSHI_YES, old_yes, yes, self.poly_strike is not None and strike <= self.poly_strike),
+            (POLY_UP_KALSHI_NO, old_no, no, self.poly_strike is not None and strike >= self.poly_strike),
+        ):
+            if not qualifies:
+                continue
+            side = self.sides[strategy]
+            if old > 0:
+                i = bisect_left(side, (old, strike))
+                if i < len(side) and side[i] == (old, strike):
+                    del side[i]
+            if new > 0:
+                insort(side, (new, strike))
+            events.append(self._set(strategy, strike, 0 < new < self._threshold(strategy), now))
+        return [e for e in events if e]
+
+    def update_markets(self, markets):
+        """
+        Applies a KalshiMarket list (cents), re-checking only the strikes whose quotes moved.
+        """
+        now = self.clock()
+        events = []
+        for m in markets:
+            events += self.update_kalshi(m.strike, m.yes_ask / 100.0, m.no_ask / 100.0, now)
+        return events
+
+    # --- STATE ---
+
+    def _threshold(self, strategy):
+        poly = self.poly[strategy]
+        if poly <= 0:
+            return float("-inf")  # No Poly ask, nothing on this side can fill
+        return MILS - self.min_margin_mils - poly
+
+    def _set(self, strategy, strike, is_open, now):
+        key = (strategy, strike)
+        if is_open == (key in self.open):
+            return None
+        if is_open:
+            self.open[key] = now
+            return self._event(OPEN, now, strategy, strike)
+        event = self._event(CLOSE, now, strategy, strike)
+        del self.open[key]
+        return event
+
+    def _kalshi_mils(self, strategy, strike):
+        yes, no = self.kalshi.get(strike, (0, 0))
+        return yes if strategy == POLY_DOWN_KALSHI_YES else no
+
+    def _event(self, kind, now, strategy, strike):
+        return ArbEvent(kind, now, strategy, strike, self.poly_strike, self.poly[strategy],
+                        self._kalshi_mils(strategy, strike), self.open.get((strategy, strike), now))
+
+    def opportunities(self):
+        """
+        The open pairs as a PAIR_DTYPE array, best margin first (same layout as
+        arb_scanner.find_opportunities).
+        """
+        pairs = np.empty(len(self.open), dtype=PAIR_DTYPE)
+        for i, (strategy, strike) in enumerate(self.open):
+            poly = self.poly[strategy]
+            kalshi = self._kalshi_mils(strategy, strike)
+            pairs[i] = (0, strike, self.poly_strike, strategy, poly / MILS, kalshi / MILS,
+                        (poly + kalshi) / MILS, (MILS - poly - kalshi) / MILS)
+        return pairs[np.argsort(-pairs["margin"], kind="stable")]
@@ -0,0 +1,104 @@
+import numpy as np
+
+# Pair types
+POLY_DOWN_KALSHI_YES = 0   # Poly Strike >= Kalshi Strike
+POLY_UP_KALSHI_NO = 1      # Poly Strike <= Kalshi Strike
+
+STRATEGY_NAMES = {
+    POLY_DOWN_KALSHI_YES: "Buy Poly DOWN + Kalshi YES",
+    POLY_UP_KALSHI_NO: "Buy Poly UP + Kalshi NO",
+}
+
+PAIR_DTYPE = np.dtype([
+    ("event", "i4"),
+    ("strike", "f8"),
+    ("poly_strike", "f8"),
+    ("strategy", "i1"),
+    ("poly_cost", "f8"),
+    ("kalshi_cost", "f8"),
+    ("total_cost", "f8"),
+    ("margin", "f8"),
+])
+
+class KalshiLadder:
+    """
+    One Kalshi event's strikes and quotes as parallel NumPy arrays, in dollars.
+    """
+    def __init__(self, strikes, yes_ask, no_ask, yes_bid=None, no_bid=None):
+        self.strikes = np.asarray(strikes, dtype=np.float64)
+        self.yes_ask = np.asarray(yes_ask, dtype=np.float64)
+        self.no_ask = np.asarray(no_ask, dtype=np.float64)
+        self.yes_bid = np.asarray(yes_bid if yes_bid is not None else np.zeros(len(self.strikes)), dtype=np.float64)
+        self.no_bid = np.asarray(no_bid if no_bid is not None else np.zeros(len(self.strikes)), dtype=np.float64)
+
+    @classmethod
+    def from_markets(cls, markets):
+        """
+        Builds a ladder from fetch_kalshi_data_struct()['markets'] (prices in cents).
+        """
+        n = len(markets)
+        quotes = np.empty((5, n), dtype=np.float64)
+        for i, m in enumerate(markets):
+            quotes[0, i] = m.strike
+            quotes[1, i] = m.yes_ask
+            quotes[2, i] = m.no_ask
+            quotes[3, i] = m.yes_bid
+            quotes[4, i] = m.no_bid
+        quotes[1:] /= 100.0
+        return cls(quotes[0], quotes[1], quotes[2], quotes[3], quotes[4])
+
+    def __len__(self):
+        return len(self.strikes)
+
+def scan_events(events):
+    """
+    Prices every Poly-Down+Kalshi-Yes and Poly-Up+Kalshi-No pair for many events
+    in one batched pass.
+
+    `events` is a list of (poly_strike, poly_up, poly_down, ladder) tuples; the
+    position in the list is the `event` field of the result. Returns a PAIR_DTYPE
+    array of every checked pair, sorted by margin (best first). A leg priced at 0
+    means there is no ask, so those pairs are left out.
+    """
+    if not events:
+        return np.empty(0, dtype=PAIR_DTYPE)
+
+    sizes = np.array([len(e[3]) for e in events])
+    strikes = np.concatenate([e[3].strikes for e in events])
+    yes_ask = np.concatenate([e[3].yes_ask for e in events])
+    no_ask = np.concatenate([e[3].no_ask for e in events])
+    event_ids = np.repeat(np.arange(len(events), dtype=np.int32), sizes)
+    poly_strike = np.repeat(np.array([e[0] for e in events], dtype=np.float64), sizes)
+    poly_up = np.repeat(np.array([e[1] for e in events], dtype=np.float64), sizes)
+    poly_down = np.repeat(np.array([e[2] for e in events], dtype=np.float64), sizes)
+
+    # Equal strikes qualify for both pairs
+    down_yes = (poly_strike >= strikes) & (poly_down > 0) & (yes_ask > 0)
+    up_no = (poly_strike <= strikes) & (poly_up > 0) & (no_ask > 0)
+
+    n_dy = np.count_nonzero(down_yes)
+    pairs = np.empty(n_dy + np.count_nonzero(up_no), dtype=PAIR_DTYPE)
+    for sl, mask, strategy, poly_cost, kalshi_cost in (
+        (slice(0, n_dy), down_yes, POLY_DOWN_KALSHI_YES, poly_down, yes_ask),
+        (slice(n_dy, None), up_no, POLY_UP_KALSHI_NO, poly_up, no_ask),
+    ):
+        out = pairs[sl]
+        out["event"] = event_ids[mask]
+        out["strike"] = strikes[mask]
+        out["poly_strike"] = poly_strike[mask]
+        out["strategy"] = strategy
+        out["poly_cost"] = poly_cost[mask]
+        out["kalshi_cost"] = kalshi_cost[mask]
+
+    pairs["total_cost"] = pairs["poly_cost"] + pairs["kalshi_cost"]
+    pairs["margin"] = 1.0 - pairs["total_cost"]
+    return pairs[np.argsort(-pairs["margin"], kind="stable")]
+
+def scan_pairs(poly_strike, poly_up, poly_down, ladder):
+    return scan_events([(poly_strike, poly_up, poly_down, ladder)])
+
+def find_opportunities(pairs, min_margin=0.0):
+    """
+    Keeps the pairs whose combined cost is under $1 by more than min_margin.
+    """
+    return pairs[pairs["margin"] > min_margin]
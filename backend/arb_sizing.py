@@ -0,0 +1,90 @@
+import numpy as np
+from order_book import BID, ASK
+from arb_scanner import POLY_DOWN_KALSHI_YES
+
+# Fees, in dollars per contract.
+# Kalshi charges roughly rate * P * (1 - P) per contract (rounded up per order);
+# Polymarket's hourly markets are fee free.
+KALSHI_FEE_RATE = 0.07
+POLY_FEE_RATE = 0.0
+
+class SizedArb:
+    """
+    Executable size for one pair, plus the profit curve behind it.
+    curve_size[i] / curve_profit[i] are the breakpoints of the piecewise-linear
+    profit(size) function, starting at (0, 0).
+    """
+    def __init__(self, curve_size, curve_cost):
+        self.curve_size = curve_size
+        self.curve_cost = curve_cost
+        self.curve_profit = curve_size - curve_cost
+
+    @property
+    def max_size(self):
+        return float(self.curve_size[-1])
+
+    @property
+    def total_cost(self):
+        return float(self.curve_cost[-1])
+
+    @property
+    def profit(self):
+        return float(self.curve_profit[-1])
+
+    @property
+    def avg_cost(self):
+        return self.total_cost / self.max_size if self.max_size > 0 else 0.0
+
+    def profit_at(self, size):
+        return float(np.interp(size, self.curve_size, self.curve_profit))
+
+def ladder_arrays(levels, fee_rate=0.0):
+    """
+    Turns best-first (price, size) ask levels in dollars into (price_with_fee, size) arrays.
+    """
+    if not levels:
+        return np.empty(0), np.empty(0)
+    prices, sizes = np.array(levels, dtype=np.float64).T
+    return prices + fee_rate * prices * (1.0 - prices), sizes
+
+def size_legs(prices_a, sizes_a, prices_b, sizes_b, payout=1.0):
+    """
+    Merge-walks two ascending ask ladders with prefix sums.
+
+    Every unit bought costs one contract of each leg, so the cumulative sizes of
+    both ladders split the quantity axis into segments with a constant marginal
+    cost. Marginal cost never decreases, so the pair stays profitable up to the
+    first segment that costs >= payout. Returns a SizedArb.
+    """
+    if len(sizes_a) == 0 or len(sizes_b) == 0:
+        return SizedArb(np.zeros(1), np.zeros(1))
+
+    cum_a = np.cumsum(sizes_a)
+    cum_b = np.cumsum(sizes_b)
+    depth = min(cum_a[-1], cum_b[-1])
+    ends = np.union1d(cum_a, cum_b)
+    ends = ends[ends <= depth]
+    starts = np.concatenate(([0.0], ends[:-1]))
+
+    marginal = prices_a[np.searchsorted(cum_a, starts, side="right")] \
+        + prices_b[np.searchsorted(cum_b, starts, side="right")]
+    n = int(np.searchsorted(marginal, payout, side="left"))
+
+    curve_size = np.concatenate(([0.0], ends[:n]))
+    curve_cost = np.concatenate(([0.0], np.cumsum((ends[:n] - starts[:n]) * marginal[:n])))
+    return SizedArb(curve_size, curve_cost)
+
+def size_pair(strategy, poly_book, kalshi_book, kalshi_fee_rate=KALSHI_FEE_RATE, poly_fee_rate=POLY_FEE_RATE):
+    """
+    Sizes a scanner pair from full books.
+    poly_book is the Down token's book for POLY_DOWN_KALSHI_YES and the Up token's
+    otherwise. kalshi_book is a cents book as filled by fill_kalshi_book, where the
+    YES asks are the asks and the NO asks are 100 - the YES bids.
+    """
+    poly_prices, poly_sizes = ladder_arrays(poly_book.levels(ASK), poly_fee_rate)
+    if strategy == POLY_DOWN_KALSHI_YES:
+        kalshi_levels = [(p / 100.0, s) for p, s in kalshi_book.levels(ASK)]
+    else:
+        kalshi_levels = [((100 - p) / 100.0, s) for p, s in kalshi_book.levels(BID)]
+    kalshi_prices, kalshi_sizes = ladder_arrays(kalshi_levels, kalshi_fee_rate)
+    return size_legs(poly_prices, poly_sizes, kalshi_prices, kalshi_sizes)
@@ -1,15 +1,179 @@
-import time
+import asyncio
 import datetime
-from fetch_current_polymarket import fetch_polymarket_data_struct
-from fetch_current_kalshi import fetch_kalshi_data_struct
+import sys
+import time
+import numpy as np
+from arb_scanner import KalshiLadder, scan_pairs, find_opportunities, STRATEGY_NAMES, POLY_DOWN_KALSHI_YES
+from arb_sizing import size_pair
+from arb_detector import ArbDetector, OPEN
+from async_fetch import create_client, gather_results
+from fetch_current_polymarket import (fetch_polymarket_data_struct_async, get_market_tokens_async, run_market_prefetch,
+                                      get_token_book)
+from fetch_current_kalshi import (fetch_kalshi_data_struct_async, get_binance_hour_open_async, get_kalshi_orderbook_async,
+                                  SYMBOL)
+from market_schedule import SCHEDULE, schedule_for
+from market_universe import MARKET_UNIVERSE, parse_universe
+from universe_scan import fetch_universe_async
+from metrics import span, timed, print_summary
+from scheduler import AdaptiveCadence
+from venue_client import bucket_for
+import fetch_current_polymarket
+import fetch_current_kalshi
+from recorder import TickRecorder, RECORD_DIR
+from streaming import (BookStore, PolymarketMarketFeed, KalshiOrderbookFeed, BinanceTradeFeed,
+                       build_polymarket_data, build_kalshi_data)
 
-def check_arbitrage():
+# Kalshi requires signed API-key headers on its WebSocket handshake. Until they are
+# set here, the streaming bot polls Kalshi's REST markets endpoint instead.
+KALSHI_WS_HEADERS = None
+ROLLOVER_CHECK_INTERVAL = 1.0
+# The hour's Binance open can be missing right after rollover; retried this often until it is in
+OPEN_RETRY_INTERVAL = 5.0
+
+# Polls run between the min and max interval, faster near expiry and when
+# prices move (see scheduler.AdaptiveCadence), within each venue's request budget
+SCAN_MIN_INTERVAL = 0.25
+SCAN_MAX_INTERVAL = 2.0
+KALSHI_MIN_INTERVAL = 0.25
+KALSHI_POLL_INTERVAL = 1.0
+# A 0.05% move in spot between Kalshi polls counts as volatile
+SPOT_VOL_REFERENCE = 0.0005
+
+# Kalshi strikes within this distance of the Poly strike are printed
+DISPLAY_RANGE = 2500
+
+# Every scanned snapshot is recorded when RECORD_DIR is set
+recorder = TickRecorder(RECORD_DIR) if RECORD_DIR else None
+
+def record_snapshot(poly_data, kalshi_data):
+    if not recorder:
+        return
+    if poly_data:
+        recorder.record_polymarket(poly_data)
+    if kalshi_data:
+        recorder.record_kalshi(kalshi_data)
+        recorder.record_binance(kalshi_data.get('current_price'))
+
+@timed("scan_fetch")
+async def fetch_scan_data(client):
+    """
+    Fires the Polymarket, Kalshi and Binance requests at once, so a scan
+    takes as long as the slowest venue instead of the sum of all of them.
+    """
+    target_time = SCHEDULE.current().target_time_utc
+    (poly_data, poly_err), (kalshi_data, kalshi_err), (price_to_beat, _) = await gather_results(
+        fetch_polymarket_data_struct_async(client),
+        fetch_kalshi_data_struct_async(client),
+        get_binance_hour_open_async(client, target_time)
+    )
+    if poly_data:
+        poly_data['price_to_beat'] = price_to_beat
+    return poly_data, poly_err, kalshi_data, kalshi_err
+
+@timed("scan_total")
+async def check_arbitrage_async(client):
     print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Scanning for arbitrage...")
     
     # Fetch Data
-    poly_data, poly_err = fetch_polymarket_data_struct()
-    kalshi_data, kalshi_err = fetch_kalshi_data_struct()
+    poly_data, poly_err, kalshi_data, kalshi_err = await fetch_scan_data(client)
+    record_snapshot(poly_data, kalshi_data)
+    opportunities = evaluate_arbitrage(poly_data, poly_err, kalshi_data, kalshi_err)
+    if opportunities is not None and len(opportunities):
+        await report_executable_sizes(client, poly_data, kalshi_data, opportunities)
+    print("-" * 50)
+
+def kalshi_quotes(markets):
+    return [(m.strike, m.yes_ask / 100.0, m.no_ask / 100.0) for m in markets]
+
+@timed("arb_detect")
+def apply_scan(detector, poly_data, kalshi_data):
+    """
+    Feeds one polled snapshot to the detector; a new slug or strike starts over.
+    Returns the detector's events.
+    """
+    prices = poly_data['prices']
+    up, down = prices.get('Up', 0.0), prices.get('Down', 0.0)
+    if detector.market != poly_data['slug'] or detector.poly_strike != poly_data['price_to_beat']:
+        return detector.reset(poly_data['price_to_beat'], up, down, kalshi_quotes(kalshi_data['markets']),
+                              market=poly_data['slug'])
+    return detector.update_poly(up=up, down=down) + detector.update_markets(kalshi_data['markets'])
+
+def print_arb_events(events, label=""):
+    for e in events:
+        prefix = f"[{datetime.datetime.fromtimestamp(e.ts).strftime('%H:%M:%S.%f')[:-3]}]"
+        if label:
+            prefix += f" [{label}]"
+        if e.kind == OPEN:
+            print(f"{prefix} OPEN  | Strike ${e.strike:,.2f} | {STRATEGY_NAMES[e.strategy]} | "
+                  f"Cost: ${e.poly_cost + e.kalshi_cost:.3f} | Profit: ${e.margin:.3f} per unit")
+        else:
+            print(f"{prefix} CLOSE | Strike ${e.strike:,.2f} | {STRATEGY_NAMES[e.strategy]} | "
+                  f"Open for {e.ts - e.opened_at:.1f}s")
+
+@timed("scan_total")
+async def detect_arbitrage_async(client, detector):
+    """
+    One polling step of run_bot: only the pairs whose prices moved are
+    re-checked, and only opportunities that just opened are sized. Returns
+    the Polymarket data, or None when the fetch failed.
+    """
+    poly_data, poly_err, kalshi_data, kalshi_err = await fetch_scan_data(client)
+    record_snapshot(poly_data, kalshi_data)
+    if poly_err or kalshi_err or not poly_data or not kalshi_data or poly_data['price_to_beat'] is None:
+        print(f"Fetch error: {poly_err or kalshi_err or 'Missing data or strike'}")
+        return None
+    await process_scan(client, detector, poly_data, kalshi_data)
+    return poly_data
+
+def scan_budgets(kalshi_requests=1):
+    """
+    (TokenBucket, requests per scan) of one polled scan: one batched CLOB
+    request, the Kalshi markets and one Binance price.
+    """
+    return [(bucket_for(fetch_current_polymarket.CLOB_BOOKS_URL), 1),
+            (bucket_for(fetch_current_kalshi.KALSHI_API_URL), kalshi_requests),
+            (bucket_for(fetch_current_kalshi.BINANCE_PRICE_URL), 1)]
+
+async def process_scan(client, detector, poly_data, kalshi_data, label=""):
+    events = apply_scan(detector, poly_data, kalshi_data)
+    print_arb_events(events, label)
+    opened = {(e.strategy, e.strike) for e in events if e.kind == OPEN}
+    if opened:
+        opportunities = detector.opportunities()
+        opportunities = opportunities[[(int(o['strategy']), float(o['strike'])) in opened for o in opportunities]]
+        await report_executable_sizes(client, poly_data, kalshi_data, opportunities)
+
+@timed("arb_sizing")
+async def report_executable_sizes(client, poly_data, kalshi_data, opportunities):
+    """
+    Fetches the Kalshi books behind each opportunity and prints how many units
+    can actually be bought before the combined cost reaches $1 minus fees.
+    The Polymarket books were already filled by the price fetch.
+    """
+    tickers = {m.strike: m.ticker for m in kalshi_data['markets']}
+    strikes = sorted({float(s) for s in opportunities['strike']})
+    results = await gather_results(*(get_kalshi_orderbook_async(client, tickers[s]) for s in strikes))
+    kalshi_books = dict(zip(strikes, results))
     
+    print("EXECUTABLE SIZE (full depth, after fees):")
+    for opp in opportunities:
+        kalshi_book, err = kalshi_books[float(opp['strike'])]
+        if err:
+            print(f"  Strike ${opp['strike']:,.2f}: Kalshi book error ({err})")
+            continue
+        outcome = 'Down' if opp['strategy'] == POLY_DOWN_KALSHI_YES else 'Up'
+        poly_book = get_token_book(poly_data['token_ids'][outcome])
+        sized = size_pair(opp['strategy'], poly_book, kalshi_book)
+        print(f"  Strike ${opp['strike']:,.2f} | {STRATEGY_NAMES[opp['strategy']]} | "
+              f"Max Size: {sized.max_size:,.0f} @ ${sized.avg_cost:.3f} | Profit: ${sized.profit:,.2f}")
+
+def check_arbitrage():
+    async def run():
+        async with create_client() as client:
+            await check_arbitrage_async(client)
+    asyncio.run(run())
+
+def evaluate_arbitrage(poly_data, poly_err, kalshi_data, kalshi_err):
     if poly_err:
         print(f"Polymarket Error: {poly_err}")
         return
@@ -38,124 +202,230 @@ def check_arbitrage():
         print("No Kalshi markets found")
         return
         
-    # Find relevant Kalshi markets (closest to Poly strike)
-    # We can check ALL of them, but let's focus on the ones around the Poly strike
-    # Actually, the user asked to compare Poly Strike vs Kalshi Strike 1, 2, 3.
-    # But "1, 2, 3" depends on which ones we fetched. 
-    # Let's iterate through ALL fetched Kalshi markets and check for arb.
+    # Logic:
+    # Polymarket "Up" means Price >= Poly_Strike, "Down" means Price < Poly_Strike
+    # Kalshi "Yes" means Price >= Kalshi_Strike, "No" means Price < Kalshi_Strike
+    #
+    # Poly_Strike > Kalshi_Strike: Buy Poly Down + Kalshi Yes. At least one leg wins
+    # (both win in [Kalshi_Strike, Poly_Strike)), so the MINIMUM payout is $1.00.
+    # Poly_Strike < Kalshi_Strike: Buy Poly Up + Kalshi No, same argument.
+    # Equal strikes: both pairs are checked.
+    # Risk Free if the combined cost < $1.00.
+    #
+    # Every strike is priced in one batched pass; see arb_scanner.
+    with span("arb_scan"):
+        ladder = KalshiLadder.from_markets(kalshi_markets)
+        pairs = scan_pairs(poly_strike, poly_up_cost, poly_down_cost, ladder)
     
-    found_arb = False
+    # Only print markets close to Poly strike to avoid spamming
+    nearby = np.abs(ladder.strikes - poly_strike) < DISPLAY_RANGE
+    for i in np.flatnonzero(nearby):
+        print(f"  KALSHI | Strike: ${ladder.strikes[i]:,.2f} | Yes: ${ladder.yes_ask[i]:.2f} | No: ${ladder.no_ask[i]:.2f}")
     
-    # Print header for Kalshi
-    # print("KALSHI MARKETS:")
-    
-    for km in kalshi_markets:
-        kalshi_strike = km['strike']
-        # Kalshi prices are in cents (integer), convert to dollars
-        kalshi_yes_cost = km['yes_ask'] / 100.0
-        kalshi_no_cost = km['no_ask'] / 100.0
-        
-        # Only print markets close to Poly strike to avoid spamming?
-        # Or print all? User said "show the data it is using".
-        # Let's print the ones within a reasonable range (e.g. +/- $2500)
-        if abs(kalshi_strike - poly_strike) < 2500:
-             print(f"  KALSHI | Strike: ${kalshi_strike:,.2f} | Yes: ${kalshi_yes_cost:.2f} | No: ${kalshi_no_cost:.2f}")
-        
-        # Logic:
-        
-        # Logic:
-        # Polymarket "Up" means Price >= Poly_Strike
-        # Polymarket "Down" means Price < Poly_Strike
-        
-        # Kalshi "Yes" means Price >= Kalshi_Strike
-        # Kalshi "No" means Price < Kalshi_Strike
-        
-        # Case 1: Poly_Strike > Kalshi_Strike
-        # Range: [Kalshi_Strike, Poly_Strike)
-        # If Price is in this range:
-        #   - Poly is Down (Win)
-        #   - Kalshi is Yes (Win)
-        # Strategy: Buy Poly Down + Kalshi Yes
-        # If Price < Kalshi_Strike: Poly Down (Win), Kalshi Yes (Lose) -> 1 Win
-        # If Price >= Poly_Strike: Poly Down (Lose), Kalshi Yes (Win) -> 1 Win
-        # If Kalshi_Strike <= Price < Poly_Strike: Both Win -> 2 Wins
-        # So MINIMUM payout is $1.00.
-        # Risk Free if Cost(Poly Down) + Cost(Kalshi Yes) < 1.00
-        
-        if poly_strike > kalshi_strike:
-            total_cost = poly_down_cost + kalshi_yes_cost
-            print(f"    [Poly > Kalshi] Checking: Poly Down (${poly_down_cost:.3f}) + Kalshi Yes (${kalshi_yes_cost:.3f}) = ${total_cost:.3f}")
-            
-            if total_cost < 1.00:
-                margin = 1.00 - total_cost
-                print(f"!!! ARBITRAGE FOUND !!!")
-                print(f"Type: Poly Strike ({poly_strike}) > Kalshi Strike ({kalshi_strike})")
-                print(f"Strategy: Buy Poly DOWN + Kalshi YES")
-                print(f"Total Cost: ${total_cost:.3f}")
-                print(f"Min Payout: $1.00")
-                print(f"Risk-Free Profit: ${margin:.3f} per unit")
-                found_arb = True
-
-        # Case 2: Poly_Strike < Kalshi_Strike
-        elif poly_strike < kalshi_strike:
-            total_cost = poly_up_cost + kalshi_no_cost
-            print(f"    [Poly < Kalshi] Checking: Poly Up (${poly_up_cost:.3f}) + Kalshi No (${kalshi_no_cost:.3f}) = ${total_cost:.3f}")
-            
-            if total_cost < 1.00:
-                margin = 1.00 - total_cost
-                print(f"!!! ARBITRAGE FOUND !!!")
-                print(f"Type: Poly Strike ({poly_strike}) < Kalshi Strike ({kalshi_strike})")
-                print(f"Strategy: Buy Poly UP + Kalshi NO")
-                print(f"Total Cost: ${total_cost:.3f}")
-                print(f"Min Payout: $1.00")
-                print(f"Risk-Free Profit: ${margin:.3f} per unit")
-                found_arb = True
-                
-        # Case 3: Poly_Strike == Kalshi_Strike
-        elif poly_strike == kalshi_strike:
-            # Check Pair 1: Poly Down + Kalshi Yes
-            cost1 = poly_down_cost + kalshi_yes_cost
-            print(f"    [Poly == Kalshi] Checking: Poly Down (${poly_down_cost:.3f}) + Kalshi Yes (${kalshi_yes_cost:.3f}) = ${cost1:.3f}")
-            
-            if cost1 < 1.00:
-                margin = 1.00 - cost1
-                print(f"!!! ARBITRAGE FOUND !!!")
-                print(f"Type: Equal Strikes ({poly_strike})")
-                print(f"Strategy: Buy Poly DOWN + Kalshi YES")
-                print(f"Total Cost: ${cost1:.3f}")
-                print(f"Risk-Free Profit: ${margin:.3f} per unit")
-                found_arb = True
-                
-            # Check Pair 2: Poly Up + Kalshi No
-            cost2 = poly_up_cost + kalshi_no_cost
-            print(f"    [Poly == Kalshi] Checking: Poly Up (${poly_up_cost:.3f}) + Kalshi No (${kalshi_no_cost:.3f}) = ${cost2:.3f}")
-            
-            if cost2 < 1.00:
-                margin = 1.00 - cost2
-                print(f"!!! ARBITRAGE FOUND !!!")
-                print(f"Type: Equal Strikes ({poly_strike})")
-                print(f"Strategy: Buy Poly UP + Kalshi NO")
-                print(f"Total Cost: ${cost2:.3f}")
-                print(f"Risk-Free Profit: ${margin:.3f} per unit")
-                found_arb = True
-
-    if not found_arb:
+    opportunities = find_opportunities(pairs)
+    for opp in opportunities:
+        strike = opp['strike']
+        if strike < poly_strike:
+            arb_type = f"Poly Strike ({poly_strike}) > Kalshi Strike ({strike})"
+        elif strike > poly_strike:
+            arb_type = f"Poly Strike ({poly_strike}) < Kalshi Strike ({strike})"
+        else:
+            arb_type = f"Equal Strikes ({poly_strike})"
+        print(f"!!! ARBITRAGE FOUND !!!")
+        print(f"Type: {arb_type}")
+        print(f"Strategy: {STRATEGY_NAMES[opp['strategy']]}")
+        print(f"Total Cost: ${opp['total_cost']:.3f}")
+        print(f"Min Payout: $1.00")
+        print(f"Risk-Free Profit: ${opp['margin']:.3f} per unit")
+
+    if len(opportunities) == 0:
         print("No risk-free arbitrage found.")
-    print("-" * 50)
+    return opportunities
 
-def main():
-    print("Starting Arbitrage Bot...")
-    print("Press Ctrl+C to stop.")
-    while True:
+async def run_bot():
+    # One client for the whole run so connections are reused between scans
+    detector = ArbDetector()
+    cadence = AdaptiveCadence(SCAN_MIN_INTERVAL, SCAN_MAX_INTERVAL, budgets=scan_budgets(), name="scan_loop")
+    async with create_client() as client:
+        while True:
+            poly_data = None
+            try:
+                poly_data = await detect_arbitrage_async(client, detector)
+                if poly_data:
+                    cadence.observe(poly_data['prices'].get('Up'))
+            except Exception as e:
+                print(f"Error: {e}")
+            await cadence.wait(SCHEDULE.seconds_to_rollover(), retry=poly_data is None)
+
+@timed("universe_scan")
+async def detect_universe_async(client, families, detectors):
+    """
+    One polling step of run_universe_bot: every tracked market is fetched in
+    one batched round and fed to its own detector. Returns {family key:
+    poly_data} of the markets that were fetched.
+    """
+    fetched = {}
+    for market, poly_data, kalshi_data, err in await fetch_universe_async(client, families):
+        key = market.family.key
+        if err or not poly_data or not kalshi_data or poly_data['price_to_beat'] is None:
+            print(f"[{key}] Fetch error: {err or 'Missing data or strike'}")
+            continue
+        fetched[key] = poly_data
+        record_snapshot(poly_data, kalshi_data)
         try:
-            check_arbitrage()
-            time.sleep(1)
-        except KeyboardInterrupt:
-            print("\nStopping...")
-            break
+            await process_scan(client, detectors[key], poly_data, kalshi_data, label=key)
         except Exception as e:
-            print(f"Error: {e}")
-            time.sleep(1)
+            print(f"[{key}] Error: {e}")
+    return fetched
+
+async def run_universe_bot(families):
+    """
+    run_bot over every family of the market universe (MARKET_UNIVERSE) at once.
+    """
+    families = [f for f in families if f.has_kalshi]
+    print(f"Tracking {len(families)} market families: {', '.join(f.key for f in families)}")
+    detectors = {f.key: ArbDetector() for f in families}
+    # Hourly and daily contracts of an asset can share a Kalshi event, so this is an upper bound
+    cadence = AdaptiveCadence(SCAN_MIN_INTERVAL, SCAN_MAX_INTERVAL, budgets=scan_budgets(len(families)),
+                              name="scan_loop")
+    async with create_client() as client:
+        while True:
+            fetched = {}
+            try:
+                fetched = await detect_universe_async(client, families, detectors)
+                for key, poly_data in fetched.items():
+                    cadence.observe(poly_data['prices'].get('Up'), key)
+            except Exception as e:
+                print(f"Error: {e}")
+            # The market closest to resolving sets the pace
+            expiry = min(schedule_for(f).seconds_to_rollover() for f in families) if families else None
+            await cadence.wait(expiry, retry=not fetched)
+
+async def poll_kalshi_rest(client, store, kalshi_view):
+    budgets = [(bucket_for(fetch_current_kalshi.KALSHI_API_URL), 1),
+               (bucket_for(fetch_current_kalshi.BINANCE_PRICE_URL), 1)]
+    cadence = AdaptiveCadence(KALSHI_MIN_INTERVAL, KALSHI_POLL_INTERVAL, vol_reference=SPOT_VOL_REFERENCE,
+                              budgets=budgets)
+    while True:
+        data, err = await fetch_kalshi_data_struct_async(client)
+        if data:
+            kalshi_view['data'] = data
+            store.mark_changed(data['event_ticker'])
+            # Spot moves are what reprice the Kalshi ladder
+            cadence.observe(store.last_prices.get(SYMBOL, data['current_price']))
+        elif err:
+            print(f"Kalshi Error: {err}")
+        await cadence.wait(SCHEDULE.seconds_to_rollover(), retry=not data)
+
+async def run_streaming_bot():
+    """
+    Re-checks arbitrage on every book change instead of once a second, and only
+    for the pairs whose inputs changed. Market discovery still goes through REST
+    once per hourly market.
+    """
+    detector = ArbDetector()
+    async with create_client() as client:
+        while True:
+            market = SCHEDULE.current()
+            (poly_tokens, poly_err), (kalshi_data, kalshi_err), (price_to_beat, _) = await gather_results(
+                get_market_tokens_async(client, market),
+                fetch_kalshi_data_struct_async(client),
+                get_binance_hour_open_async(client, market.target_time_utc)
+            )
+            if poly_err or kalshi_err or not kalshi_data:
+                print(f"Discovery error: {poly_err or kalshi_err or 'No Kalshi markets found'}")
+                await asyncio.sleep(ROLLOVER_CHECK_INTERVAL)
+                continue
+
+            store = BookStore()
+            listener = store.subscribe()
+            kalshi_view = {"data": kalshi_data}
+            feeds = [PolymarketMarketFeed(store, poly_tokens.values()).run(), BinanceTradeFeed(store, SYMBOL).run(),
+                     run_market_prefetch(client)]
+            if KALSHI_WS_HEADERS:
+                tickers = [m.ticker for m in kalshi_data['markets']]
+                feeds.append(KalshiOrderbookFeed(store, tickers, headers=KALSHI_WS_HEADERS).run())
+            else:
+                feeds.append(poll_kalshi_rest(client, store, kalshi_view))
+            tasks = [asyncio.create_task(f) for f in feeds]
+            by_ticker = {m.ticker: m for m in kalshi_data['markets']}
+            # The detector is only seeded once the price to beat is known; until
+            # then book events are skipped and the hour open is fetched again
+            seeded = False
+            retry_open_at = 0.0
+            if price_to_beat is None:
+                print(f"Price to beat for {market.poly_slug} not available yet; retrying every {OPEN_RETRY_INTERVAL:.0f}s")
+            try:
+                while SCHEDULE.current() is market:
+                    if price_to_beat is None and time.monotonic() >= retry_open_at:
+                        price_to_beat, err = await get_binance_hour_open_async(client, market.target_time_utc)
+                        if price_to_beat is None:
+                            print(f"Price to beat error: {err}")
+                            retry_open_at = time.monotonic() + OPEN_RETRY_INTERVAL
+                    if price_to_beat is not None and not seeded:
+                        # Poly asks count as missing until both books are synced
+                        print_arb_events(detector.reset(price_to_beat, 0.0, 0.0, kalshi_quotes(kalshi_view['data']['markets']),
+                                                        market=market.poly_slug))
+                        seeded = True
+                        # Books that synced while waiting are fed in on the next wake-up
+                        for token_id in poly_tokens.values():
+                            store.mark_changed(token_id)
+                    try:
+                        changed = await asyncio.wait_for(listener.wait(), timeout=ROLLOVER_CHECK_INTERVAL)
+                    except asyncio.TimeoutError:
+                        continue
+                    if not all(store.book(t).synced for t in poly_tokens.values()) or not seeded:
+                        continue
+                    
+                    try:
+                        with span("arb_detect"):
+                            events = []
+                            if not changed.isdisjoint(poly_tokens.values()):
+                                prices = build_polymarket_data(store, market.poly_slug, poly_tokens, price_to_beat)['prices']
+                                # An empty book is "no ask" (0) to the detector; None would mean unchanged
+                                events += detector.update_poly(up=prices.get('Up') or 0.0, down=prices.get('Down') or 0.0)
+                            if KALSHI_WS_HEADERS:
+                                for ticker in changed.intersection(by_ticker):
+                                    book = store.book(ticker)
+                                    best_bid, best_ask = book.best_bid(), book.best_ask()
+                                    yes_ask = best_ask if best_ask is not None else 0
+                                    no_ask = (100 - best_bid) if best_bid is not None else 0
+                                    events += detector.update_kalshi(by_ticker[ticker].strike, yes_ask / 100.0, no_ask / 100.0)
+                            elif kalshi_data['event_ticker'] in changed:
+                                events += detector.update_markets(kalshi_view['data']['markets'])
+                        print_arb_events(events)
+                    except Exception as e:
+                        print(f"Error: {e}")
+                    
+                    if recorder:
+                        poly_data = build_polymarket_data(store, market.poly_slug, poly_tokens, price_to_beat)
+                        if KALSHI_WS_HEADERS:
+                            kalshi_now = build_kalshi_data(store, kalshi_data['event_ticker'], kalshi_data['markets'], SYMBOL)
+                        else:
+                            kalshi_now = dict(kalshi_view['data'])
+                            kalshi_now['current_price'] = store.last_prices.get(SYMBOL, kalshi_now['current_price'])
+                        record_snapshot(poly_data, kalshi_now)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+def main():
+    streaming = "--stream" in sys.argv
+    universe = "--universe" in sys.argv
+    print("Starting Arbitrage Bot" + (" (streaming)..." if streaming else " (universe)..." if universe else "..."))
+    print("Press Ctrl+C to stop.")
+    try:
+        if universe:
+            bot = run_universe_bot(parse_universe(MARKET_UNIVERSE))
+        else:
+            bot = run_streaming_bot() if streaming else run_bot()
+        asyncio.run(bot)
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        if recorder:
+            recorder.close()
+        print_summary()
 
 if __name__ == "__main__":
     main()
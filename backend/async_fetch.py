@@ -0,0 +1,24 @@
+import asyncio
+from venue_client import create_async_client, get_async
+from decoders import response_json
+
+def create_client():
+    """
+    Creates the shared async HTTP client used by the venue fetchers.
+    The caller owns it and should close it with `await client.aclose()`.
+    """
+    return create_async_client()
+
+async def get_json(client, url, params=None):
+    response = await get_async(client, url, params=params)
+    response.raise_for_status()
+    return response_json(response)
+
+async def gather_results(*coros):
+    """
+    Runs (data, err) coroutines concurrently and returns their results in order.
+    An unexpected exception in one venue is turned into (None, err) so it
+    never cancels the others.
+    """
+    results = await asyncio.gather(*coros, return_exceptions=True)
+    return [(None, str(r)) if isinstance(r, Exception) else r for r in results]
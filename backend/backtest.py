@@ -0,0 +1,290 @@
+import argparse
+import json
+import os
+import warnings
+import numpy as np
+import recorder
+from strategy import StrategySimulator
+from sim_manager import POLYMARKET
+
+# Recorded tick files are CSV with a header row and one row per market per tick:
+#   ts,market,slug,up,down,strike,btc
+# ts is unix seconds, market is a sim_manager key ("polymarket" or "kalshi:<strike>"),
+# up/down are the Up/Down (or Kalshi YES/NO) asks in dollars, "nan" when there is
+# no liquidity, strike is the price to beat and btc is the Binance spot price.
+TICK_DTYPE = np.dtype([
+    ("ts", "f8"),
+    ("market", "U32"),
+    ("slug", "U64"),
+    ("up", "f8"),
+    ("down", "f8"),
+    ("strike", "f8"),
+    ("btc", "f8"),
+])
+
+CHUNK_ROWS = 65536
+
+# Outcome of an hour without a usable strike or resolution price
+UNSETTLED = "Unsettled"
+
+def iter_tick_chunks(path, chunk_rows=CHUNK_ROWS):
+    """
+    Streams a tick CSV as TICK_DTYPE arrays of up to chunk_rows rows, so memory
+    stays flat no matter how many months the file covers.
+    """
+    with open(path) as f:
+        f.readline()  # Header
+        while True:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)  # loadtxt warns on the empty read at EOF
+                chunk = np.loadtxt(f, delimiter=",", dtype=TICK_DTYPE, max_rows=chunk_rows, ndmin=1)
+            if len(chunk) == 0:
+                return
+            yield chunk
+            if len(chunk) < chunk_rows:
+                return
+
+def settle(sim, strike, resolution_price):
+    """
+    Settles an hourly market: Up (YES) pays $1 per contract when the resolution
+    price is at or above the strike, Down (NO) pays otherwise.
+    Returns (outcome, pnl), or (UNSETTLED, None) when the strike or the
+    resolution price is missing (NaN), since the winner is then unknown.
+    """
+    if not (np.isfinite(strike) and np.isfinite(resolution_price)):
+        return UNSETTLED, None
+    up_wins = resolution_price >= strike
+    payout = sim.qty_yes if up_wins else sim.qty_no
+    pnl = payout - (sim.total_cost_yes + sim.total_cost_no)
+    return ("Up" if up_wins else "Down"), pnl
+
+class MarketHour:
+    def __init__(self, slug, params):
+        self.slug = slug
+        self.sim = StrategySimulator(keep_history=False, **params)
+        self.strike = np.nan
+        self.last_btc = np.nan
+        self.ticks = 0
+
+    def feed(self, rows):
+        self.ticks += len(rows)
+        self.sim.tick_batch(rows["up"], rows["down"], rows["ts"])
+        strikes = rows["strike"][~np.isnan(rows["strike"])]
+        if len(strikes):
+            self.strike = strikes[-1]
+        prices = rows["btc"][~np.isnan(rows["btc"])]
+        if len(prices):
+            self.last_btc = prices[-1]
+
+    def close(self, resolutions):
+        resolution = resolutions.get(self.slug, self.last_btc)
+        outcome, pnl = settle(self.sim, self.strike, resolution)
+        return {
+            "slug": self.slug,
+            "ticks": self.ticks,
+            "strike": float(self.strike),
+            "resolution_price": float(resolution),
+            "outcome": outcome,
+            "fills": self.sim.fills,
+            "qty_yes": self.sim.qty_yes,
+            "qty_no": self.sim.qty_no,
+            "pair_cost": self.sim.pair_cost,
+            "locked_profit": self.sim.locked_profit,
+            "pnl": pnl
+        }
+
+def run_backtest(path, market=POLYMARKET, resolutions=None, chunk_rows=CHUNK_ROWS, **params):
+    """
+    Replays a recorded tick file through StrategySimulator for one market key,
+    restarting the simulator every hourly market (slug) and settling each one
+    against its resolution price: resolutions[slug] when given, otherwise the
+    last recorded BTC price of that hour. Nothing is printed on the hot path.
+    """
+    resolutions = resolutions or {}
+    hours = []
+    current = None
+    for chunk in iter_tick_chunks(path, chunk_rows):
+        rows = chunk[chunk["market"] == market]
+        if len(rows) == 0:
+            continue
+        slugs = rows["slug"]
+        bounds = np.concatenate(([0], np.flatnonzero(slugs[1:] != slugs[:-1]) + 1, [len(rows)]))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            slug = str(slugs[start])
+            if current is None or current.slug != slug:
+                if current is not None:
+                    hours.append(current.close(resolutions))
+                current = MarketHour(slug, params)
+            current.feed(rows[start:end])
+    if current is not None:
+        hours.append(current.close(resolutions))
+    return summarize(hours)
+
+# Numeric columns of one market, for datasets held in memory (see sweep.py)
+SERIES_DTYPE = np.dtype([("ts", "f8"), ("up", "f8"), ("down", "f8"), ("strike", "f8"), ("btc", "f8")])
+
+def load_market_series(path, market=POLYMARKET, chunk_rows=CHUNK_ROWS):
+    """
+    Loads one market's ticks into a single SERIES_DTYPE array.
+    Returns (series, spans) where spans is a list of (slug, start, end) hours.
+    """
+    parts = []
+    spans = []
+    offset = 0
+    for chunk in iter_tick_chunks(path, chunk_rows):
+        rows = chunk[chunk["market"] == market]
+        if len(rows) == 0:
+            continue
+        part = np.empty(len(rows), dtype=SERIES_DTYPE)
+        for name in SERIES_DTYPE.names:
+            part[name] = rows[name]
+        parts.append(part)
+
+        slugs = rows["slug"]
+        bounds = np.concatenate(([0], np.flatnonzero(slugs[1:] != slugs[:-1]) + 1, [len(rows)]))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            slug = str(slugs[start])
+            if spans and spans[-1][0] == slug and spans[-1][2] == offset + start:
+                spans[-1] = (slug, spans[-1][1], offset + end)  # Hour continues from the last chunk
+            else:
+                spans.append((slug, offset + start, offset + end))
+        offset += len(rows)
+    series = np.concatenate(parts) if parts else np.empty(0, dtype=SERIES_DTYPE)
+    return series, spans
+
+def load_recorded_series(root, market=POLYMARKET, days=None):
+    """
+    Loads one market key from a TickRecorder directory, same return value as
+    load_market_series. Kalshi keys ("kalshi:<strike>") read that strike's rows
+    with YES as up and NO as down. Binance spot is joined on as the last price
+    recorded at or before each tick.
+    """
+    source = recorder.POLYMARKET if market == POLYMARKET else recorder.KALSHI
+    parts = []
+    spans = []
+    offset = 0
+    for day in days or recorder.list_days(root, source):
+        columns, slugs = recorder.open_day(root, day, source)
+        if source == recorder.KALSHI:
+            strike = float(market.split(":", 1)[1])
+            mask = columns["strike"] == strike
+        else:
+            mask = np.ones(len(columns["ts"]), dtype=bool)
+        if not mask.any():
+            continue
+
+        part = np.empty(int(mask.sum()), dtype=SERIES_DTYPE)
+        part["ts"] = columns["ts"][mask]
+        part["strike"] = columns["strike"][mask]
+        if source == recorder.KALSHI:
+            for name, column in (("up", "yes_ask"), ("down", "no_ask")):
+                cents = columns[column][mask].astype(np.float64)
+                part[name] = np.where(cents > 0, cents / 100.0, np.nan)
+        else:
+            part["up"] = columns["up"][mask]
+            part["down"] = columns["down"][mask]
+        part["btc"] = recorded_spot(root, day, part["ts"])
+        parts.append(part)
+
+        slug_ids = columns["slug_id"][mask]
+        bounds = np.concatenate(([0], np.flatnonzero(slug_ids[1:] != slug_ids[:-1]) + 1, [len(part)]))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            slug = slugs[slug_ids[start]]
+            if spans and spans[-1][0] == slug and spans[-1][2] == offset + start:
+                spans[-1] = (slug, spans[-1][1], offset + end)  # Hour continues from the previous day
+            else:
+                spans.append((slug, offset + start, offset + end))
+        offset += len(part)
+    series = np.concatenate(parts) if parts else np.empty(0, dtype=SERIES_DTYPE)
+    return series, spans
+
+def recorded_spot(root, day, ts):
+    columns, _ = recorder.open_day(root, day, recorder.BINANCE)
+    if len(columns["price"]) == 0:
+        return np.full(len(ts), np.nan)
+    idx = np.searchsorted(columns["ts"], ts, side="right") - 1
+    return np.where(idx >= 0, columns["price"][np.maximum(idx, 0)], np.nan)
+
+def load_series(path, market=POLYMARKET):
+    """
+    Loads a tick CSV or a TickRecorder directory.
+    """
+    if os.path.isdir(path):
+        return load_recorded_series(path, market)
+    return load_market_series(path, market)
+
+def backtest_series(series, spans, resolutions=None, **params):
+    """
+    Same as run_backtest, for a dataset already loaded with load_market_series.
+    """
+    resolutions = resolutions or {}
+    hours = []
+    for slug, start, end in spans:
+        hour = MarketHour(slug, params)
+        hour.feed(series[start:end])
+        hours.append(hour.close(resolutions))
+    return summarize(hours)
+
+def max_drawdown(pnls):
+    """
+    Largest peak-to-trough drop of the cumulative PnL over the given sequence of hours.
+    """
+    if len(pnls) == 0:
+        return 0.0
+    equity = np.concatenate(([0.0], np.cumsum(pnls)))
+    return float(np.max(np.maximum.accumulate(equity) - equity))
+
+def summarize(hours):
+    """
+    Totals over every hour; PnL and drawdown only cover the settled hours.
+    """
+    paired = [h["pair_cost"] for h in hours if h["qty_yes"] > 0 and h["qty_no"] > 0]
+    pnls = [h["pnl"] for h in hours if h["pnl"] is not None]
+    return {
+        "hours": hours,
+        "total_ticks": sum(h["ticks"] for h in hours),
+        "total_fills": sum(h["fills"] for h in hours),
+        "total_pnl": sum(pnls),
+        "total_locked_profit": sum(h["locked_profit"] for h in hours),
+        "max_drawdown": max_drawdown(pnls),
+        "unsettled_hours": len(hours) - len(pnls),
+        "avg_pair_cost": float(np.mean(paired)) if paired else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded ticks through StrategySimulator.")
+    parser.add_argument("path", help="Tick CSV (ts,market,slug,up,down,strike,btc) or a recorder directory")
+    parser.add_argument("--market", default=POLYMARKET)
+    parser.add_argument("--resolutions", help="JSON file mapping slug to resolution price")
+    parser.add_argument("--buy-size", type=float, default=0.05)
+    parser.add_argument("--safety-margin", type=float, default=0.99)
+    parser.add_argument("--window-size", type=int, default=10)
+    parser.add_argument("--min-price-threshold", type=float, default=0.05)
+    parser.add_argument("--cheap-offset", type=float, default=0.005)
+    args = parser.parse_args()
+
+    resolutions = None
+    if args.resolutions:
+        with open(args.resolutions) as f:
+            resolutions = json.load(f)
+
+    params = dict(
+        buy_size=args.buy_size, safety_margin=args.safety_margin,
+        window_size=args.window_size, min_price_threshold=args.min_price_threshold,
+        cheap_offset=args.cheap_offset
+    )
+    if os.path.isdir(args.path):
+        series, spans = load_recorded_series(args.path, args.market)
+        report = backtest_series(series, spans, resolutions, **params)
+    else:
+        report = run_backtest(args.path, market=args.market, resolutions=resolutions, **params)
+    for h in report["hours"]:
+        pnl = "n/a (no strike or resolution price)" if h["pnl"] is None else f"${h['pnl']:+.3f}"
+        print(f"{h['slug']} | {h['outcome']:>4} | Fills: {h['fills']:4d} | Pair Cost: {h['pair_cost']:.3f} | PnL: {pnl}")
+    print("-" * 50)
+    print(f"Hours: {len(report['hours'])} ({report['unsettled_hours']} unsettled) | Ticks: {report['total_ticks']:,} | Fills: {report['total_fills']:,}")
+    print(f"Avg Pair Cost: {report['avg_pair_cost']:.3f} | Locked Profit: ${report['total_locked_profit']:.3f}")
+    print(f"Total PnL: ${report['total_pnl']:+.3f} | Max Drawdown: ${report['max_drawdown']:.3f}")
+
+if __name__ == "__main__":
+    main()
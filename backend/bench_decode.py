@@ -0,0 +1,116 @@
+import json
+import re
+import time
+from decoders import loads, ORJSON_ENABLED, decode_binance_price
+from fetch_current_polymarket import parse_market_tokens, fill_clob_book
+from fetch_current_kalshi import parse_kalshi_markets, KALSHI_STRIKES
+from order_book import OrderBook
+
+# Decode cost of one scan tick (Gamma event, both CLOB books, the Kalshi
+# market list and the Binance ticker), old parsing vs decoders.py.
+# Payloads are synthetic but shaped and sized like the venue responses.
+
+ROUNDS = 2000
+KALSHI_STRIKES_PER_EVENT = 40
+BOOK_LEVELS = 60
+
+def gamma_payload():
+    market = {
+        "id": "612345", "question": "Bitcoin Up or Down - December 12, 9PM ET", "conditionId": "0x" + "ab" * 32,
+        "slug": "bitcoin-up-or-down-december-12-9pm-et", "resolutionSource": "https://www.binance.com/en/trade/BTC_USDT",
+        "endDate": "2025-12-13T03:00:00Z", "liquidity": "51234.5", "startDate": "2025-12-11T02:00:00Z",
+        "description": "This market will resolve to Up if the close is at or above the open. " * 8,
+        "outcomes": '["Up", "Down"]', "outcomePrices": '["0.515", "0.485"]', "volume": "123456.78",
+        "active": True, "closed": False, "marketMakerAddress": "", "createdAt": "2025-12-11T01:00:00Z",
+        "clobTokenIds": '["' + "1" * 77 + '", "' + "2" * 77 + '"]', "enableOrderBook": True,
+        "orderPriceMinTickSize": 0.01, "orderMinSize": 5, "negRisk": False, "bestBid": 0.51, "bestAsk": 0.52,
+    }
+    event = {"id": "98765", "ticker": market["slug"], "slug": market["slug"], "title": market["question"],
+             "description": market["description"], "markets": [market], "tags": [{"id": str(i), "label": "Crypto"} for i in range(6)]}
+    return json.dumps([event]).encode()
+
+def clob_payload():
+    bids = [{"price": f"{0.50 - i * 0.001:.3f}", "size": f"{100 + i * 7.5:.2f}"} for i in range(BOOK_LEVELS)]
+    asks = [{"price": f"{0.52 + i * 0.001:.3f}", "size": f"{120 + i * 3.25:.2f}"} for i in range(BOOK_LEVELS)]
+    return json.dumps({"market": "0x" + "ab" * 32, "asset_id": "1" * 77, "timestamp": "1765512000000",
+                       "hash": "f" * 40, "bids": bids, "asks": asks, "min_order_size": "5",
+                       "tick_size": "0.001", "neg_risk": False}).encode()
+
+def kalshi_payload():
+    markets = []
+    for i in range(KALSHI_STRIKES_PER_EVENT):
+        strike = 90000 + i * 250
+        markets.append({
+            "ticker": f"KXBTCD-25DEC1221-T{strike - 0.01:.2f}", "event_ticker": "KXBTCD-25DEC1221",
+            "market_type": "binary", "title": "Bitcoin price today at 9pm EST?", "subtitle": f"${strike:,} or above",
+            "yes_sub_title": f"${strike:,} or above", "no_sub_title": f"${strike:,} or above",
+            "open_time": "2025-12-12T01:00:00Z", "close_time": "2025-12-13T02:00:00Z", "status": "active",
+            "yes_bid": 40, "yes_ask": 42, "no_bid": 58, "no_ask": 60, "last_price": 41, "previous_yes_bid": 39,
+            "volume": 1234, "volume_24h": 1234, "liquidity": 98765, "open_interest": 4321,
+            "result": "", "can_close_early": True, "rules_primary": "If the price is above the strike... " * 4,
+            "rules_secondary": "", "tick_size": 1, "strike_type": "greater", "floor_strike": strike - 0.01,
+        })
+    return json.dumps({"markets": markets, "cursor": ""}).encode()
+
+BINANCE_PAYLOAD = b'{"symbol":"BTCUSDT","price":"97123.45000000"}'
+
+# --- PREVIOUS PARSING ---
+
+def old_parse_strike(subtitle):
+    match = re.search(r'\$([\d,]+)', subtitle)
+    if match:
+        return float(match.group(1).replace(',', ''))
+    return 0.0
+
+def old_tick(gamma, book_up, book_down, kalshi, binance, books):
+    data = json.loads(gamma)
+    market = data[0]['markets'][0]
+    tokens = dict(zip(eval(market.get("outcomes", "[]")), eval(market.get("clobTokenIds", "[]"))))
+    for raw, book in zip((book_up, book_down), books):
+        data = json.loads(raw)
+        book.apply_snapshot(
+            [(float(l['price']), float(l['size'])) for l in data.get('bids', [])],
+            [(float(l['price']), float(l['size'])) for l in data.get('asks', [])]
+        )
+    market_data = []
+    for m in json.loads(kalshi).get('markets', []):
+        strike = old_parse_strike(m.get('subtitle', ''))
+        if strike > 0:
+            market_data.append({
+                'strike': strike, 'yes_bid': m.get('yes_bid', 0), 'yes_ask': m.get('yes_ask', 0),
+                'no_bid': m.get('no_bid', 0), 'no_ask': m.get('no_ask', 0),
+                'subtitle': m.get('subtitle'), 'ticker': m.get('ticker')
+            })
+    market_data.sort(key=lambda x: x['strike'])
+    price = float(json.loads(binance)["price"])
+    return tokens, market_data, price
+
+def new_tick(gamma, book_up, book_down, kalshi, binance, books):
+    tokens, _ = parse_market_tokens(gamma)
+    for raw, book in zip((book_up, book_down), books):
+        fill_clob_book(book, raw)
+    market_data = parse_kalshi_markets(loads(kalshi)["markets"], "KXBTCD-25DEC1221")
+    price = decode_binance_price(binance)
+    return tokens, market_data, price
+
+def bench(fn, payloads, rounds=ROUNDS):
+    fn(*payloads)  # Warm up caches
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(*payloads)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+def main():
+    books = [OrderBook(0.001), OrderBook(0.001)]
+    payloads = (gamma_payload(), clob_payload(), clob_payload(), kalshi_payload(), BINANCE_PAYLOAD, books)
+    size = sum(len(p) for p in payloads[:5])
+    KALSHI_STRIKES.clear()
+
+    old = bench(old_tick, payloads)
+    new = bench(new_tick, payloads)
+    print(f"Payload per tick: {size / 1024:.1f} KiB | orjson: {'yes' if ORJSON_ENABLED else 'no (stdlib json)'}")
+    print(f"Before: {old:8.1f} us/tick")
+    print(f"After:  {new:8.1f} us/tick  ({old / new:.1f}x)")
+
+if __name__ == "__main__":
+    main()
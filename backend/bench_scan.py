@@ -0,0 +1,284 @@
+import argparse
+import asyncio
+import contextlib
+import datetime
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import metrics
+from metrics import LatencyHistogram
+from decoders import ORJSON_ENABLED
+from venue_client import HTTP2_ENABLED
+from fake_venues import FakeVenues, DEFAULT_PROFILES, VENUES, WS_RATE, point_fetchers_at
+from async_fetch import create_client
+from arbitrage_bot import check_arbitrage_async
+from arb_detector import ArbDetector
+from fetch_current_polymarket import fetch_polymarket_data_struct
+from fetch_current_kalshi import fetch_kalshi_data_struct
+from strategy import StrategySimulator
+from streaming import BookStore, PolymarketMarketFeed
+
+# Tick-to-trade benchmarks against the local venue stand-ins in fake_venues.py.
+# Every run is saved as JSON and compared with the previous run (or --baseline),
+# so a change to the fetch or strategy paths shows up as a regression report.
+
+BENCH_DIR = os.environ.get("BENCH_DIR", "bench_results")
+DURATION = 5.0              # Seconds per benchmark and concurrency level
+WARMUP_CALLS = 3
+CONCURRENCY = (1, 8)
+STRATEGY_TICKS = 200000
+
+# A p50/p99 this much slower (or throughput this much lower) than the baseline is a regression
+REGRESSION_THRESHOLD = 0.10
+
+# --- BENCHMARKS ---
+
+def result(name, concurrency, hist, errors, elapsed):
+    return {
+        "name": name,
+        "concurrency": concurrency,
+        "calls": hist.count,
+        "errors": errors,
+        "throughput": hist.count / elapsed if elapsed else 0.0,
+        "mean_ms": hist.total / hist.count / 1e6 if hist.count else 0.0,
+        "p50_ms": hist.quantile(0.5) / 1e6,
+        "p90_ms": hist.quantile(0.9) / 1e6,
+        "p99_ms": hist.quantile(0.99) / 1e6,
+        "max_ms": hist.max / 1e6,
+    }
+
+async def bench_check_arbitrage(concurrency, duration):
+    """
+    Full polled scan (fetch all venues, scan, size) with `concurrency` scans in flight on one client.
+    """
+    hist = LatencyHistogram("check_arbitrage")
+    async with create_client() as client:
+        # Scans print a report each; only the timing matters here
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            for _ in range(WARMUP_CALLS):
+                await check_arbitrage_async(client)
+            deadline = time.perf_counter() + duration
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter_ns()
+                    await check_arbitrage_async(client)
+                    hist.record(time.perf_counter_ns() - start)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+    # Fetch failures are printed ("Polymarket Error: ...") rather than raised
+    errors = out.getvalue().count("Error:") + metrics.histogram("scan_total").errors
+    return result("check_arbitrage", concurrency, hist, errors, elapsed)
+
+def bench_sync_fetch(name, fetch, concurrency, duration):
+    """
+    A sync (data, err) fetcher called back to back from `concurrency` threads.
+    """
+    hist = LatencyHistogram(name)
+    errors = [0]
+    lock = threading.Lock()
+    for _ in range(WARMUP_CALLS):
+        fetch()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter_ns()
+            data, err = fetch()
+            ns = time.perf_counter_ns() - start
+            with lock:
+                hist.record(ns)
+                if err:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return result(name, concurrency, hist, errors[0], time.perf_counter() - start)
+
+def bench_strategy_tick(ticks=STRATEGY_TICKS):
+    """
+    StrategySimulator.tick on a random-walk price stream; no I/O. Each tick is
+    timed on its own, so the numbers include ~0.1 us of timer overhead.
+    """
+    import random
+    rng = random.Random(0)
+    up = 0.5
+    stream = []
+    for _ in range(ticks):
+        up = min(max(up + rng.gauss(0, 0.01), 0.02), 0.98)
+        stream.append({"prices": {"Up": round(up + 0.005, 3), "Down": round(1 - up + 0.005, 3)}, "slug": "bench"})
+    sim = StrategySimulator(keep_history=False)
+    hist = LatencyHistogram("strategy_tick")
+    perf_ns = time.perf_counter_ns
+    start = time.perf_counter()
+    for data in stream:
+        t = perf_ns()
+        sim.tick(data)
+        hist.record(perf_ns() - t)
+    return result("strategy_tick", 1, hist, 0, time.perf_counter() - start)
+
+class TimedMarketFeed(PolymarketMarketFeed):
+    """
+    Market feed that remembers the stand-in's send time of the newest event.
+    """
+    last_sent_at = None
+
+    def handle(self, msg):
+        super().handle(msg)
+        if isinstance(msg, dict) and "sent_at" in msg:
+            self.last_sent_at = msg["sent_at"]
+
+async def bench_stream_update(ws_url, tokens, duration):
+    """
+    Market-channel event to ArbDetector update, the streaming bot's hot path.
+    Latency is measured from the stand-in's send time to the end of the
+    detector update (same host, so wall clocks agree).
+    """
+    store = BookStore()
+    listener = store.subscribe()
+    feed = TimedMarketFeed(store, tokens.values(), url=ws_url)
+    detector = ArbDetector()
+    detector.reset(97000.0, 0.0, 0.0, [(97000.0 + i * 250, 0.45, 0.55) for i in range(-20, 20)])
+    hist = LatencyHistogram("stream_update")
+    task = asyncio.create_task(feed.run())
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    try:
+        while time.perf_counter() < deadline:
+            try:
+                await asyncio.wait_for(listener.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+            books = [store.book(t) for t in tokens.values()]
+            if not all(b.synced for b in books) or feed.last_sent_at is None:
+                continue
+            up, down = (b.best_ask() or 0.0 for b in books)
+            detector.update_poly(up=up, down=down)
+            hist.record(int((time.time() - feed.last_sent_at) * 1e9))
+    finally:
+        feed.stop()
+        task.cancel()
+    return result("stream_update", 1, hist, feed.resyncs, time.perf_counter() - start)
+
+def run_benchmarks(venues, concurrency, duration):
+    results = []
+    for level in concurrency:
+        for name, fetch in (("fetch_polymarket_data_struct", fetch_polymarket_data_struct),
+                            ("fetch_kalshi_data_struct", fetch_kalshi_data_struct)):
+            metrics.reset()
+            results.append(bench_sync_fetch(name, fetch, level, duration) | {"stages": metrics.metrics_summary()})
+            print_result(results[-1])
+        metrics.reset()
+        results.append(asyncio.run(bench_check_arbitrage(level, duration)) | {"stages": metrics.metrics_summary()})
+        print_result(results[-1])
+    results.append(asyncio.run(bench_stream_update(venues.urls["polymarket_ws"], venues.urls["tokens"], duration)))
+    print_result(results[-1])
+    metrics.reset()
+    results.append(bench_strategy_tick())
+    print_result(results[-1])
+    return results
+
+# --- REPORT ---
+
+def print_result(r):
+    print(f"{r['name']:<30} x{r['concurrency']:<3} {r['calls']:>8} calls {r['throughput']:>10.1f}/s | "
+          f"p50 {r['p50_ms']:>8.3f} ms  p99 {r['p99_ms']:>8.3f} ms  max {r['max_ms']:>8.3f} ms | errors {r['errors']}")
+
+def latest_report(directory=BENCH_DIR):
+    reports = sorted(glob.glob(os.path.join(directory, "scan-*.json")))
+    return reports[-1] if reports else None
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Rows of (key, metric, before, after, change, verdict) for every benchmark
+    present in both reports. Latencies regress upwards, throughput downwards.
+    """
+    before = {(r["name"], r["concurrency"]): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        key = (r["name"], r["concurrency"])
+        if key not in before:
+            continue
+        for metric, higher_is_worse in (("p50_ms", True), ("p99_ms", True), ("throughput", False)):
+            old, new = before[key][metric], r[metric]
+            change = (new - old) / old if old else 0.0
+            worse = change if higher_is_worse else -change
+            verdict = "REGRESSION" if worse > threshold else ("improved" if worse < -threshold else "")
+            rows.append((key, metric, old, new, change, verdict))
+    return rows
+
+def print_comparison(rows, baseline_path, threshold=REGRESSION_THRESHOLD):
+    print(f"\nCompared with {baseline_path}:")
+    print(f"{'benchmark':<36} {'metric':<11} {'before':>10} {'after':>10} {'change':>8}")
+    for (name, level), metric, old, new, change, verdict in rows:
+        print(f"{name + ' x' + str(level):<36} {metric:<11} {old:>10.3f} {new:>10.3f} {change:>+7.1%}  {verdict}")
+    regressions = sum(1 for row in rows if row[-1] == "REGRESSION")
+    print(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+def parse_profiles(latency, jitter):
+    if latency is None and jitter is None:
+        return dict(DEFAULT_PROFILES)
+    return {v: (DEFAULT_PROFILES[v][0] if latency is None else latency,
+                DEFAULT_PROFILES[v][1] if jitter is None else jitter) for v in VENUES}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scan paths against local venue stand-ins.")
+    parser.add_argument("--seed-file", default=None, help="Market dump the stand-ins take token ids from (e.g. ../api_response.json)")
+    parser.add_argument("--latency", type=float, default=None, help="Response latency of every venue in ms (default: per-venue profile)")
+    parser.add_argument("--jitter", type=float, default=None, help="Gaussian jitter of every venue in ms")
+    parser.add_argument("--concurrency", default=",".join(map(str, CONCURRENCY)), help="Comma-separated load levels")
+    parser.add_argument("--duration", type=float, default=DURATION, help="Seconds per benchmark")
+    parser.add_argument("--ws-rate", type=float, default=WS_RATE, help="Market-channel events per second")
+    parser.add_argument("--baseline", default=None, help="Report to compare with (default: the latest in BENCH_DIR)")
+    parser.add_argument("--save", default=None, help="Where to write this run's report")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    profiles = parse_profiles(args.latency, args.jitter)
+    concurrency = [int(c) for c in args.concurrency.split(",") if c]
+    baseline_path = args.baseline or latest_report()
+
+    with FakeVenues(profiles, seed_path=args.seed_file, ws_rate=args.ws_rate) as venues:
+        restore = point_fetchers_at(venues.urls)
+        try:
+            results = run_benchmarks(venues, concurrency, args.duration)
+        finally:
+            restore()
+
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "orjson": ORJSON_ENABLED,
+        "http2": HTTP2_ENABLED,
+        "profiles": profiles,
+        "duration": args.duration,
+        "results": results,
+    }
+    save_path = args.save or os.path.join(BENCH_DIR, f"scan-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+    with open(save_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to {save_path}")
+
+    if baseline_path and os.path.abspath(baseline_path) != os.path.abspath(save_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        if print_comparison(compare(baseline, report, args.threshold), baseline_path, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
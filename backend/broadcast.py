@@ -0,0 +1,156 @@
+import asyncio
+import itertools
+import json
+import time
+from collections import deque
+
+# Updates kept for clients that fall behind or reconnect with Last-Event-ID
+BUFFER_SIZE = 256
+# Events (e.g. fills) included in the snapshot a new client starts from
+RECENT_EVENTS = 10
+HEARTBEAT_INTERVAL = 15.0
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+_SAME = object()
+
+def diff(old, new):
+    """
+    The parts of `new` that differ from `old`: changed keys only, recursing
+    into nested dicts. Keys that disappeared map to None. Returns _SAME when
+    nothing changed.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = {}
+        for key, value in new.items():
+            if key not in old:
+                changes[key] = value
+                continue
+            change = diff(old[key], value)
+            if change is not _SAME:
+                changes[key] = change
+        for key in old:
+            if key not in new:
+                changes[key] = None
+        return changes if changes else _SAME
+    return _SAME if old == new else new
+
+def sse_frame(kind, seq, payload):
+    data = json.dumps(payload, separators=(",", ":"))
+    return f"id: {seq}\nevent: {kind}\ndata: {data}\n\n".encode()
+
+class Broadcaster:
+    """
+    Fans one stream of state updates out to any number of Server-Sent Events
+    clients.
+
+    publish() diffs the new state against the last one and serializes the
+    delta once into a shared ring buffer; every client streams the same bytes
+    from that buffer. A client starts from a snapshot (the full state plus the
+    recent events) and then receives deltas. A client that reconnects with
+    Last-Event-ID is replayed the deltas it missed. A client that falls further
+    behind than the buffer, or whose id is not one this broadcaster sent, gets
+    a fresh snapshot.
+
+    publish() must be called from the event loop thread.
+    """
+    def __init__(self, buffer_size=BUFFER_SIZE, recent_events=RECENT_EVENTS):
+        self.state = {}
+        self.recent = deque(maxlen=recent_events)
+        self.buffer = deque(maxlen=buffer_size)  # (seq, frame)
+        self.seq = 0
+        self.clients = 0
+        self._wake = asyncio.Event()
+        self._snapshot = (None, None)
+
+    def publish(self, state, events=(), snapshot=False, seq=None):
+        """
+        Sends what changed in `state` plus any new `events`. With snapshot=True
+        every client is sent the full state instead and the recent events are
+        replaced (e.g. after a reset). `seq` is the update's event id, for
+        broadcasters that mirror an upstream with its own numbering; it must
+        increase except on a snapshot, and defaults to the next local number.
+        Returns the update's
+        seq, or None when nothing changed.
+        """
+        events = list(events)
+        seq = self.seq + 1 if seq is None else seq
+        if seq <= self.seq:
+            if not snapshot:
+                raise ValueError(f"seq {seq} does not follow {self.seq}")
+            # The upstream started over: no id sent so far can be resumed from
+            self.buffer.clear()
+        if snapshot:
+            self.recent.clear()
+            self.recent.extend(events)
+            self.state = state
+            self.seq = seq
+            frame = self.snapshot_frame()
+        else:
+            changes = diff(self.state, state)
+            if changes is _SAME and not events:
+                return None
+            self.state = state
+            self.recent.extend(events)
+            self.seq = seq
+            payload = {"seq": self.seq, "ts": time.time(),
+                       "state": {} if changes is _SAME else changes, "events": events}
+            frame = sse_frame(DELTA, self.seq, payload)
+        self.buffer.append((self.seq, frame))
+        wake, self._wake = self._wake, asyncio.Event()
+        wake.set()
+        return self.seq
+
+    def snapshot_frame(self):
+        seq, frame = self._snapshot
+        if seq != self.seq:
+            payload = {"seq": self.seq, "ts": time.time(), "state": self.state, "events": list(self.recent)}
+            frame = sse_frame(SNAPSHOT, self.seq, payload)
+            self._snapshot = (self.seq, frame)
+        return frame
+
+    def _pending(self, seq):
+        """
+        Buffered frames after `seq`, or None when `seq` is not an update still
+        in the buffer (already dropped, or never sent by this broadcaster).
+        """
+        if seq == self.seq:
+            return []
+        if not self.buffer:
+            return None
+        start = seq - self.buffer[0][0]
+        if not (0 <= start < len(self.buffer) and self.buffer[start][0] == seq):
+            # Ids with gaps (see publish): look the update up
+            start = next((i for i, (s, _) in enumerate(self.buffer) if s == seq), None)
+            if start is None:
+                return None
+        return [frame for _, frame in itertools.islice(self.buffer, start + 1, None)]
+
+    async def frames(self, last_seq=None):
+        """
+        SSE byte stream for one client. Pass the client's Last-Event-ID to resume.
+        """
+        self.clients += 1
+        try:
+            seq = last_seq
+            if seq is None or self._pending(seq) is None:
+                seq = self.seq
+                yield self.snapshot_frame()
+            while True:
+                wake = self._wake
+                pending = self._pending(seq)
+                if pending is None:
+                    seq = self.seq
+                    yield self.snapshot_frame()
+                    continue
+                if pending:
+                    seq = self.seq
+                    yield b"".join(pending)
+                    continue
+                try:
+                    await asyncio.wait_for(wake.wait(), HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+        finally:
+            self.clients -= 1
@@ -0,0 +1,148 @@
+import json
+
+try:
+    import orjson
+    loads = orjson.loads
+    ORJSON_ENABLED = True
+except ImportError:
+    loads = json.loads
+    ORJSON_ENABLED = False
+
+def dumps(obj):
+    """
+    Compact JSON as bytes, with orjson when available.
+    """
+    if ORJSON_ENABLED:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+# Venue responses are decoded straight from the raw body into small typed
+# objects, reading only the fields the bot uses.
+
+def response_json(response):
+    """
+    Drop-in for response.json() on requests/httpx responses.
+    """
+    return loads(response.content)
+
+def _json_list(value):
+    # Gamma sends list fields as JSON strings, e.g. '["Up", "Down"]'
+    if not value:
+        return []
+    if isinstance(value, str):
+        return loads(value)
+    return list(value)
+
+# --- POLYMARKET ---
+
+class GammaMarket:
+    """
+    The first market of a Gamma event.
+    """
+    __slots__ = ("slug", "outcomes", "token_ids", "outcome_prices")
+
+    def __init__(self, slug, outcomes, token_ids, outcome_prices):
+        self.slug = slug
+        self.outcomes = outcomes
+        self.token_ids = token_ids
+        self.outcome_prices = outcome_prices
+
+    def tokens(self):
+        return dict(zip(self.outcomes, self.token_ids))
+
+    def prices(self):
+        return dict(zip(self.outcomes, self.outcome_prices))
+
+def decode_gamma_event(data):
+    """
+    Decodes a Gamma /events?slug= response (raw bytes or already parsed).
+    Returns None when the event or its market is missing.
+    """
+    events = loads(data) if isinstance(data, (bytes, str)) else data
+    if not events:
+        return None
+    event = events[0]
+    markets = event.get("markets")
+    if not markets:
+        return None
+    market = markets[0]
+    return GammaMarket(
+        event.get("slug"),
+        _json_list(market.get("outcomes")),
+        _json_list(market.get("clobTokenIds")),
+        [float(p) for p in _json_list(market.get("outcomePrices"))]
+    )
+
+class ClobBook:
+    """
+    CLOB book levels as (price, size) floats, in the order the venue sent them.
+    """
+    __slots__ = ("bids", "asks")
+
+    def __init__(self, bids, asks):
+        self.bids = bids
+        self.asks = asks
+
+def decode_levels(levels):
+    return [(float(l["price"]), float(l["size"])) for l in levels or ()]
+
+def decode_clob_book(data):
+    """
+    Decodes a CLOB /book response or a market-channel "book" event (raw bytes or parsed).
+    """
+    if isinstance(data, (bytes, str)):
+        data = loads(data)
+    return ClobBook(decode_levels(data.get("bids")), decode_levels(data.get("asks")))
+
+# --- KALSHI ---
+
+class KalshiMarket:
+    """
+    One strike of a Kalshi event. Prices are integer cents.
+    """
+    __slots__ = ("ticker", "subtitle", "strike", "yes_bid", "yes_ask", "no_bid", "no_ask")
+
+    def __init__(self, ticker, subtitle, strike, yes_bid, yes_ask, no_bid, no_ask):
+        self.ticker = ticker
+        self.subtitle = subtitle
+        self.strike = strike
+        self.yes_bid = yes_bid
+        self.yes_ask = yes_ask
+        self.no_bid = no_bid
+        self.no_ask = no_ask
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+def decode_kalshi_markets(data):
+    """
+    Returns the raw market rows of a Kalshi /markets response; see
+    fetch_current_kalshi.parse_kalshi_markets for the typed conversion.
+    """
+    if isinstance(data, (bytes, str)):
+        data = loads(data)
+    return data.get("markets", [])
+
+# --- BINANCE ---
+
+def decode_binance_price(data):
+    if isinstance(data, (bytes, str)):
+        data = loads(data)
+    return float(data["price"])
+
+def decode_binance_prices(data):
+    """
+    {symbol: price} from a multi-symbol /ticker/price response.
+    """
+    if isinstance(data, (bytes, str)):
+        data = loads(data)
+    return {row["symbol"]: float(row["price"]) for row in data}
+
+def decode_kline_open(data):
+    """
+    Open price of the first kline, or None when there is none yet.
+    Kline format: [Open time, Open, High, Low, Close, Volume, ...]
+    """
+    if isinstance(data, (bytes, str)):
+        data = loads(data)
+    return float(data[0][1]) if data else None
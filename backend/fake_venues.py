@@ -0,0 +1,313 @@
+import asyncio
+import json
+import math
+import multiprocessing
+import random
+import time
+from urllib.parse import urlsplit, parse_qs
+import websockets
+from market_catalog import iter_markets
+
+# Local stand-ins for the Gamma, CLOB, Kalshi and Binance endpoints the fetchers
+# use, for benchmarks and offline runs. They serve payloads shaped like the real
+# responses around one random-walk BTC price, with configurable latency and jitter.
+
+# Per-venue (latency_ms, jitter_ms), roughly what a cloud box in us-east sees
+DEFAULT_PROFILES = {
+    "gamma": (60.0, 20.0),
+    "clob": (25.0, 8.0),
+    "kalshi": (35.0, 10.0),
+    "binance": (15.0, 5.0),
+}
+VENUES = tuple(DEFAULT_PROFILES)
+
+SPOT_PRICE = 97000.0
+SPOT_VOLATILITY = 15.0      # Dollars per price step
+PROB_SCALE = 1500.0         # Dollars above the open that move Up from 50% to ~84%
+STRIKE_STEP = 250
+STRIKE_COUNT = 40
+BOOK_LEVELS = 30
+WS_RATE = 200.0             # Market-channel price changes per second
+
+HOST = "127.0.0.1"
+MAX_HEADER_BYTES = 1 << 16
+
+# --- MARKET STATE ---
+
+def load_seed_market(path):
+    """
+    First two-outcome market of a CLOB or Gamma dump (e.g. api_response.json),
+    whose token ids and question are reused by the stand-ins.
+    """
+    with open(path, "rb") as f:
+        for market in iter_markets(f.read):
+            if len(market["tokens"]) == 2 and all(market["tokens"].values()):
+                return market
+    return None
+
+class VenueState:
+    """
+    One random-walk market behind every stand-in. Polymarket Up/Down and the
+    Kalshi ladder are priced off the same spot with independent noise, so scans
+    see realistic prices and the occasional sub-$1 pair.
+    """
+    def __init__(self, seed_market=None, spot=SPOT_PRICE, seed=0):
+        self.rng = random.Random(seed)
+        if seed_market:
+            token_ids = list(seed_market["tokens"].values())
+            self.question = seed_market["question"]
+        else:
+            token_ids = [str(self.rng.getrandbits(250)) for _ in range(2)]
+            self.question = "Bitcoin Up or Down"
+        self.tokens = dict(zip(("Up", "Down"), token_ids))
+        self.open_price = spot
+        self.spot = spot
+        self.strikes = [spot + (i - STRIKE_COUNT // 2) * STRIKE_STEP for i in range(STRIKE_COUNT)]
+
+    def step(self):
+        self.spot += self.rng.gauss(0.0, SPOT_VOLATILITY)
+
+    def prob_above(self, strike):
+        return 1.0 / (1.0 + math.exp(-(self.spot - strike) / (PROB_SCALE / 1.7)))
+
+    def poly_mid(self, outcome):
+        up = self.prob_above(self.open_price)
+        return up if outcome == "Up" else 1.0 - up
+
+    # --- PAYLOADS ---
+
+    def gamma_events(self, slug):
+        market = {
+            "question": self.question, "slug": slug, "conditionId": "0x" + "ab" * 32,
+            "outcomes": json.dumps(list(self.tokens)), "clobTokenIds": json.dumps(list(self.tokens.values())),
+            "outcomePrices": json.dumps([f"{self.poly_mid(o):.3f}" for o in self.tokens]),
+            "active": True, "closed": False, "enableOrderBook": True, "orderPriceMinTickSize": 0.001,
+            "description": "This market will resolve to Up if the close is at or above the open. " * 8,
+        }
+        return [{"id": "98765", "ticker": slug, "slug": slug, "title": self.question, "markets": [market]}]
+
+    def clob_book(self, token_id):
+        self.step()
+        outcome = next((o for o, t in self.tokens.items() if t == token_id), "Up")
+        mid = min(max(self.poly_mid(outcome), 0.02), 0.98)
+        spread = self.rng.uniform(0.002, 0.012)
+        bids = [{"price": f"{max(mid - spread - i * 0.001, 0.001):.3f}", "size": f"{self.rng.uniform(20, 400):.2f}"}
+                for i in range(BOOK_LEVELS)]
+        asks = [{"price": f"{min(mid + spread + i * 0.001, 0.999):.3f}", "size": f"{self.rng.uniform(20, 400):.2f}"}
+                for i in range(BOOK_LEVELS)]
+        # The CLOB lists both sides from the far end of the book inwards
+        return {"market": "0x" + "ab" * 32, "asset_id": token_id, "timestamp": str(int(time.time() * 1000)),
+                "bids": bids[::-1], "asks": asks[::-1], "tick_size": "0.001", "neg_risk": False}
+
+    def kalshi_cents(self, strike):
+        yes = int(round(self.prob_above(strike) * 100))
+        yes_bid = min(max(yes - 1 + self.rng.randint(-1, 1), 1), 98)
+        no_bid = min(max(100 - yes - 1 + self.rng.randint(-1, 1), 1), 98)
+        return yes_bid, 100 - no_bid, no_bid, 100 - yes_bid
+
+    def kalshi_markets(self, event_ticker):
+        self.step()
+        markets = []
+        for strike in self.strikes:
+            yes_bid, yes_ask, no_bid, no_ask = self.kalshi_cents(strike)
+            markets.append({
+                "ticker": f"{event_ticker}-T{strike - 0.01:.2f}", "event_ticker": event_ticker,
+                "market_type": "binary", "subtitle": f"${strike:,.0f} or above", "status": "active",
+                "yes_bid": yes_bid, "yes_ask": yes_ask, "no_bid": no_bid, "no_ask": no_ask,
+                "last_price": yes_bid, "volume": 1234, "open_interest": 4321, "strike_type": "greater",
+                "floor_strike": strike - 0.01, "rules_primary": "If the price is above the strike... " * 4,
+            })
+        return {"markets": markets, "cursor": ""}
+
+    def kalshi_orderbook(self, ticker):
+        strike = float(ticker.rsplit("-T", 1)[-1]) + 0.01 if "-T" in ticker else self.open_price
+        yes_bid, _, no_bid, _ = self.kalshi_cents(strike)
+        levels = lambda best: [[p, self.rng.randint(10, 500)] for p in range(max(best - 9, 1), best + 1)]
+        return {"orderbook": {"yes": levels(yes_bid), "no": levels(no_bid)}}
+
+    def binance_price(self, symbol):
+        self.step()
+        return {"symbol": symbol, "price": f"{self.spot:.8f}"}
+
+    def binance_klines(self, start_ms):
+        o = self.open_price
+        return [[start_ms, f"{o:.8f}", f"{o + 120:.8f}", f"{o - 80:.8f}", f"{self.spot:.8f}", "812.5",
+                 start_ms + 3599999, "78900000.0", 51234, "401.2", "38900000.0", "0"]]
+
+    # --- ROUTES ---
+
+    def route(self, venue, method, path, query, body=b""):
+        """
+        Returns (status, payload) for one request to a stand-in.
+        """
+        arg = lambda name, default="": query.get(name, [default])[0]
+        if venue == "gamma" and path == "/events":
+            return 200, self.gamma_events(arg("slug"))
+        if venue == "clob" and path == "/book":
+            return 200, self.clob_book(arg("token_id"))
+        if venue == "clob" and path == "/books" and method == "POST":
+            return 200, [self.clob_book(item["token_id"]) for item in json.loads(body or b"[]")]
+        if venue == "kalshi" and path == "/trade-api/v2/markets":
+            return 200, self.kalshi_markets(arg("event_ticker"))
+        if venue == "kalshi" and path.startswith("/trade-api/v2/markets/") and path.endswith("/orderbook"):
+            return 200, self.kalshi_orderbook(path.split("/")[-2])
+        if venue == "binance" and path == "/api/v3/ticker/price" and "symbols" in query:
+            return 200, [self.binance_price(symbol) for symbol in json.loads(arg("symbols"))]
+        if venue == "binance" and path == "/api/v3/ticker/price":
+            return 200, self.binance_price(arg("symbol", "BTCUSDT"))
+        if venue == "binance" and path == "/api/v3/klines":
+            return 200, self.binance_klines(int(arg("startTime", "0")))
+        return 404, {"error": f"no route for {method} {path}"}
+
+# --- SERVERS ---
+
+class VenueServer:
+    """
+    Minimal keep-alive HTTP/1.1 server for one venue. Each response waits
+    latency +/- jitter (gaussian, never negative) before it is written.
+    """
+    def __init__(self, venue, state, latency_ms, jitter_ms):
+        self.venue = venue
+        self.state = state
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.requests = 0
+        self.server = None
+
+    def delay(self):
+        return max(0.0, self.state.rng.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                headers = dict((k.strip().lower(), v.strip()) for k, _, v in (l.partition(":") for l in lines[1:] if l))
+                length = int(headers.get("content-length") or 0)
+                body = await reader.readexactly(length) if length else b""
+                self.requests += 1
+                await asyncio.sleep(self.delay())
+                url = urlsplit(target)
+                status, payload = self.state.route(self.venue, method, url.path, parse_qs(url.query), body)
+                body = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, HOST, 0, limit=MAX_HEADER_BYTES)
+        return self.server.sockets[0].getsockname()[1]
+
+class MarketChannelServer:
+    """
+    Polymarket market channel stand-in: a "book" snapshot per subscribed token,
+    then price_change events at `rate` per second. Each event carries `sent_at`
+    (time.time()) so a client can measure tick-to-detect latency.
+    """
+    def __init__(self, state, rate=WS_RATE):
+        self.state = state
+        self.rate = rate
+
+    async def serve(self, ws):
+        try:
+            await self._stream(ws)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _stream(self, ws):
+        subscription = json.loads(await ws.recv())
+        token_ids = subscription.get("assets_ids") or list(self.state.tokens.values())
+        await ws.send(json.dumps([self.state.clob_book(t) | {"event_type": "book"} for t in token_ids]))
+        interval = 1.0 / self.rate
+        next_send = time.perf_counter()
+        while True:
+            token_id = self.state.rng.choice(token_ids)
+            book = self.state.clob_book(token_id)
+            best = book["asks"][-1]
+            await ws.send(json.dumps({
+                "event_type": "price_change", "asset_id": token_id, "sent_at": time.time(),
+                "changes": [{"price": best["price"], "side": "SELL", "size": best["size"]}]
+            }))
+            next_send += interval
+            await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+
+async def _run(conn, profiles, seed_path, ws_rate, seed):
+    state = VenueState(load_seed_market(seed_path) if seed_path else None, seed=seed)
+    urls = {}
+    for venue in VENUES:
+        latency, jitter = profiles.get(venue, DEFAULT_PROFILES[venue])
+        port = await VenueServer(venue, state, latency, jitter).start()
+        urls[venue] = f"http://{HOST}:{port}"
+    ws_server = await websockets.serve(MarketChannelServer(state, ws_rate).serve, HOST, 0)
+    urls["polymarket_ws"] = f"ws://{HOST}:{ws_server.sockets[0].getsockname()[1]}"
+    urls["tokens"] = state.tokens
+    conn.send(urls)
+    await asyncio.Future()
+
+def _serve(conn, profiles, seed_path, ws_rate, seed):
+    try:
+        asyncio.run(_run(conn, profiles, seed_path, ws_rate, seed))
+    except KeyboardInterrupt:
+        pass
+
+class FakeVenues:
+    """
+    Runs every stand-in in a child process, so the servers never share an event
+    loop (or a Python thread) with the code being measured:
+
+        with FakeVenues(seed_path="../api_response.json") as venues:
+            restore = point_fetchers_at(venues.urls)
+    """
+    def __init__(self, profiles=None, seed_path=None, ws_rate=WS_RATE, seed=0):
+        self.profiles = dict(DEFAULT_PROFILES, **(profiles or {}))
+        self.seed_path = seed_path
+        self.ws_rate = ws_rate
+        self.seed = seed
+        self.process = None
+        self.urls = None
+
+    def __enter__(self):
+        parent, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(child, self.profiles, self.seed_path, self.ws_rate, self.seed), daemon=True
+        )
+        self.process.start()
+        self.urls = parent.recv()
+        return self
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.join()
+
+def point_fetchers_at(urls):
+    """
+    Repoints the fetch modules' endpoint constants at the stand-ins.
+    Returns a function that restores the real endpoints.
+    """
+    import fetch_current_polymarket as poly
+    import fetch_current_kalshi as kalshi
+    kalshi_markets = urls["kalshi"] + "/trade-api/v2/markets"
+    targets = [
+        (poly, "POLYMARKET_API_URL", urls["gamma"] + "/events"),
+        (poly, "CLOB_API_URL", urls["clob"] + "/book"),
+        (poly, "CLOB_BOOKS_URL", urls["clob"] + "/books"),
+        (kalshi, "KALSHI_API_URL", kalshi_markets),
+        (kalshi, "KALSHI_ORDERBOOK_URL", kalshi_markets + "/{ticker}/orderbook"),
+        (kalshi, "BINANCE_PRICE_URL", urls["binance"] + "/api/v3/ticker/price"),
+        (kalshi, "BINANCE_KLINES_URL", urls["binance"] + "/api/v3/klines"),
+    ]
+    saved = [(module, name, getattr(module, name)) for module, name, _ in targets]
+    for module, name, url in targets:
+        setattr(module, name, url)
+
+    def restore():
+        for module, name, url in saved:
+            setattr(module, name, url)
+    return restore
@@ -1,52 +1,124 @@
-import requests
+import venue_client
 import datetime
 import pytz
 import re
-from get_current_markets import get_current_market_urls
+from market_schedule import SCHEDULE
+from async_fetch import get_json, gather_results
+from order_book import OrderBook
+from ttl_cache import TTLCache
+from decoders import (KalshiMarket, dumps, response_json, decode_kalshi_markets, decode_binance_price,
+                      decode_binance_prices, decode_kline_open)
+from metrics import timed
 
 # Configuration
 KALSHI_API_URL = "https://api.elections.kalshi.com/trade-api/v2/markets"
+KALSHI_ORDERBOOK_URL = KALSHI_API_URL + "/{ticker}/orderbook"
 BINANCE_PRICE_URL = "https://api.binance.com/api/v3/ticker/price"
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
 SYMBOL = "BTCUSDT"
 
+# Kalshi prices are integer cents, so books use 1 cent ticks
+KALSHI_TICK_SIZE = 1
+
+# One book per market ticker, refilled in place on every poll
+KALSHI_BOOKS = {}
+
+# Event ticker -> {market ticker: strike}. A market's strike never changes,
+# so each subtitle is parsed once instead of on every poll
+KALSHI_STRIKES = TTLCache("kalshi_strikes", ttl=2 * 3600, max_size=64)
+
+# Price to beat of a contract: the open of the 1m candle starting with it, by
+# (symbol, start in ms); fixed once the candle exists. Kept for two days so
+# daily contracts hit it all period.
+BINANCE_OPENS = TTLCache("binance_opens", ttl=2 * 86400, max_size=256)
+
+@timed("binance_price")
 def get_binance_current_price():
     try:
-        response = requests.get(BINANCE_PRICE_URL, params={"symbol": SYMBOL})
+        response = venue_client.get(BINANCE_PRICE_URL, params={"symbol": SYMBOL})
         response.raise_for_status()
-        data = response.json()
-        return float(data["price"]), None
+        return decode_binance_price(response.content), None
     except Exception as e:
         return None, str(e)
 
+@timed("kalshi_markets")
 def get_kalshi_markets(event_ticker):
     try:
         params = {"limit": 100, "event_ticker": event_ticker}
-        response = requests.get(KALSHI_API_URL, params=params)
+        response = venue_client.get(KALSHI_API_URL, params=params)
+        response.raise_for_status()
+        return decode_kalshi_markets(response.content), None
+    except Exception as e:
+        return None, str(e)
+
+def get_ticker_book(ticker):
+    if ticker not in KALSHI_BOOKS:
+        KALSHI_BOOKS[ticker] = OrderBook(KALSHI_TICK_SIZE)
+    return KALSHI_BOOKS[ticker]
+
+def fill_kalshi_book(book, orderbook):
+    """
+    Loads a Kalshi orderbook ({"yes": [[price, qty]], "no": [[price, qty]]}, both bids)
+    into an OrderBook. A NO bid at p is a YES ask at 100 - p, so best_ask() is the
+    YES ask and 100 - best_bid() is the NO ask.
+    """
+    book.apply_snapshot(
+        [(p, q) for p, q in orderbook.get('yes') or []],
+        [(100 - p, q) for p, q in orderbook.get('no') or []]
+    )
+    return book
+
+@timed("kalshi_orderbook")
+def get_kalshi_orderbook(ticker):
+    try:
+        response = venue_client.get(KALSHI_ORDERBOOK_URL.format(ticker=ticker))
         response.raise_for_status()
-        data = response.json()
-        return data.get('markets', []), None
+        orderbook = response_json(response).get('orderbook', {})
+        return fill_kalshi_book(get_ticker_book(ticker), orderbook), None
     except Exception as e:
         return None, str(e)
 
 def parse_strike(subtitle):
-    # Format: "$96,250 or above"
+    # Format: "$96,250 or above" (or "$187.50 or above" for cheaper assets)
     # Extract number, remove commas
-    match = re.search(r'\$([\d,]+)', subtitle)
+    match = re.search(r'\$([\d,]+(?:\.\d+)?)', subtitle)
     if match:
         return float(match.group(1).replace(',', ''))
     return 0.0
 
+@timed("parse_kalshi_markets")
+def parse_kalshi_markets(markets, event_ticker=None):
+    """
+    Turns raw Kalshi market rows into strike-sorted KalshiMarkets, dropping rows without a strike.
+    With an event_ticker, strikes are memoized per market ticker.
+    """
+    strikes = KALSHI_STRIKES.get(event_ticker, lambda: ({}, None))[0] if event_ticker else {}
+    market_data = []
+    for m in markets:
+        ticker = m.get('ticker')
+        strike = strikes.get(ticker)
+        if strike is None:
+            strike = parse_strike(m.get('subtitle', ''))
+            if ticker is not None:
+                strikes[ticker] = strike
+        if strike > 0:
+            market_data.append(KalshiMarket(
+                ticker, m.get('subtitle'), strike,
+                m.get('yes_bid', 0), m.get('yes_ask', 0), m.get('no_bid', 0), m.get('no_ask', 0)
+            ))
+            
+    # Sort by strike price
+    market_data.sort(key=lambda x: x.strike)
+    return market_data
+
+@timed("kalshi_fetch")
 def fetch_kalshi_data_struct():
     """
-    Fetches current Kalshi markets and returns a list of market dictionaries.
+    Fetches current Kalshi markets and returns the event with its KalshiMarket list.
     """
     try:
-        # Get current market info
-        market_info = get_current_market_urls()
-        kalshi_url = market_info["kalshi"]
-        
-        # Extract event ticker from URL
-        event_ticker = kalshi_url.split("/")[-1].upper()
+        # Current event ticker, from the market schedule
+        event_ticker = SCHEDULE.current().kalshi_event_ticker
         
         # Fetch Current BTC Price
         current_price, err = get_binance_current_price()
@@ -59,22 +131,7 @@ def fetch_kalshi_data_struct():
         if not markets:
             return [], None
             
-        # Parse strikes and sort
-        market_data = []
-        for m in markets:
-            strike = parse_strike(m.get('subtitle', ''))
-            if strike > 0:
-                market_data.append({
-                    'strike': strike,
-                    'yes_bid': m.get('yes_bid', 0),
-                    'yes_ask': m.get('yes_ask', 0),
-                    'no_bid': m.get('no_bid', 0),
-                    'no_ask': m.get('no_ask', 0),
-                    'subtitle': m.get('subtitle')
-                })
-                
-        # Sort by strike price
-        market_data.sort(key=lambda x: x['strike'])
+        market_data = parse_kalshi_markets(markets, event_ticker)
         
         return {
             "event_ticker": event_ticker,
@@ -85,6 +142,109 @@ def fetch_kalshi_data_struct():
     except Exception as e:
         return None, str(e)
 
+@timed("binance_price")
+async def get_binance_current_price_async(client):
+    try:
+        data = await get_json(client, BINANCE_PRICE_URL, params={"symbol": SYMBOL})
+        return decode_binance_price(data), None
+    except Exception as e:
+        return None, str(e)
+
+@timed("binance_price")
+async def get_binance_prices_async(client, symbols):
+    """
+    Last price of several symbols in one request, as {symbol: price}.
+    """
+    try:
+        params = {"symbols": dumps(sorted(set(symbols))).decode()}
+        return decode_binance_prices(await get_json(client, BINANCE_PRICE_URL, params=params)), None
+    except Exception as e:
+        return None, str(e)
+
+async def get_binance_hour_open_async(client, target_time):
+    """
+    Returns the open of the 1h Binance candle starting at target_time,
+    which is the "price to beat" of the hourly markets. Cached once found.
+    """
+    return await get_binance_open_async(client, SYMBOL, target_time)
+
+async def get_binance_open_async(client, symbol, target_time):
+    """
+    Price to beat of any contract starting at target_time: the open of the
+    candle starting then, which is the same for every candle interval.
+    """
+    start_ms = int(target_time.timestamp() * 1000)
+    return await BINANCE_OPENS.get_async((symbol, start_ms), lambda: fetch_binance_open_async(client, symbol, start_ms))
+
+@timed("binance_kline")
+async def fetch_binance_open_async(client, symbol, start_ms):
+    try:
+        params = {
+            "symbol": symbol,
+            "interval": "1m",
+            "startTime": start_ms,
+            "limit": 1
+        }
+        open_price = decode_kline_open(await get_json(client, BINANCE_KLINES_URL, params=params))
+        if open_price is None:
+            return None, "Candle not found yet (future?)"
+        return open_price, None
+    except Exception as e:
+        return None, str(e)
+
+@timed("kalshi_markets")
+async def get_kalshi_markets_async(client, event_ticker):
+    try:
+        params = {"limit": 100, "event_ticker": event_ticker}
+        return decode_kalshi_markets(await get_json(client, KALSHI_API_URL, params=params)), None
+    except Exception as e:
+        return None, str(e)
+
+@timed("kalshi_orderbook")
+async def get_kalshi_orderbook_async(client, ticker):
+    try:
+        data = await get_json(client, KALSHI_ORDERBOOK_URL.format(ticker=ticker))
+        return fill_kalshi_book(get_ticker_book(ticker), data.get('orderbook', {})), None
+    except Exception as e:
+        return None, str(e)
+
+async def fetch_kalshi_event_async(client, event_ticker):
+    """
+    Strike-sorted KalshiMarkets of one event.
+    """
+    markets, err = await get_kalshi_markets_async(client, event_ticker)
+    if err:
+        return None, f"Kalshi Error: {err}"
+    return parse_kalshi_markets(markets or [], event_ticker), None
+
+@timed("kalshi_fetch")
+async def fetch_kalshi_data_struct_async(client):
+    """
+    Async version of fetch_kalshi_data_struct.
+    The Binance price and the Kalshi markets are requested at the same time.
+    """
+    try:
+        event_ticker = SCHEDULE.current().kalshi_event_ticker
+        
+        (current_price, _), (markets, err) = await gather_results(
+            get_binance_current_price_async(client),
+            get_kalshi_markets_async(client, event_ticker)
+        )
+        if err:
+            return None, f"Kalshi Error: {err}"
+            
+        if not markets:
+            return [], None
+            
+        return {
+            "event_ticker": event_ticker,
+            "current_price": current_price,
+            "markets": parse_kalshi_markets(markets, event_ticker)
+        }, None
+        
+    except Exception as e:
+        return None, str(e)
+
 def main():
     data, err = fetch_kalshi_data_struct()
     
@@ -107,7 +267,7 @@ def main():
     min_diff = float('inf')
     
     for i, m in enumerate(market_data):
-        diff = abs(m['strike'] - current_price)
+        diff = abs(m.strike - current_price)
         if diff < min_diff:
             min_diff = diff
             closest_idx = i
@@ -124,8 +284,8 @@ def main():
     # Print Data
     print("-" * 30)
     for i, m in enumerate(selected_markets):
-        print(f"PRICE TO BEAT {i+1}: {m['subtitle']}")
-        print(f"BUY YES PRICE {i+1}: {m['yes_ask']}c, BUY NO PRICE {i+1}: {m['no_ask']}c")
+        print(f"PRICE TO BEAT {i+1}: {m.subtitle}")
+        print(f"BUY YES PRICE {i+1}: {m.yes_ask}c, BUY NO PRICE {i+1}: {m.no_ask}c")
         print()
 
 if __name__ == "__main__":
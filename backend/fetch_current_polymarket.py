@@ -1,77 +1,342 @@
-import requests
 import datetime
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import venue_client
+from async_fetch import get_json
+from order_book import OrderBook
+from market_schedule import SCHEDULE, PREFETCH_LEAD
+from ttl_cache import TTLCache
+from decoders import loads, decode_clob_book, decode_gamma_event
+from metrics import timed
 
 # API Endpoints
 POLYMARKET_API_URL = "https://gamma-api.polymarket.com/events"
 CLOB_API_URL = "https://clob.polymarket.com/book"
+CLOB_BOOKS_URL = "https://clob.polymarket.com/books"
+
+# Tokens per POST /books request, and GET /book requests in flight when the
+# batch endpoint is unavailable
+CLOB_BATCH_SIZE = 100
+CLOB_CONCURRENCY = 8
+
+# Polymarket quotes in dollars down to 0.001 near the extremes
+CLOB_TICK_SIZE = 0.001
+
+# One book per token, refilled in place on every poll
+CLOB_BOOKS = {}
+
+# Gamma slug -> {outcome: clob_token_id}; token ids never change, so entries live until the market ends
+GAMMA_TOKENS = TTLCache("gamma_tokens", max_size=64)
 
 def get_market_slug():
-    # 1. Get LOCAL system time (No UTC, matches your PC clock)
-    now = datetime.datetime.now()
-    
-    # 2. User Rule: "1 hour behind the calculation"
-    # If it is 9:XX PM, we target the 9 PM market (not 10 PM).
-    # We simply take the current hour.
-    target_time = now.replace(minute=0, second=0, microsecond=0)
-    
-    # 3. Format the slug parts
-    month = target_time.strftime("%B").lower()  # e.g., "december"
-    day = target_time.day                       # e.g., 12
-    hour_int = int(target_time.strftime("%I"))  # e.g., 9 (12-hour format)
-    am_pm = target_time.strftime("%p").lower()  # e.g., "pm"
-    
-    # 4. Construct Slug
-    slug = f"bitcoin-up-or-down-{month}-{day}-{hour_int}{am_pm}-et"
-    return slug
+    # The current hour's slug, built once per hour by the market schedule (see market_universe)
+    return SCHEDULE.current().poly_slug
+
+def get_token_book(token_id):
+    if token_id not in CLOB_BOOKS:
+        CLOB_BOOKS[token_id] = OrderBook(CLOB_TICK_SIZE)
+    return CLOB_BOOKS[token_id]
+
+@timed("parse_clob_book")
+def fill_clob_book(book, data):
+    """
+    Loads a CLOB /book payload (raw or parsed, or a market-channel "book" event) into an OrderBook.
+    """
+    clob = decode_clob_book(data)
+    book.apply_snapshot(clob.bids, clob.asks)
+    return book
+
+@timed("clob_book")
+def get_clob_book(token_id):
+    response = venue_client.get(CLOB_API_URL, params={"token_id": token_id})
+    return fill_clob_book(get_token_book(token_id), response.content)
+
+# --- BATCHED BOOKS ---
+
+BOOK_OK = "ok"
+BOOK_EMPTY = "empty"        # The book has no asks to buy from
+BOOK_MISSING = "missing"    # The venue sent no book for the token
+BOOK_ERROR = "error"        # The request failed
+
+# Cleared when the CLOB rejects POST /books, after which books are fetched one by one
+CLOB_BATCH_ENABLED = True
+
+class BookResult:
+    """
+    Outcome of fetching one token's book. `price` (the best ask) is only set
+    when status is BOOK_OK; otherwise `error` says what went wrong.
+    """
+    __slots__ = ("token_id", "status", "book", "error")
+
+    def __init__(self, token_id, status, book=None, error=None):
+        self.token_id = token_id
+        self.status = status
+        self.book = book
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.status == BOOK_OK
+
+    @property
+    def price(self):
+        return self.book.best_ask() if self.ok else None
+
+    def __repr__(self):
+        return f"BookResult({self.token_id!r}, {self.status!r}, error={self.error!r})"
 
-def get_clob_price(token_id):
+def book_result(token_id, book):
+    if book.best_ask() is None:
+        return BookResult(token_id, BOOK_EMPTY, book, "No asks")
+    return BookResult(token_id, BOOK_OK, book)
+
+def error_result(token_id, e):
+    return BookResult(token_id, BOOK_ERROR, error=str(e) or type(e).__name__)
+
+def batches(token_ids, size=CLOB_BATCH_SIZE):
+    return [token_ids[i:i + size] for i in range(0, len(token_ids), size)]
+
+def parse_clob_books(token_ids, data):
+    """
+    Fills the books of one POST /books response (raw or parsed) and returns a
+    BookResult for every requested token.
+    """
+    entries = loads(data) if isinstance(data, (bytes, str)) else data
+    by_token = {entry.get("asset_id"): entry for entry in entries or ()}
+    results = {}
+    for token_id in token_ids:
+        entry = by_token.get(token_id)
+        if entry is None:
+            results[token_id] = BookResult(token_id, BOOK_MISSING, error="Not in /books response")
+        else:
+            results[token_id] = book_result(token_id, fill_clob_book(get_token_book(token_id), entry))
+    return results
+
+def batch_unsupported(response):
+    global CLOB_BATCH_ENABLED
+    if response.status_code in (404, 405):
+        print(f"CLOB /books unavailable ({response.status_code}), fetching books one by one")
+        CLOB_BATCH_ENABLED = False
+        return True
+    return False
+
+def single_book(token_id):
+    try:
+        return book_result(token_id, get_clob_book(token_id))
+    except Exception as e:
+        return error_result(token_id, e)
+
+def post_clob_books(token_ids):
+    """
+    One POST /books request. Returns None when the endpoint is not supported.
+    """
     try:
-        response = requests.get(CLOB_API_URL, params={"token_id": token_id})
-        data = response.json()
+        response = venue_client.post(CLOB_BOOKS_URL, json=[{"token_id": t} for t in token_ids])
+        if batch_unsupported(response):
+            return None
+        response.raise_for_status()
+        return parse_clob_books(token_ids, response.content)
+    except Exception as e:
+        return {t: error_result(t, e) for t in token_ids}
+
+@timed("clob_books")
+def fetch_clob_books(token_ids):
+    """
+    Books of every token as {token_id: BookResult}: one POST /books per
+    CLOB_BATCH_SIZE tokens, or GET /book on CLOB_CONCURRENCY threads when the
+    batch endpoint is unavailable. Never raises; failures are BOOK_ERROR results.
+    """
+    token_ids = list(dict.fromkeys(token_ids))
+    results = {}
+    for chunk in batches(token_ids) if CLOB_BATCH_ENABLED else ():
+        batch = post_clob_books(chunk)
+        if batch is None:
+            break
+        results.update(batch)
+    pending = [t for t in token_ids if t not in results]
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(CLOB_CONCURRENCY, len(pending))) as pool:
+            results.update((r.token_id, r) for r in pool.map(single_book, pending))
+    return results
+
+def outcome_prices(outcome_tokens, books):
+    """
+    {outcome: best ask} when every book is usable, else (None, err) naming the failures.
+    """
+    failed = [f"{outcome}: {books[t].status} ({books[t].error})"
+              for outcome, t in outcome_tokens.items() if not books[t].ok]
+    if failed:
+        return None, "CLOB Error: " + "; ".join(failed)
+    return {outcome: books[t].price for outcome, t in outcome_tokens.items()}, None
+
+def parse_market_tokens(data):
+    """
+    Extracts {outcome: clob_token_id} from a Gamma events response (raw or parsed).
+    """
+    market = decode_gamma_event(data)
+    if market is None:
+        return None, "Empty data response"
+    
+    if len(market.token_ids) != 2:
+        return None, "Market does not have exactly 2 outcomes"
         
-        # Original Logic: Get the lowest seller (Ask)
-        asks = data.get('asks', [])
-        if asks:
-            return min(float(a['price']) for a in asks)
-        else:
-            return 0.0
-            
+    return market.tokens(), None
+
+@timed("gamma_lookup")
+def resolve_market_tokens(slug):
+    """
+    Looks up an event slug on Gamma and returns {outcome: clob_token_id}.
+    """
+    try:
+        response = venue_client.get(POLYMARKET_API_URL, params={"slug": slug})
+        if response.status_code != 200:
+            return None, f"Event not found: {slug}"
+        return parse_market_tokens(response.content)
+
     except Exception as e:
-        print(f"CLOB Error: {e}")
-        return 0.0
+        return None, str(e)
 
+def get_market_tokens(market):
+    """
+    Token ids of a ScheduledMarket. Gamma is only asked once per market.
+    """
+    return GAMMA_TOKENS.get(market.poly_slug, lambda: resolve_market_tokens(market.poly_slug),
+                            ttl=market.end - time.time())
+
+@timed("poly_fetch")
 def fetch_polymarket_data_struct():
-    slug = get_market_slug()
+    market = SCHEDULE.current()
     
     try:
-        # 1. Get Event Data
-        response = requests.get(POLYMARKET_API_URL, params={"slug": slug})
+        # 1. Token IDs, cached for the hour
+        outcome_tokens, err = get_market_tokens(market)
+        if err:
+            return None, err
+
+        # 2. Best ask of every outcome, in one batched book request
+        prices, err = outcome_prices(outcome_tokens, fetch_clob_books(outcome_tokens.values()))
+        if err:
+            return None, err
+
+        # 3. Resolve the next hour ahead of rollover
+        if SCHEDULE.seconds_to_rollover() <= PREFETCH_LEAD:
+            get_market_tokens(SCHEDULE.next())
+            
+        return {
+            "prices": prices,
+            "slug": market.poly_slug,
+            "target_time_utc": datetime.datetime.now().isoformat(),
+            "token_ids": outcome_tokens
+        }, None
+
+    except Exception as e:
+        return None, str(e)
+
+@timed("clob_book")
+async def get_clob_book_async(client, token_id):
+    data = await get_json(client, CLOB_API_URL, params={"token_id": token_id})
+    return fill_clob_book(get_token_book(token_id), data)
+
+async def single_book_async(client, token_id, limit):
+    async with limit:
+        try:
+            return book_result(token_id, await get_clob_book_async(client, token_id))
+        except Exception as e:
+            return error_result(token_id, e)
+
+async def post_clob_books_async(client, token_ids):
+    try:
+        response = await venue_client.post_async(client, CLOB_BOOKS_URL, json=[{"token_id": t} for t in token_ids])
+        if batch_unsupported(response):
+            return None
+        response.raise_for_status()
+        return parse_clob_books(token_ids, response.content)
+    except Exception as e:
+        return {t: error_result(t, e) for t in token_ids}
+
+@timed("clob_books")
+async def fetch_clob_books_async(client, token_ids):
+    """
+    Async version of fetch_clob_books: the POST /books chunks are sent
+    concurrently, and the GET /book fallback keeps CLOB_CONCURRENCY in flight.
+    """
+    token_ids = list(dict.fromkeys(token_ids))
+    results = {}
+    if CLOB_BATCH_ENABLED:
+        for batch in await asyncio.gather(*(post_clob_books_async(client, chunk) for chunk in batches(token_ids))):
+            if batch is not None:
+                results.update(batch)
+    pending = [t for t in token_ids if t not in results]
+    if pending:
+        limit = asyncio.Semaphore(CLOB_CONCURRENCY)
+        for r in await asyncio.gather(*(single_book_async(client, t, limit) for t in pending)):
+            results[r.token_id] = r
+    return results
+
+@timed("gamma_lookup")
+async def resolve_market_tokens_async(client, slug):
+    """
+    Looks up an event slug on Gamma and returns {outcome: clob_token_id}.
+    """
+    try:
+        response = await venue_client.get_async(client, POLYMARKET_API_URL, params={"slug": slug})
         if response.status_code != 200:
             return None, f"Event not found: {slug}"
-            
-        data = response.json()
-        if not data:
-            return None, "Empty data response"
-
-        # 2. Extract Token IDs
-        market = data[0]['markets'][0]
-        clob_token_ids = eval(market.get("clobTokenIds", "[]"))
-        outcomes = eval(market.get("outcomes", "[]")) 
-        
-        if len(clob_token_ids) != 2:
-            return None, "Market does not have exactly 2 outcomes"
-
-        # 3. Fetch Prices for each Outcome
-        prices = {}
-        for idx, outcome in enumerate(outcomes):
-            token_id = clob_token_ids[idx]
-            price = get_clob_price(token_id)
-            prices[outcome] = price
+        return parse_market_tokens(response.content)
+
+    except Exception as e:
+        return None, str(e)
+
+async def get_market_tokens_async(client, market):
+    return await GAMMA_TOKENS.get_async(market.poly_slug, lambda: resolve_market_tokens_async(client, market.poly_slug),
+                                        ttl=market.end - time.time())
+
+async def prefetch_next_market_async(client, lead=PREFETCH_LEAD):
+    """
+    Resolves the next hour's token ids once rollover is less than `lead` seconds away,
+    so the first fetch of the new hour needs no Gamma lookup.
+    """
+    if SCHEDULE.seconds_to_rollover() > lead:
+        return None, None
+    return await get_market_tokens_async(client, SCHEDULE.next())
+
+async def run_market_prefetch(client, interval=30.0):
+    """
+    Background loop for the streaming paths, which do not poll fetch_polymarket_data_struct_async.
+    """
+    while True:
+        _, err = await prefetch_next_market_async(client)
+        if err:
+            print(f"Prefetch error: {err}")
+        await asyncio.sleep(interval)
+
+@timed("poly_fetch")
+async def fetch_polymarket_data_struct_async(client):
+    """
+    Async version of fetch_polymarket_data_struct.
+    The token ids come from the schedule; the next hour is prefetched alongside the book requests.
+    """
+    market = SCHEDULE.current()
+    
+    try:
+        outcome_tokens, err = await get_market_tokens_async(client, market)
+        if err:
+            return None, err
+
+        books, _ = await asyncio.gather(
+            fetch_clob_books_async(client, outcome_tokens.values()),
+            prefetch_next_market_async(client)
+        )
+        prices, err = outcome_prices(outcome_tokens, books)
+        if err:
+            return None, err
             
         return {
             "prices": prices,
-            "slug": slug,
-            "target_time_utc": datetime.datetime.now().isoformat()
+            "slug": market.poly_slug,
+            "target_time_utc": datetime.datetime.now().isoformat(),
+            "token_ids": outcome_tokens
         }, None
 
     except Exception as e:
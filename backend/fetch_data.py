@@ -1,6 +1,8 @@
-import requests
+import venue_client
 import time
 import datetime
+from ttl_cache import TTLCache
+from decoders import decode_gamma_event, decode_binance_price, decode_kline_open
 
 # Configuration
 POLYMARKET_EVENT_SLUG = "bitcoin-up-or-down-november-25-6pm-et"
@@ -13,42 +15,33 @@ SYMBOL = "BTCUSDT"
 # Timestamp in milliseconds
 TARGET_CANDLE_TIMESTAMP = 1764111600000 
 
+# The open of a finished candle never changes; fetch it once
+CANDLE_OPENS = TTLCache("binance_candle_opens", ttl=24 * 3600, max_size=16)
+
 def get_polymarket_data():
     try:
-        response = requests.get(POLYMARKET_URL, params={"slug": POLYMARKET_EVENT_SLUG})
+        response = venue_client.get(POLYMARKET_URL, params={"slug": POLYMARKET_EVENT_SLUG})
         response.raise_for_status()
-        data = response.json()
-        
-        if not data:
+        market = decode_gamma_event(response.content)
+        if market is None:
             return None, "Event not found"
-
-        event = data[0]
-        markets = event.get("markets", [])
-        if not markets:
-            return None, "Markets not found in event"
-            
-        market = markets[0]
-        outcomes = eval(market.get("outcomes", "[]"))
-        outcome_prices = eval(market.get("outcomePrices", "[]"))
-        
-        prices = {}
-        for outcome, price in zip(outcomes, outcome_prices):
-            prices[outcome] = float(price)
             
-        return prices, None
+        return market.prices(), None
     except Exception as e:
         return None, str(e)
 
 def get_binance_current_price():
     try:
-        response = requests.get(BINANCE_PRICE_URL, params={"symbol": SYMBOL})
+        response = venue_client.get(BINANCE_PRICE_URL, params={"symbol": SYMBOL})
         response.raise_for_status()
-        data = response.json()
-        return float(data["price"]), None
+        return decode_binance_price(response.content), None
     except Exception as e:
         return None, str(e)
 
 def get_binance_open_price():
+    return CANDLE_OPENS.get(TARGET_CANDLE_TIMESTAMP, fetch_binance_open_price)
+
+def fetch_binance_open_price():
     try:
         # Fetch 1h kline for the specific timestamp
         params = {
@@ -57,15 +50,11 @@ def get_binance_open_price():
             "startTime": TARGET_CANDLE_TIMESTAMP,
             "limit": 1
         }
-        response = requests.get(BINANCE_KLINES_URL, params=params)
+        response = venue_client.get(BINANCE_KLINES_URL, params=params)
         response.raise_for_status()
-        data = response.json()
-        
-        if not data:
+        open_price = decode_kline_open(response.content)
+        if open_price is None:
             return None, "Candle not found yet (future?)"
-            
-        # Kline format: [Open time, Open, High, Low, Close, Volume, ...]
-        open_price = float(data[0][1])
         return open_price, None
     except Exception as e:
         return None, str(e)
@@ -1,5 +1,6 @@
 import requests
 import json
+from decoders import decode_gamma_event
 
 def inspect_clob(token_id):
     url = "https://clob.polymarket.com/book"
@@ -18,7 +19,6 @@ if __name__ == "__main__":
     slug = "bitcoin-up-or-down-november-26-2pm-et"
     url = "https://gamma-api.polymarket.com/events"
     resp = requests.get(url, params={"slug": slug})
-    data = resp.json()
-    if data:
-        token_ids = eval(data[0]['markets'][0]['clobTokenIds'])
-        inspect_clob(token_ids[0])
+    market = decode_gamma_event(resp.content)
+    if market:
+        inspect_clob(market.token_ids[0])
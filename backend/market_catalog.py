@@ -0,0 +1,379 @@
+import argparse
+import codecs
+import json
+import os
+import re
+import sqlite3
+import time
+import venue_client
+from metrics import span
+
+# On-disk index of Polymarket markets, built from /markets dumps and live pages
+CATALOG_PATH = os.environ.get("MARKET_CATALOG", "market_catalog.db")
+CLOB_MARKETS_URL = "https://clob.polymarket.com/markets"
+END_CURSOR = "LTE="
+
+READ_SIZE = 1 << 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS markets (
+    condition_id TEXT PRIMARY KEY,
+    question TEXT,
+    slug TEXT,
+    active INTEGER,
+    closed INTEGER,
+    end_date TEXT,
+    tokens TEXT
+);
+CREATE INDEX IF NOT EXISTS markets_slug ON markets (slug);
+CREATE INDEX IF NOT EXISTS markets_state ON markets (active, closed);
+CREATE TABLE IF NOT EXISTS keywords (
+    word TEXT,
+    condition_id TEXT,
+    PRIMARY KEY (word, condition_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL
+);
+"""
+
+# --- STREAMING PARSER ---
+
+class JsonStream:
+    """
+    Minimal incremental JSON reader over a read(n) callable.
+
+    Only the structure around the market arrays is walked by hand; every array
+    element is decoded on its own with json's raw_decode, so memory holds one
+    element plus a read buffer no matter how large the dump is.
+    """
+    def __init__(self, read, read_size=READ_SIZE):
+        self.read = read
+        self.read_size = read_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()  # Chunks can split a multi-byte character
+
+    def _fill(self):
+        while True:
+            raw = self.read(self.read_size)
+            if not raw:
+                # End of input is an empty read, not an empty decode
+                chunk = self.utf8.decode(b"", final=True) if isinstance(raw, bytes) else ""
+                self.eof = True
+                break
+            chunk = self.utf8.decode(raw) if isinstance(raw, bytes) else raw
+            if chunk:
+                break  # Else the read held only part of a multi-byte character
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Next non-whitespace character, or "" at the end of input.
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected):
+        char = self.peek()
+        if char != expected:
+            raise ValueError(f"Expected {expected!r}, got {char!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A scalar that ends at the buffer edge may be cut short, e.g. 12|34
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def skip_to_document(self):
+        """
+        Skips text between JSON documents (e.g. "Fetching markets..." log lines).
+        """
+        while True:
+            char = self.peek()
+            if char in ("{", "[", ""):
+                return char
+            newline = self.buf.find("\n", self.pos)
+            if newline >= 0:
+                self.pos = newline + 1
+            else:
+                self.pos = len(self.buf)
+
+    def items(self):
+        """
+        Yields the elements of the array starting at the cursor, one at a time.
+        """
+        self.take("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']', got {char!r}")
+
+    def object_fields(self):
+        """
+        Yields the keys of the object starting at the cursor. The caller must
+        consume each key's value (value() or items()) before asking for the next.
+        """
+        self.take("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.take(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}', got {char!r}")
+
+def iter_markets(read, page=None):
+    """
+    Streams normalized market dicts out of every JSON document read() returns:
+    CLOB /markets pages ({"data": [...], "next_cursor": ...}) and Gamma event
+    lists ([{"markets": [...]}, ...]). Page fields other than "data" are stored
+    in `page` when given.
+    """
+    stream = JsonStream(read)
+    while True:
+        char = stream.skip_to_document()
+        if char == "":
+            return
+        if char == "{":
+            for key in stream.object_fields():
+                if key == "data" and stream.peek() == "[":
+                    for market in stream.items():
+                        yield normalize_clob_market(market)
+                else:
+                    value = stream.value()
+                    if page is not None:
+                        page[key] = value
+        else:
+            for event in stream.items():
+                for market in event.get("markets", []) if isinstance(event, dict) else []:
+                    yield normalize_gamma_market(market)
+
+def normalize_clob_market(m):
+    return {
+        "condition_id": m.get("condition_id"),
+        "question": m.get("question") or "",
+        "slug": m.get("market_slug") or "",
+        "active": bool(m.get("active")),
+        "closed": bool(m.get("closed")),
+        "end_date": m.get("end_date_iso"),
+        "tokens": {t.get("outcome"): t.get("token_id") for t in m.get("tokens") or []}
+    }
+
+def normalize_gamma_market(m):
+    outcomes = m.get("outcomes") or "[]"
+    token_ids = m.get("clobTokenIds") or "[]"
+    outcomes = json.loads(outcomes) if isinstance(outcomes, str) else outcomes
+    token_ids = json.loads(token_ids) if isinstance(token_ids, str) else token_ids
+    return {
+        "condition_id": m.get("conditionId"),
+        "question": m.get("question") or "",
+        "slug": m.get("slug") or "",
+        "active": bool(m.get("active")),
+        "closed": bool(m.get("closed")),
+        "end_date": m.get("endDate"),
+        "tokens": dict(zip(outcomes, token_ids))
+    }
+
+# --- INDEX ---
+
+def keywords(text):
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+class MarketCatalog:
+    """
+    sqlite index of markets keyed by condition_id, with lookups by slug prefix,
+    question keywords and the active/closed flags. Re-indexing a market
+    replaces its row, so dumps and live pages can be added in any order.
+    """
+    def __init__(self, path=CATALOG_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def add(self, markets, batch=1000):
+        count = 0
+        pending = []
+        for market in markets:
+            if not market["condition_id"]:
+                continue
+            pending.append(market)
+            if len(pending) >= batch:
+                count += self._write(pending)
+                pending = []
+        count += self._write(pending)
+        return count
+
+    def _write(self, markets):
+        if not markets:
+            return 0
+        with self.db:
+            ids = [(m["condition_id"],) for m in markets]
+            self.db.executemany("DELETE FROM keywords WHERE condition_id = ?", ids)
+            self.db.executemany(
+                "INSERT OR REPLACE INTO markets VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(m["condition_id"], m["question"], m["slug"], int(m["active"]), int(m["closed"]),
+                  m["end_date"], json.dumps(m["tokens"])) for m in markets]
+            )
+            self.db.executemany(
+                "INSERT OR IGNORE INTO keywords VALUES (?, ?)",
+                [(word, m["condition_id"]) for m in markets for word in keywords(m["question"] + " " + m["slug"])]
+            )
+        return len(markets)
+
+    def index_file(self, path, force=False):
+        """
+        Streams a dump into the index. Unchanged files (same size and mtime) are skipped.
+        Returns the number of markets indexed.
+        """
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        row = self.db.execute("SELECT size, mtime FROM sources WHERE path = ?", (key,)).fetchone()
+        if row == (stat.st_size, stat.st_mtime) and not force:
+            return 0
+        with open(path, "rb") as f:
+            count = self.add(iter_markets(f.read))
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)", (key, stat.st_size, stat.st_mtime))
+        return count
+
+    def index_live(self, max_pages=None, cursor=""):
+        """
+        Pages through the CLOB /markets endpoint, streaming each response body.
+        Returns (markets_indexed, next_cursor).
+        """
+        count = 0
+        pages = 0
+        while cursor != END_CURSOR and (max_pages is None or pages < max_pages):
+            page = {}
+            with span("clob_markets_page"):
+                response = venue_client.get(CLOB_MARKETS_URL, params={"next_cursor": cursor}, stream=True)
+                response.raise_for_status()
+                response.raw.decode_content = True
+                with response:
+                    count += self.add(iter_markets(response.raw.read, page))
+            cursor = page.get("next_cursor") or END_CURSOR
+            pages += 1
+        return count, cursor
+
+    def get(self, condition_id):
+        row = self.db.execute("SELECT * FROM markets WHERE condition_id = ?", (condition_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def find(self, words=(), slug_prefix=None, active=None, closed=None, limit=None):
+        """
+        Markets whose question/slug contain every word, optionally filtered by
+        slug prefix and flags. find(["bitcoin", "up", "down"], active=True, closed=False)
+        """
+        sql = "SELECT m.* FROM markets m"
+        where = []
+        params = []
+        for i, word in enumerate(sorted({w for text in words for w in keywords(text)})):
+            sql += f" JOIN keywords k{i} ON k{i}.condition_id = m.condition_id AND k{i}.word = ?"
+            params.append(word)
+        if slug_prefix:
+            where.append("m.slug >= ? AND m.slug < ?")
+            params += [slug_prefix, slug_prefix + "\uffff"]
+        if active is not None:
+            where.append("m.active = ?")
+            params.append(int(active))
+        if closed is not None:
+            where.append("m.closed = ?")
+            params.append(int(closed))
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY m.end_date"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [self._row(row) for row in self.db.execute(sql, params)]
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM markets").fetchone()[0]
+
+    @staticmethod
+    def _row(row):
+        condition_id, question, slug, active, closed, end_date, tokens = row
+        return {
+            "condition_id": condition_id,
+            "question": question,
+            "slug": slug,
+            "active": bool(active),
+            "closed": bool(closed),
+            "end_date": end_date,
+            "tokens": json.loads(tokens)
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Index Polymarket market dumps and query the index.")
+    parser.add_argument("--db", default=CATALOG_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    index = sub.add_parser("index", help="Index dump files (e.g. api_response.json)")
+    index.add_argument("paths", nargs="+")
+    index.add_argument("--force", action="store_true")
+    fetch = sub.add_parser("fetch", help="Index live CLOB /markets pages")
+    fetch.add_argument("--pages", type=int, default=None)
+    find = sub.add_parser("find", help="Find markets by keywords")
+    find.add_argument("words", nargs="*")
+    find.add_argument("--slug-prefix")
+    find.add_argument("--active", action="store_true")
+    find.add_argument("--open", action="store_true", help="Only markets that are not closed")
+    find.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    catalog = MarketCatalog(args.db)
+    start = time.perf_counter()
+    if args.command == "index":
+        for path in args.paths:
+            print(f"{path}: {catalog.index_file(path, force=args.force)} markets indexed")
+    elif args.command == "fetch":
+        count, cursor = catalog.index_live(args.pages)
+        print(f"{count} markets indexed (next cursor: {cursor})")
+    else:
+        markets = catalog.find(args.words, slug_prefix=args.slug_prefix, active=True if args.active else None,
+                               closed=False if args.open else None, limit=args.limit)
+        for m in markets:
+            outcomes = ", ".join(m["tokens"])
+            print(f"{m['slug']} | {m['question']} | active={m['active']} closed={m['closed']} | {outcomes}")
+        print(f"{len(markets)} markets")
+    print(f"Catalog: {len(catalog)} markets | {(time.perf_counter() - start) * 1000:.1f} ms")
+    catalog.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import datetime
+import time
+from market_universe import DEFAULT_FAMILY
+
+# Markets built ahead of the current one
+PERIODS_AHEAD = 2
+
+# Start resolving the next market this many seconds before rollover
+PREFETCH_LEAD = 300
+
+class ScheduledMarket:
+    """
+    Identifiers of one contract period of a MarketFamily, computed once. Token
+    ids are looked up and cached by fetch_current_polymarket.get_market_tokens.
+    """
+    def __init__(self, family, start, end):
+        self.family = family
+        self.start = start
+        self.end = end
+        self.target_time_utc = datetime.datetime.fromtimestamp(start, datetime.timezone.utc)
+        self.poly_slug = family.poly_slug(start, end)
+        self.kalshi_event_ticker = family.kalshi_event_ticker(start, end)
+
+    @property
+    def symbol(self):
+        return self.family.symbol
+
+class MarketSchedule:
+    """
+    Start-keyed index of one family's markets. Looking up the current market
+    is a dict hit; entries are built PERIODS_AHEAD periods in advance and
+    dropped once their period ends.
+    """
+    def __init__(self, family=DEFAULT_FAMILY, ahead=PERIODS_AHEAD):
+        self.family = family
+        self.ahead = ahead
+        self.markets = {}
+
+    def at(self, ts=None):
+        start, _ = self.family.period(time.time() if ts is None else ts)
+        market = self.markets.get(start)
+        if market is None:
+            self._build(start)
+            market = self.markets[start]
+        return market
+
+    def _build(self, start):
+        now, _ = self.family.period(time.time())
+        for stale in [s for s in self.markets if s < now]:
+            del self.markets[stale]
+        ts = start
+        for _ in range(self.ahead + 1):
+            begin, end = self.family.period(ts)
+            if begin not in self.markets:
+                self.markets[begin] = ScheduledMarket(self.family, begin, end)
+            ts = end
+
+    def current(self):
+        return self.at()
+
+    def next(self):
+        return self.at(self.current().end)
+
+    def seconds_to_rollover(self):
+        return self.current().end - time.time()
+
+# One schedule per family, shared by every caller
+SCHEDULES = {}
+
+def schedule_for(family):
+    if family.key not in SCHEDULES:
+        SCHEDULES[family.key] = MarketSchedule(family)
+    return SCHEDULES[family.key]
+
+SCHEDULE = schedule_for(DEFAULT_FAMILY)
@@ -0,0 +1,145 @@
+import datetime
+import os
+import pytz
+
+# Registry of the up/down contract families the bots can track: every asset in
+# ASSETS on every horizon in HORIZONS. A family knows its contract period and
+# how each venue names the contract for a period; market_schedule turns that
+# into ScheduledMarkets.
+
+ET = pytz.timezone("US/Eastern")
+
+# Families tracked by the universe scan, e.g. "BTC-hourly,ETH-daily" or "all"
+MARKET_UNIVERSE = os.environ.get("MARKET_UNIVERSE", "all")
+
+class Asset:
+    __slots__ = ("code", "poly_name", "kalshi_series", "binance_symbol")
+
+    def __init__(self, code, poly_name, kalshi_series, binance_symbol):
+        self.code = code
+        self.poly_name = poly_name
+        self.kalshi_series = kalshi_series
+        self.binance_symbol = binance_symbol
+
+ASSETS = {
+    "BTC": Asset("BTC", "bitcoin", "KXBTCD", "BTCUSDT"),
+    "ETH": Asset("ETH", "ethereum", "KXETHD", "ETHUSDT"),
+    "SOL": Asset("SOL", "solana", "KXSOLD", "SOLUSDT"),
+}
+
+def et(ts):
+    return datetime.datetime.fromtimestamp(ts, ET)
+
+# --- SLUG / TICKER GENERATORS ---
+# Each takes (asset, start, end) with start/end as unix timestamps.
+
+def hourly_poly_slug(asset, start, end):
+    # e.g. bitcoin-up-or-down-december-5-9pm-et, named after the hour it starts
+    t = et(start)
+    return f"{asset.poly_name}-up-or-down-{t.strftime('%B').lower()}-{t.day}-{int(t.strftime('%I'))}{t.strftime('%p').lower()}-et"
+
+def daily_poly_slug(asset, start, end):
+    # e.g. bitcoin-up-or-down-on-december-5, named after the day it resolves
+    t = et(end)
+    return f"{asset.poly_name}-up-or-down-on-{t.strftime('%B').lower()}-{t.day}"
+
+def quarter_hour_poly_slug(asset, start, end):
+    # e.g. btc-updown-15m-1764960300, named after its start time
+    return f"{asset.code.lower()}-updown-15m-{int(start)}"
+
+def kalshi_event_ticker(asset, start, end):
+    # e.g. KXBTCD-25DEC0522; Kalshi names the event after the hour (ET) it resolves at
+    return f"{asset.kalshi_series}-{et(end).strftime('%y%b%d%H')}".upper()
+
+# --- PERIODS ---
+# Each maps a timestamp to the (start, end) of the contract running at that time.
+
+def fixed_period(seconds):
+    def period(ts):
+        start = int(ts // seconds) * seconds
+        return start, start + seconds
+    return period
+
+def et_daily_period(hour):
+    """
+    Day-long contracts that resolve at `hour`:00 ET, so they follow DST.
+    """
+    def period(ts):
+        t = et(ts)
+        day = t.date() if t.hour < hour else t.date() + datetime.timedelta(days=1)
+        at = datetime.time(hour)
+        end = ET.localize(datetime.datetime.combine(day, at))
+        start = ET.localize(datetime.datetime.combine(day - datetime.timedelta(days=1), at))
+        return int(start.timestamp()), int(end.timestamp())
+    return period
+
+class Horizon:
+    """
+    A contract length. kalshi_ticker is None when Kalshi has no strike ladder
+    resolving at the same time, leaving Polymarket only.
+    """
+    __slots__ = ("name", "period", "poly_slug", "kalshi_ticker")
+
+    def __init__(self, name, period, poly_slug, kalshi_ticker):
+        self.name = name
+        self.period = period
+        self.poly_slug = poly_slug
+        self.kalshi_ticker = kalshi_ticker
+
+HORIZONS = {
+    "hourly": Horizon("hourly", fixed_period(3600), hourly_poly_slug, kalshi_event_ticker),
+    # Polymarket's daily contracts resolve at noon ET, as does Kalshi's noon event
+    "daily": Horizon("daily", et_daily_period(12), daily_poly_slug, kalshi_event_ticker),
+    "15m": Horizon("15m", fixed_period(900), quarter_hour_poly_slug, None),
+}
+
+class MarketFamily:
+    """
+    One asset on one horizon, e.g. "ETH-hourly".
+    """
+    __slots__ = ("key", "asset", "horizon")
+
+    def __init__(self, asset, horizon):
+        self.key = f"{asset.code}-{horizon.name}"
+        self.asset = asset
+        self.horizon = horizon
+
+    @property
+    def symbol(self):
+        return self.asset.binance_symbol
+
+    @property
+    def has_kalshi(self):
+        return self.horizon.kalshi_ticker is not None
+
+    def period(self, ts):
+        return self.horizon.period(ts)
+
+    def poly_slug(self, start, end):
+        return self.horizon.poly_slug(self.asset, start, end)
+
+    def kalshi_event_ticker(self, start, end):
+        if self.horizon.kalshi_ticker is None:
+            return None
+        return self.horizon.kalshi_ticker(self.asset, start, end)
+
+FAMILIES = {f.key: f for f in (MarketFamily(a, h) for a in ASSETS.values() for h in HORIZONS.values())}
+
+# What the single-market bots and the API simulate
+DEFAULT_FAMILY = FAMILIES["BTC-hourly"]
+
+def parse_universe(spec):
+    """
+    Families named in a comma-separated spec ("all" for every family).
+    Raises ValueError on an unknown name.
+    """
+    if spec.strip().lower() == "all":
+        return list(FAMILIES.values())
+    families = []
+    for key in (k.strip() for k in spec.split(",")):
+        if not key:
+            continue
+        if key not in FAMILIES:
+            raise ValueError(f"Unknown market family {key!r}; known: {', '.join(FAMILIES)}")
+        families.append(FAMILIES[key])
+    return families
@@ -0,0 +1,240 @@
+import functools
+import inspect
+import os
+import time
+
+# Set METRICS=0 to turn every span into a no-op
+METRICS_ENABLED = os.environ.get("METRICS", "1") != "0"
+
+# Histograms keep SUB_BITS bits of precision per power of two (<1% error)
+# and cover up to 2**MAX_BITS ns (~18 minutes); slower samples go in the last bucket.
+SUB_BITS = 7
+MAX_BITS = 40
+SUB_COUNT = 1 << SUB_BITS
+HALF_COUNT = SUB_COUNT >> 1
+BUCKET_COUNT = (MAX_BITS - SUB_BITS + 2) * HALF_COUNT
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+METRIC_PREFIX = "arb"
+
+_perf_ns = time.perf_counter_ns
+
+def bucket_index(ns):
+    if ns < SUB_COUNT:
+        return ns if ns > 0 else 0
+    shift = ns.bit_length() - SUB_BITS
+    return min(shift * HALF_COUNT + (ns >> shift), BUCKET_COUNT - 1)
+
+def bucket_upper(index):
+    """
+    Highest value (ns) that lands in a bucket.
+    """
+    if index < SUB_COUNT:
+        return index
+    shift = index // HALF_COUNT - 1
+    return ((index - shift * HALF_COUNT + 1) << shift) - 1
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of nanosecond samples: a fixed list of
+    counts, so record() is a bit_length and a list increment, and quantiles are
+    read by walking the counts. Counts are cumulative since start (or reset()),
+    which is what Prometheus summaries expect.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.errors = 0
+
+    def record(self, ns):
+        if ns < SUB_COUNT:
+            i = ns if ns > 0 else 0
+        else:
+            shift = ns.bit_length() - SUB_BITS
+            i = shift * HALF_COUNT + (ns >> shift)
+            if i >= BUCKET_COUNT:
+                i = BUCKET_COUNT - 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def quantile(self, q):
+        """
+        Value (ns) at or below which a fraction q of the samples fall.
+        """
+        if not self.count:
+            return 0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(bucket_upper(i), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": self.total / self.count / 1e6 if self.count else 0.0,
+            "p50_ms": self.quantile(0.5) / 1e6,
+            "p99_ms": self.quantile(0.99) / 1e6,
+            "max_ms": self.max / 1e6,
+        }
+
+    def reset(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = self.total = self.max = self.errors = 0
+
+# Every histogram by stage name
+HISTOGRAMS = {}
+
+def histogram(stage):
+    hist = HISTOGRAMS.get(stage)
+    if hist is None:
+        hist = HISTOGRAMS[stage] = LatencyHistogram(stage)
+    return hist
+
+class Span:
+    """
+    Times one run of a stage: `with span("clob_book"): ...`. A new Span per
+    use, so concurrent tasks timing the same stage never share a start time.
+    A span left through an exception is still timed and counted as an error.
+    """
+    __slots__ = ("hist", "start")
+
+    def __init__(self, hist):
+        self.hist = hist
+        self.start = _perf_ns()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # LatencyHistogram.record inlined: this runs on every fetch and scan
+        ns = _perf_ns() - self.start
+        hist = self.hist
+        if ns < SUB_COUNT:
+            i = ns if ns > 0 else 0
+        else:
+            shift = ns.bit_length() - SUB_BITS
+            i = shift * HALF_COUNT + (ns >> shift)
+            if i >= BUCKET_COUNT:
+                i = BUCKET_COUNT - 1
+        hist.counts[i] += 1
+        hist.count += 1
+        hist.total += ns
+        if ns > hist.max:
+            hist.max = ns
+        if exc_type is not None:
+            hist.errors += 1
+        return False
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NO_SPAN = _NoSpan()
+
+def span(stage):
+    if not METRICS_ENABLED:
+        return NO_SPAN
+    return Span(HISTOGRAMS.get(stage) or histogram(stage))
+
+def record(stage, seconds):
+    """
+    Adds a duration measured elsewhere (e.g. by an httpx trace callback).
+    """
+    if METRICS_ENABLED:
+        histogram(stage).record(int(seconds * 1e9))
+
+def timed(stage):
+    """
+    Decorator version of span() for plain and async functions.
+    """
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+        hist = histogram(stage)
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with Span(hist):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Span(hist):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# --- REPORTING ---
+
+def metrics_summary():
+    return {name: hist.summary() for name, hist in sorted(HISTOGRAMS.items())}
+
+def print_summary():
+    print(f"{'stage':<22} {'count':>8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for name, s in metrics_summary().items():
+        if s["count"]:
+            print(f"{name:<22} {s['count']:>8} {s['p50_ms']:>9.3f} {s['p99_ms']:>9.3f} {s['max_ms']:>9.3f} {s['errors']:>7}")
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+def render_prometheus(prefix=METRIC_PREFIX):
+    """
+    Prometheus text exposition (format 0.0.4) of every stage histogram:
+    a summary with quantiles, _sum and _count in seconds, plus max and error series.
+    """
+    latency = f"{prefix}_stage_latency_seconds"
+    lines = [
+        f"# HELP {latency} Latency of instrumented fetch and compute stages.",
+        f"# TYPE {latency} summary",
+    ]
+    hists = sorted(HISTOGRAMS.items())
+    for name, hist in hists:
+        for q in QUANTILES:
+            value = f"{hist.quantile(q) / 1e9:.9f}" if hist.count else "NaN"
+            lines.append(f"{latency}{_labels(stage=name, quantile=q)} {value}")
+        lines.append(f"{latency}_sum{_labels(stage=name)} {hist.total / 1e9:.9f}")
+        lines.append(f"{latency}_count{_labels(stage=name)} {hist.count}")
+
+    lines += [f"# HELP {prefix}_stage_latency_max_seconds Slowest run of each stage.",
+              f"# TYPE {prefix}_stage_latency_max_seconds gauge"]
+    lines += [f"{prefix}_stage_latency_max_seconds{_labels(stage=name)} {hist.max / 1e9:.9f}" for name, hist in hists]
+
+    lines += [f"# HELP {prefix}_stage_errors_total Stage runs that raised.",
+              f"# TYPE {prefix}_stage_errors_total counter"]
+    lines += [f"{prefix}_stage_errors_total{_labels(stage=name)} {hist.errors}" for name, hist in hists]
+    return "\n".join(lines) + "\n"
+
+def reset():
+    for hist in HISTOGRAMS.values():
+        hist.reset()
+
+def main():
+    # Per-span overhead of the instrumentation itself
+    rounds = 200000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        with span("overhead"):
+            pass
+    per_span = (time.perf_counter() - start) / rounds * 1e9
+    print(f"span(): {per_span:.0f} ns per span ({'enabled' if METRICS_ENABLED else 'disabled'})")
+    HISTOGRAMS.pop("overhead", None)
+
+if __name__ == "__main__":
+    main()
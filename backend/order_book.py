@@ -0,0 +1,140 @@
+import time
+from bisect import bisect_left
+
+BID = "bid"
+ASK = "ask"
+
+class OrderBook:
+    """
+    L2 book with integer tick prices.
+
+    Each side keeps its price levels in a sorted list plus a {tick: size} map.
+    Both lists are ordered so the best level is the LAST element (bids ascending,
+    asks stored as negated ticks), which makes best bid/ask O(1) and keeps the
+    busy levels near the touch cheap to insert and delete. Locating a level is
+    an O(log n) bisect.
+
+    Prices go in and come out in venue units; tick_size converts them
+    (0.001 for Polymarket dollars, 1 for Kalshi cents).
+    """
+    def __init__(self, tick_size=0.01):
+        self.tick_size = tick_size
+        self.bid_keys = []
+        self.ask_keys = []
+        self.bid_sizes = {}
+        self.ask_sizes = {}
+        self.synced = False
+        self.last_update = 0.0
+
+    # --- CONVERSIONS ---
+
+    def to_ticks(self, price):
+        return int(round(price / self.tick_size))
+
+    def to_price(self, ticks):
+        price = ticks * self.tick_size
+        return price if isinstance(price, int) else round(price, 10)
+
+    # --- UPDATES ---
+
+    def clear(self):
+        self.bid_keys.clear()
+        self.ask_keys.clear()
+        self.bid_sizes.clear()
+        self.ask_sizes.clear()
+        self.synced = False
+
+    def apply_snapshot(self, bids, asks):
+        """
+        Replaces both sides with (price, size) levels. The book object and its
+        containers are reused, so pollers can refill the same book every tick.
+        """
+        self.clear()
+        for price, size in bids:
+            if size > 0:
+                self.bid_sizes[self.to_ticks(price)] = size
+        for price, size in asks:
+            if size > 0:
+                self.ask_sizes[self.to_ticks(price)] = size
+        self.bid_keys.extend(sorted(self.bid_sizes))
+        self.ask_keys.extend(sorted(-t for t in self.ask_sizes))
+        self.synced = True
+        self.last_update = time.time()
+
+    def set_level_ticks(self, side, ticks, size):
+        if side == BID:
+            keys, sizes, key = self.bid_keys, self.bid_sizes, ticks
+        else:
+            keys, sizes, key = self.ask_keys, self.ask_sizes, -ticks
+
+        if size > 0:
+            if ticks not in sizes:
+                keys.insert(bisect_left(keys, key), key)
+            sizes[ticks] = size
+        elif ticks in sizes:
+            del sizes[ticks]
+            del keys[bisect_left(keys, key)]
+        self.last_update = time.time()
+
+    def set_level(self, side, price, size):
+        self.set_level_ticks(side, self.to_ticks(price), size)
+
+    def add_to_level(self, side, price, delta):
+        ticks = self.to_ticks(price)
+        sizes = self.bid_sizes if side == BID else self.ask_sizes
+        self.set_level_ticks(side, ticks, sizes.get(ticks, 0) + delta)
+
+    # --- QUERIES ---
+
+    def best_bid_ticks(self):
+        return self.bid_keys[-1] if self.bid_keys else None
+
+    def best_ask_ticks(self):
+        return -self.ask_keys[-1] if self.ask_keys else None
+
+    def best_bid(self):
+        return self.to_price(self.bid_keys[-1]) if self.bid_keys else None
+
+    def best_ask(self):
+        return self.to_price(-self.ask_keys[-1]) if self.ask_keys else None
+
+    def levels(self, side, depth=None):
+        """
+        Returns up to `depth` (price, size) levels, best first.
+        """
+        if side == BID:
+            keys = self.bid_keys[::-1] if depth is None else self.bid_keys[:-depth - 1:-1]
+            return [(self.to_price(t), self.bid_sizes[t]) for t in keys]
+        keys = self.ask_keys[::-1] if depth is None else self.ask_keys[:-depth - 1:-1]
+        return [(self.to_price(-k), self.ask_sizes[-k]) for k in keys]
+
+    def cost_to_buy(self, qty):
+        """
+        Walks the asks from the best price. Returns (total_cost, filled_qty);
+        filled_qty is less than qty when the book is too thin.
+        """
+        cost = 0.0
+        filled = 0.0
+        for i in range(len(self.ask_keys) - 1, -1, -1):
+            ticks = -self.ask_keys[i]
+            take = min(self.ask_sizes[ticks], qty - filled)
+            cost += take * self.to_price(ticks)
+            filled += take
+            if filled >= qty:
+                break
+        return cost, filled
+
+    def proceeds_to_sell(self, qty):
+        """
+        Walks the bids from the best price. Returns (total_proceeds, filled_qty).
+        """
+        proceeds = 0.0
+        filled = 0.0
+        for i in range(len(self.bid_keys) - 1, -1, -1):
+            ticks = self.bid_keys[i]
+            take = min(self.bid_sizes[ticks], qty - filled)
+            proceeds += take * self.to_price(ticks)
+            filled += take
+            if filled >= qty:
+                break
+        return proceeds, filled
@@ -0,0 +1,191 @@
+import datetime
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+# Set RECORD_DIR to record every fetched snapshot under that directory
+RECORD_DIR = os.environ.get("RECORD_DIR")
+
+# Buffered rows are written at least this often, or sooner once a market has FLUSH_ROWS pending
+FLUSH_INTERVAL = 1.0
+FLUSH_ROWS = 4096
+
+# Recording layout:
+#   <root>/<YYYY-MM-DD>/<market>/<column>.bin   one raw fixed-width array per column (UTC day)
+#   <root>/<YYYY-MM-DD>/<market>/slugs.txt      one slug per line; slug_id is the line number
+# Polymarket prices are dollars (NaN when there is no ask), Kalshi prices are cents (0 when empty).
+POLYMARKET = "polymarket"
+KALSHI = "kalshi"
+BINANCE = "binance"
+
+COLUMNS = {
+    POLYMARKET: np.dtype([("ts", "f8"), ("slug_id", "u4"), ("up", "f4"), ("down", "f4"), ("strike", "f8")]),
+    KALSHI: np.dtype([("ts", "f8"), ("slug_id", "u4"), ("strike", "f8"),
+                      ("yes_bid", "u1"), ("yes_ask", "u1"), ("no_bid", "u1"), ("no_ask", "u1")]),
+    BINANCE: np.dtype([("ts", "f8"), ("price", "f8")]),
+}
+
+def day_of(ts):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y-%m-%d")
+
+def _price(value):
+    return np.nan if value is None or value <= 0 else value
+
+class TickRecorder:
+    """
+    Appends snapshots to columnar files from a background thread.
+
+    record_*() only stamps the snapshot and puts it on a queue, so the scan loop
+    never waits on the disk. The writer thread converts queued snapshots to rows
+    and appends them in batches. Call flush() to wait for everything queued so
+    far to be on disk, and close() on shutdown.
+    """
+    def __init__(self, root=RECORD_DIR, flush_interval=FLUSH_INTERVAL, flush_rows=FLUSH_ROWS):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.queue = queue.SimpleQueue()
+        self.pending = {}    # (day, market) -> list of row tuples
+        self.slugs = {}      # (day, market) -> {slug: slug_id}
+        self.rows_written = 0
+        self.thread = threading.Thread(target=self._run, name="tick-recorder", daemon=True)
+        self.thread.start()
+
+    # --- HOT PATH ---
+
+    def record_polymarket(self, data, ts=None):
+        """
+        data is a fetch_polymarket_data_struct dict.
+        """
+        self.queue.put((POLYMARKET, ts or time.time(), data))
+
+    def record_kalshi(self, data, ts=None):
+        """
+        data is a fetch_kalshi_data_struct dict; one row is written per strike.
+        """
+        self.queue.put((KALSHI, ts or time.time(), data))
+
+    def record_binance(self, price, ts=None):
+        if price is not None:
+            self.queue.put((BINANCE, ts or time.time(), price))
+
+    def flush(self, timeout=None):
+        done = threading.Event()
+        self.queue.put((None, None, done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        if self.thread.is_alive():
+            self.queue.put((None, None, None))
+            self.thread.join(timeout)
+
+    # --- WRITER THREAD ---
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                market, ts, payload = self.queue.get(timeout=max(next_flush - time.monotonic(), 0.0))
+            except queue.Empty:
+                self._write_all()
+                next_flush = time.monotonic() + self.flush_interval
+                continue
+
+            if market is None:
+                self._write_all()
+                if payload is None:
+                    return
+                payload.set()
+                continue
+            try:
+                self._add(market, ts, payload)
+            except Exception as e:
+                print(f"Recorder error: {e}")
+            if time.monotonic() >= next_flush:
+                self._write_all()
+                next_flush = time.monotonic() + self.flush_interval
+
+    def _slug_id(self, key, slug):
+        ids = self.slugs.get(key)
+        if ids is None:
+            ids = self.slugs[key] = {s: i for i, s in enumerate(read_slugs(self.root, *key))}
+        if slug not in ids:
+            ids[slug] = len(ids)
+            path = os.path.join(self.root, key[0], key[1])
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, "slugs.txt"), "a") as f:
+                f.write(slug + "\n")
+        return ids[slug]
+
+    def _add(self, market, ts, payload):
+        key = (day_of(ts), market)
+        rows = self.pending.setdefault(key, [])
+        if market == POLYMARKET:
+            prices = payload['prices']
+            strike = payload.get('price_to_beat')
+            rows.append((ts, self._slug_id(key, payload['slug']), _price(prices.get('Up')),
+                         _price(prices.get('Down')), np.nan if strike is None else strike))
+        elif market == KALSHI:
+            slug_id = self._slug_id(key, payload['event_ticker'])
+            for m in payload['markets']:
+                rows.append((ts, slug_id, m.strike, m.yes_bid, m.yes_ask, m.no_bid, m.no_ask))
+        else:
+            rows.append((ts, payload))
+        if len(rows) >= self.flush_rows:
+            self._write(key)
+
+    def _write_all(self):
+        for key in list(self.pending):
+            try:
+                self._write(key)
+            except Exception as e:
+                print(f"Recorder error: {e}")
+
+    def _write(self, key):
+        rows = self.pending.pop(key, None)
+        if not rows:
+            return
+        day, market = key
+        table = np.array(rows, dtype=COLUMNS[market])
+        path = os.path.join(self.root, day, market)
+        os.makedirs(path, exist_ok=True)
+        for name in table.dtype.names:
+            with open(os.path.join(path, name + ".bin"), "ab") as f:
+                f.write(np.ascontiguousarray(table[name]).tobytes())
+        self.rows_written += len(table)
+
+# --- READING ---
+
+def list_days(root, market):
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d, market)))
+
+def read_slugs(root, day, market):
+    path = os.path.join(root, day, market, "slugs.txt")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return f.read().splitlines()
+
+def open_day(root, day, market):
+    """
+    Memory-maps one day of a market. Returns ({column: read-only array}, slugs).
+    Columns are cut to a common length, in case the writer stopped mid-batch.
+    """
+    dtype = COLUMNS[market]
+    path = os.path.join(root, day, market)
+    sizes = {}
+    for name in dtype.names:
+        file = os.path.join(path, name + ".bin")
+        sizes[name] = os.path.getsize(file) // dtype[name].itemsize if os.path.exists(file) else 0
+    n = min(sizes.values())
+    columns = {}
+    for name in dtype.names:
+        if n == 0:
+            columns[name] = np.empty(0, dtype=dtype[name])  # np.memmap cannot map an empty file
+        else:
+            columns[name] = np.memmap(os.path.join(path, name + ".bin"), dtype=dtype[name], mode="r", shape=(n,))
+    return columns, read_slugs(root, day, market)
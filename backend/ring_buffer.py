@@ -0,0 +1,146 @@
+import math
+from collections import deque
+import numpy as np
+
+class RollingWindow:
+    """
+    Fixed-capacity sliding window over a float series, backed by a preallocated
+    NumPy array. push() is O(1) (amortized for min/max) and allocates nothing;
+    mean, variance, EMA, min and max are read in O(1).
+
+    Mean and variance come from a running sum and sum of squares. Those are
+    recomputed from the buffer once per `capacity` pushes so float drift
+    cannot build up over a long-running stream.
+    """
+    def __init__(self, capacity, ema_alpha=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.ema_alpha = ema_alpha if ema_alpha is not None else 2.0 / (capacity + 1)
+        self.buffer = np.zeros(capacity, dtype=np.float64)
+        self.count = 0          # Values currently in the window
+        self.pushes = 0         # Values ever pushed, used as a sequence number
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.ema = None
+        self._max = deque()     # (seq, value), values decreasing
+        self._min = deque()     # (seq, value), values increasing
+
+    def __len__(self):
+        return self.count
+
+    def push(self, value):
+        value = float(value)
+        slot = self.pushes % self.capacity
+        if self.count == self.capacity:
+            old = self.buffer[slot]
+            self.total -= old
+            self.total_sq -= old * old
+        else:
+            self.count += 1
+        self.buffer[slot] = value
+        self.total += value
+        self.total_sq += value * value
+        self.pushes += 1
+
+        if self.pushes % self.capacity == 0 and self.count == self.capacity:
+            self.resum()
+
+        self.ema = value if self.ema is None else self.ema + self.ema_alpha * (value - self.ema)
+
+        # Monotonic deques: drop values that can never be the extreme again,
+        # then expire the ones that slid out of the window
+        seq = self.pushes
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((seq, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((seq, value))
+        oldest = seq - self.count
+        if self._max[0][0] <= oldest:
+            self._max.popleft()
+        if self._min[0][0] <= oldest:
+            self._min.popleft()
+
+    def extend(self, values):
+        """
+        Pushes a whole array at once; same end state as calling push() per value.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if n == 0:
+            return
+        if n < self.capacity:
+            for value in values:
+                self.push(value)
+            return
+
+        # EMA over the whole array: ema_n = (1-a)^n * ema_0 + sum(a * (1-a)^(n-1-k) * x_k).
+        # An empty window is seeded with the first value, which blending leaves unchanged.
+        a = self.ema_alpha
+        start = self.ema if self.ema is not None else values[0]
+        decay = (1.0 - a) ** np.arange(n - 1, -1, -1, dtype=np.float64)
+        ema = (1.0 - a) ** n * start + a * float(np.dot(decay, values))
+
+        # Only the last `capacity` values survive; lay them out as push() would have
+        pushes = self.pushes + n
+        self.clear()
+        self.pushes = pushes - self.capacity
+        for value in values[-self.capacity:]:
+            self.push(value)
+        self.resum()
+        self.ema = float(ema)
+
+    def resum(self):
+        window = self.buffer[:self.count]
+        self.total = float(window.sum())
+        self.total_sq = float(np.dot(window, window))
+
+    def clear(self):
+        self.count = 0
+        self.pushes = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.ema = None
+        self._max.clear()
+        self._min.clear()
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+    @property
+    def variance(self):
+        """
+        Population variance of the window.
+        """
+        if not self.count:
+            return float('nan')
+        mean = self.total / self.count
+        return max(self.total_sq / self.count - mean * mean, 0.0)
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else float('nan')
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else float('nan')
+
+    @property
+    def last(self):
+        return self.buffer[(self.pushes - 1) % self.capacity] if self.count else float('nan')
+
+    def values(self):
+        """
+        Returns a copy of the window, oldest first.
+        """
+        if self.count < self.capacity:
+            return self.buffer[:self.count].copy()
+        slot = self.pushes % self.capacity
+        return np.concatenate((self.buffer[slot:], self.buffer[:slot]))
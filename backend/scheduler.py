@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+import metrics
+
+class Cadence:
+    """
+    Fixed-rate ticker for polling loops:
+
+        cadence = Cadence(2.0)
+        while True:
+            await do_work()
+            await cadence.wait()
+
+    Tick k is due at start + k * interval, whatever the work took, so the loop
+    does not drift by the work time the way `await asyncio.sleep(interval)`
+    does. When the work overruns whole intervals those ticks are skipped (and
+    counted in `missed`) rather than fired back to back to catch up.
+    """
+    def __init__(self, interval, name=None, clock=time.monotonic):
+        self.interval = interval
+        self.name = name
+        self.clock = clock
+        self.next_at = clock()
+        self.ticks = 0
+        self.missed = 0
+
+    async def wait(self):
+        now = self.clock()
+        self.next_at += self.interval
+        if self.next_at <= now:
+            behind = int((now - self.next_at) // self.interval) + 1
+            self.missed += behind
+            self.next_at += behind * self.interval
+        await asyncio.sleep(self.next_at - now)
+        self.ticks += 1
+        if self.name:
+            # How late the loop woke up after its tick was due
+            metrics.record(self.name + "_lag", max(0.0, self.clock() - self.next_at))
+
+    def stats(self):
+        return {"interval": self.interval, "ticks": self.ticks, "missed": self.missed}
+
+# --- ADAPTIVE POLLING ---
+
+# Polls speed up over the last EXPIRY_WINDOW seconds of a contract, when prices
+# move the most and mispricings between venues are most likely
+EXPIRY_WINDOW = 600.0
+# Weight of the newest move in the volatility average
+VOL_ALPHA = 0.2
+# A relative move per poll this large counts as volatile (halves the interval)
+VOL_REFERENCE = 0.01
+
+class TokenBucket:
+    """
+    Request budget for one host: `rate` tokens per second, at most `burst`
+    saved up. Each request takes a token, waiting for one when there are none.
+    """
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.waited = 0
+        self.lock = threading.Lock()  # The sync fetchers share buckets across threads
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, n=1):
+        """
+        Seconds until `n` tokens are available (0.0 if they are now).
+        """
+        self._refill()
+        return max(0.0, (n - self.tokens) / self.rate)
+
+    def try_take(self, n=1):
+        with self.lock:
+            self._refill()
+            if self.tokens < n:
+                return False
+            self.tokens -= n
+            return True
+
+    async def take(self, n=1):
+        while not self.try_take(n):
+            self.waited += 1
+            await asyncio.sleep(self.delay(n))
+
+    def take_sync(self, n=1):
+        while not self.try_take(n):
+            self.waited += 1
+            time.sleep(self.delay(n))
+
+    def stats(self):
+        self._refill()
+        return {"rate": self.rate, "burst": self.burst, "tokens": round(self.tokens, 2), "waited": self.waited}
+
+class AdaptiveCadence(Cadence):
+    """
+    Cadence whose interval moves between min_interval and max_interval:
+
+        interval = min + (max - min) * expiry_factor * vol_factor
+
+    expiry_factor falls linearly from 1 to 0 over the last `expiry_window`
+    seconds before the contract resolves. vol_factor is 1 / (1 + vol /
+    vol_reference), where vol is an average of the relative moves passed to
+    observe(). The interval never goes below what `budgets` allow: for each
+    (TokenBucket, requests per poll) pair, requests / rate seconds (a None
+    bucket is an unlimited host).
+
+        cadence = AdaptiveCadence(0.25, 2.0, budgets=[(bucket_for(url), 2)])
+        while True:
+            data, err = await fetch()
+            if data:
+                cadence.observe(data['prices']['Up'])
+            await cadence.wait(SCHEDULE.seconds_to_rollover(), retry=bool(err))
+    """
+    def __init__(self, min_interval, max_interval, expiry_window=EXPIRY_WINDOW, vol_reference=VOL_REFERENCE,
+                 budgets=(), name=None, clock=time.monotonic):
+        super().__init__(max_interval, name, clock)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.expiry_window = expiry_window
+        self.vol_reference = vol_reference
+        self.budgets = list(budgets)
+        self.last = {}   # series key -> last observed value
+        self.vols = {}   # series key -> average relative move
+
+    def observe(self, value, key=None):
+        """
+        Records the latest value of a price series. With several series (e.g.
+        one per market) the most volatile one sets the pace.
+        """
+        if value is None:
+            return
+        last = self.last.get(key)
+        self.last[key] = value
+        if not last:
+            return
+        move = abs(value - last) / abs(last)
+        vol = self.vols.get(key)
+        self.vols[key] = move if vol is None else vol + VOL_ALPHA * (move - vol)
+
+    @property
+    def vol(self):
+        return max(self.vols.values(), default=0.0)
+
+    def floor(self):
+        return max([self.min_interval] + [n / bucket.rate for bucket, n in self.budgets if bucket])
+
+    def pick_interval(self, seconds_to_expiry=None):
+        expiry = 1.0
+        if seconds_to_expiry is not None and self.expiry_window:
+            expiry = min(max(seconds_to_expiry / self.expiry_window, 0.0), 1.0)
+        vol = 1.0 / (1.0 + self.vol / self.vol_reference)
+        interval = self.min_interval + (self.max_interval - self.min_interval) * expiry * vol
+        return min(max(interval, self.floor()), max(self.max_interval, self.floor()))
+
+    async def wait(self, seconds_to_expiry=None, retry=False):
+        """
+        Waits for the next poll. retry=True (the last poll failed) polls again
+        at the fastest rate the budgets allow instead of a full interval.
+        """
+        self.interval = self.floor() if retry else self.pick_interval(seconds_to_expiry)
+        await super().wait()
+
+    def stats(self):
+        return super().stats() | {"vol": self.vol}
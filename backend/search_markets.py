@@ -1,34 +1,32 @@
-import requests
-import json
+import sys
+from market_catalog import MarketCatalog
 
-def search_markets():
-    url = "https://gamma-api.polymarket.com/events"
+def search_markets(refresh_pages=1):
+    """
+    Prints the open Bitcoin Up or Down markets from the local market catalog.
+    The first `refresh_pages` pages of the CLOB /markets endpoint are indexed
+    first; pass 0 to query the catalog as it is (see market_catalog.py).
+    """
+    catalog = MarketCatalog()
     try:
-        # Search for events with "bitcoin" in the slug or title
-        # The API might not support free text search easily on this endpoint, 
-        # but let's try listing active events or using a known tag if possible.
-        # Alternatively, we can check the 'markets' endpoint.
-        
-        url_markets = "https://clob.polymarket.com/markets"
-        response = requests.get(url_markets, params={"limit": 50, "active": True})
-        response.raise_for_status()
-        data = response.json()
-        
-        print(f"Found {len(data['data'])} markets.")
-        
-        for market in data['data']:
-            question = market.get('question', '').lower()
-            if 'bitcoin' in question and 'up or down' in question:
-                print(f"Question: {market['question']}")
-                print(f"Slug: {market.get('market_slug')}")
-                # Try to find price
-                tokens = market.get('tokens', [])
-                for token in tokens:
-                    print(f"  Outcome: {token.get('outcome')}, Price: {token.get('price')}")
-                print("-" * 30)
-                
+        if refresh_pages:
+            count, _ = catalog.index_live(max_pages=refresh_pages)
+            print(f"Indexed {count} markets.")
+
+        markets = catalog.find(["bitcoin", "up or down"], closed=False)
+        print(f"Found {len(markets)} markets.")
+
+        for market in markets:
+            print(f"Question: {market['question']}")
+            print(f"Slug: {market['slug']}")
+            for outcome, token_id in market['tokens'].items():
+                print(f"  Outcome: {outcome}, Token: {token_id}")
+            print("-" * 30)
+
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        catalog.close()
 
 if __name__ == "__main__":
-    search_markets()
+    search_markets(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+from shared_state import SharedState
+
+# Multi-worker API: one ingest process polls the venues and runs the simulators,
+# N uvicorn workers serve the state it publishes into shared memory. Venue
+# traffic and simulator state stay those of a single process however many
+# workers there are.
+#
+#   python serve.py --workers 4
+
+WORKERS = 4
+
+def run_ingest(state_name):
+    import api
+    try:
+        asyncio.run(api.run_ingest(state_name))
+    except KeyboardInterrupt:
+        pass
+
+def main():
+    import uvicorn
+    parser = argparse.ArgumentParser(description="Run the API with one ingest process and several read-only workers.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    state = SharedState.create(f"arb_state_{os.getpid()}")
+    ingest = multiprocessing.Process(target=run_ingest, args=(state.name,), name="ingest", daemon=True)
+    ingest.start()
+    # Inherited by the uvicorn workers, which import api.py afresh
+    os.environ["API_ROLE"] = "reader"
+    os.environ["SHARED_STATE"] = state.name
+    try:
+        uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        ingest.terminate()
+        ingest.join()
+        state.close()
+        state.unlink()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import struct
+import time
+import zlib
+from multiprocessing import shared_memory
+from snapshot import Snapshot
+
+# Published state shared by the ingest process and the read-only API workers (see serve.py)
+SLOTS = ("simulation", "simulations", "dashboard", "metrics", "cache")
+SLOT_INDEX = {name: i for i, name in enumerate(SLOTS)}
+SLOT_CAPACITY = 1 << 20
+
+# Segment header: writer boot id, reset requests from the workers, slot capacity
+HEADER = struct.Struct("<8sQQ")
+RESET_OFFSET = 8
+# Slot header: seqlock counter (odd while a write is in progress), version, body length, crc32 of the body
+SLOT_HEADER = struct.Struct("<QQQI4x")
+SEQ = struct.Struct("<Q")
+READ_RETRIES = 1000
+
+class SharedState:
+    """
+    Shared-memory segment with one slot per name in SLOTS, each holding the
+    latest (version, bytes) of a published snapshot.
+
+    There is one writer and any number of reader processes. The writer bumps
+    the slot's seqlock counter to odd, copies the body, then makes the counter
+    even again. A reader copies the body and keeps it only when the counter
+    was even and unchanged around the copy and the CRC matches, so it never
+    returns a half-written body.
+    """
+    def __init__(self, shm):
+        self.shm = shm
+        self.buf = shm.buf
+        self.capacity = HEADER.unpack_from(self.buf, 0)[2]
+
+    @classmethod
+    def create(cls, name=None, capacity=SLOT_CAPACITY):
+        size = HEADER.size + len(SLOTS) * (SLOT_HEADER.size + capacity)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(shm.buf, 0, b"\0" * 8, 0, capacity)
+        return cls(shm)
+
+    @classmethod
+    def attach(cls, name):
+        # Attaching registers the segment with the resource tracker again. The
+        # ingest process and the workers are children of serve.py and share its
+        # tracker, so that is a no-op and the segment lives until serve.py unlinks it.
+        return cls(shared_memory.SharedMemory(name=name))
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+    # --- HEADER ---
+
+    @property
+    def boot_id(self):
+        return HEADER.unpack_from(self.buf, 0)[0].decode()
+
+    def set_boot_id(self, boot_id):
+        self.buf[:8] = boot_id.encode()[:8].ljust(8, b"\0")
+
+    def reset_requests(self):
+        return SEQ.unpack_from(self.buf, RESET_OFFSET)[0]
+
+    def request_reset(self):
+        # Two workers incrementing at once can merge into one reset, which is harmless
+        SEQ.pack_into(self.buf, RESET_OFFSET, self.reset_requests() + 1)
+
+    # --- SLOTS ---
+
+    def _offset(self, slot):
+        return HEADER.size + SLOT_INDEX[slot] * (SLOT_HEADER.size + self.capacity)
+
+    def write(self, slot, version, body):
+        if len(body) > self.capacity:
+            raise ValueError(f"{slot}: {len(body)} bytes does not fit in a {self.capacity} byte slot")
+        offset = self._offset(slot)
+        seq = SEQ.unpack_from(self.buf, offset)[0]
+        SEQ.pack_into(self.buf, offset, seq + 1)
+        start = offset + SLOT_HEADER.size
+        self.buf[start:start + len(body)] = body
+        struct.pack_into("<QQI", self.buf, offset + SEQ.size, version, len(body), zlib.crc32(body))
+        SEQ.pack_into(self.buf, offset, seq + 2)
+
+    def version(self, slot):
+        """
+        Version of a slot's current body, without copying it (0 if never written).
+        """
+        return SLOT_HEADER.unpack_from(self.buf, self._offset(slot))[1]
+
+    def read(self, slot):
+        """
+        Returns (version, body) of a slot; (0, b"") if it was never written.
+        """
+        offset = self._offset(slot)
+        start = offset + SLOT_HEADER.size
+        for _ in range(READ_RETRIES):
+            seq, version, length, crc = SLOT_HEADER.unpack_from(self.buf, offset)
+            if not seq & 1:
+                body = bytes(self.buf[start:start + min(length, self.capacity)])
+                if SEQ.unpack_from(self.buf, offset)[0] == seq and zlib.crc32(body) == crc:
+                    return version, body
+            time.sleep(0)
+        raise TimeoutError(f"{slot}: no consistent read after {READ_RETRIES} tries")
+
+class SharedSnapshotCell:
+    """
+    Read-only stand-in for a SnapshotCell, backed by a SharedState slot.
+    The body is only copied out of shared memory when the version changes.
+    """
+    def __init__(self, state, slot, empty=b"null"):
+        self.state = state
+        self.slot = slot
+        self.empty = empty
+        self.snapshot = Snapshot(0, empty)
+
+    @property
+    def current(self):
+        if self.state.version(self.slot) != self.snapshot.version:
+            version, body = self.state.read(self.slot)
+            self.snapshot = Snapshot(version, body or self.empty, self.state.boot_id)
+        return self.snapshot
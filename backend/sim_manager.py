@@ -0,0 +1,270 @@
+import asyncio
+import itertools
+import multiprocessing
+from strategy import StrategySimulator
+from async_fetch import create_client, gather_results
+from fetch_current_polymarket import fetch_polymarket_data_struct_async
+from fetch_current_kalshi import fetch_kalshi_data_struct_async
+from scheduler import Cadence
+
+# Market keys
+POLYMARKET = "polymarket"
+
+# Parameter variants run on every market by default
+DEFAULT_SWEEP = {
+    "buy_size": [0.05],
+    "safety_margin": [0.97, 0.98, 0.99],
+    "window_size": [10, 30, 100],
+}
+
+def kalshi_key(strike):
+    # repr round-trips, so fractional strikes keep distinct keys
+    return f"kalshi:{float(strike)!r}"
+
+def venue_of(market):
+    return market.split(":", 1)[0]
+
+def market_views(poly_data=None, kalshi_data=None):
+    """
+    Splits one fetch into the per-market dicts the simulators tick on:
+    {market_key: {"prices": {"Up": ..., "Down": ...}, "slug": ...}}.
+    Each Kalshi strike becomes its own market, with YES as Up and NO as Down;
+    its slug is the event ticker, so instances roll over with the hour. A side
+    with no ask (0 cents) is priced None, as for an empty Polymarket book.
+    """
+    views = {}
+    if poly_data:
+        views[POLYMARKET] = poly_data
+    if kalshi_data:
+        for m in kalshi_data['markets']:
+            views[kalshi_key(m.strike)] = {
+                "prices": {"Up": m.yes_ask / 100.0 if m.yes_ask else None,
+                           "Down": m.no_ask / 100.0 if m.no_ask else None},
+                "slug": kalshi_data['event_ticker']
+            }
+    return views
+
+def param_grid(**param_lists):
+    """
+    param_grid(buy_size=[0.05, 0.1], window_size=[10, 100]) -> list of param dicts.
+    """
+    keys = list(param_lists)
+    return [dict(zip(keys, values)) for values in itertools.product(*param_lists.values())]
+
+class SimInstance:
+    """
+    One StrategySimulator bound to a market key. When the market's slug changes
+    (hourly rollover) the locked profit is banked and the simulator restarts.
+    """
+    def __init__(self, name, market, params):
+        self.name = name
+        self.market = market
+        self.params = params
+        self.sim = StrategySimulator(**params)
+        self.slug = None
+        self.banked_profit = 0.0
+        self.last_action = None
+
+    def tick(self, data):
+        if self.slug and data['slug'] != self.slug:
+            self.banked_profit += self.sim.locked_profit
+            self.sim = StrategySimulator(**self.params)
+        self.slug = data['slug']
+        self.last_action = self.sim.tick(data)
+        return self.last_action
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "market": self.market,
+            "slug": self.slug,
+            "params": self.params,
+            "locked_profit": self.banked_profit + self.sim.locked_profit,
+            "pair_cost": self.sim.pair_cost,
+            "qty_yes": self.sim.qty_yes,
+            "qty_no": self.sim.qty_no,
+            "last_action": self.last_action
+        }
+
+class SimShard:
+    """
+    A group of instances ticked together. Used directly in-process, or owned by
+    a worker process (see run_shard).
+    """
+    def __init__(self):
+        self.instances = {}
+        self.by_market = {}
+
+    def add(self, name, market, params):
+        instance = SimInstance(name, market, params)
+        self.instances[name] = instance
+        self.by_market.setdefault(market, []).append(instance)
+
+    def drop(self, markets):
+        for market in markets:
+            for instance in self.by_market.pop(market, ()):
+                del self.instances[instance.name]
+
+    def tick(self, views):
+        actions = {}
+        for market, data in views.items():
+            for instance in self.by_market.get(market, ()):
+                actions[instance.name] = instance.tick(data)
+        return actions
+
+    def summaries(self):
+        return [i.summary() for i in self.instances.values()]
+
+def run_shard(conn):
+    """
+    Worker process loop: owns a SimShard and answers commands from the manager.
+    A tick is answered with the actions and the shard's summaries after it.
+    """
+    shard = SimShard()
+    while True:
+        cmd, *args = conn.recv()
+        if cmd == "add":
+            shard.add(*args)
+        elif cmd == "drop":
+            shard.drop(args[0])
+        elif cmd == "tick":
+            conn.send((shard.tick(args[0]), shard.summaries()))
+        elif cmd == "close":
+            conn.close()
+            return
+
+class SimulatorManager:
+    """
+    Runs many StrategySimulator instances off one market-data fan-out.
+
+    With processes=0 every instance is ticked in the calling process. With
+    processes=N the instances are spread round-robin over N worker processes;
+    each tick sends the fetched views to every worker once and waits for all
+    of them, so one HTTP fetch feeds every configuration. Workers send their
+    summaries back with each tick, so summaries() never waits on a worker.
+
+    Instances of a market whose contract is over (a Kalshi strike missing from
+    the next hour's event) are dropped on the next tick.
+    """
+    def __init__(self, processes=0):
+        self.names = {}  # Instance name -> market key, in insertion order
+        self.slugs = {}  # Market key -> slug of its last view
+        self.local = SimShard() if processes == 0 else None
+        self.shard_summaries = [[] for _ in range(processes)]
+        self.workers = []
+        for _ in range(processes):
+            parent, child = multiprocessing.Pipe()
+            proc = multiprocessing.Process(target=run_shard, args=(child,), daemon=True)
+            proc.start()
+            self.workers.append((proc, parent))
+
+    def add(self, name, market=POLYMARKET, **params):
+        if name in self.names:
+            raise ValueError(f"Duplicate simulator name: {name}")
+        if self.local is not None:
+            self.local.add(name, market, params)
+        else:
+            _, conn = self.workers[len(self.names) % len(self.workers)]
+            conn.send(("add", name, market, params))
+        self.names[name] = market
+
+    def add_sweep(self, market=POLYMARKET, **param_lists):
+        """
+        Adds one instance per combination of the given parameter lists.
+        """
+        names = []
+        for params in param_grid(**param_lists):
+            name = market + ":" + ",".join(f"{k}={v}" for k, v in params.items())
+            if name not in self.names:
+                self.add(name, market, **params)
+                names.append(name)
+        return names
+
+    def __len__(self):
+        return len(self.names)
+
+    def expired(self, views):
+        """
+        Market keys seen before that are missing from `views` while another
+        market of their venue has moved on to a new slug.
+        """
+        live = {venue_of(market): data['slug'] for market, data in views.items()}
+        expired = [market for market, slug in self.slugs.items()
+                   if market not in views and live.get(venue_of(market), slug) != slug]
+        for market in expired:
+            del self.slugs[market]
+        for market, data in views.items():
+            self.slugs[market] = data['slug']
+        return expired
+
+    def drop(self, markets):
+        markets = set(markets)
+        if self.local is not None:
+            self.local.drop(markets)
+        else:
+            for _, conn in self.workers:
+                conn.send(("drop", markets))
+        self.names = {name: market for name, market in self.names.items() if market not in markets}
+
+    async def tick(self, views):
+        expired = self.expired(views)
+        if expired:
+            self.drop(expired)
+        if self.local is not None:
+            return self.local.tick(views)
+        for _, conn in self.workers:
+            conn.send(("tick", views))
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(loop.run_in_executor(None, conn.recv) for _, conn in self.workers))
+        actions = {}
+        for i, (result, summaries) in enumerate(results):
+            actions.update(result)
+            self.shard_summaries[i] = summaries
+        return actions
+
+    def summaries(self):
+        """
+        Every instance's summary, best locked profit first. With workers this
+        is as of the last tick.
+        """
+        if self.local is not None:
+            summaries = self.local.summaries()
+        else:
+            summaries = [s for shard in self.shard_summaries for s in shard]
+        return sorted(summaries, key=lambda s: s['locked_profit'], reverse=True)
+
+    def close(self):
+        for proc, conn in self.workers:
+            conn.send(("close",))
+            proc.join(timeout=1)
+        self.workers = []
+
+async def run_manager(manager, interval=1.0):
+    """
+    Standalone loop: one concurrent fetch of both venues per tick, fanned out to
+    every instance. New Kalshi strikes get the same sweep as the Polymarket market.
+    """
+    cadence = Cadence(interval)
+    async with create_client() as client:
+        while True:
+            (poly_data, poly_err), (kalshi_data, kalshi_err) = await gather_results(
+                fetch_polymarket_data_struct_async(client),
+                fetch_kalshi_data_struct_async(client)
+            )
+            if poly_err or kalshi_err:
+                print(f"Fetch error: {poly_err or kalshi_err}")
+            views = market_views(poly_data, kalshi_data)
+            for market in views:
+                manager.add_sweep(market, **DEFAULT_SWEEP)
+            await manager.tick(views)
+            await cadence.wait()
+
+if __name__ == "__main__":
+    manager = SimulatorManager(processes=multiprocessing.cpu_count())
+    try:
+        asyncio.run(run_manager(manager))
+    except KeyboardInterrupt:
+        for s in manager.summaries()[:10]:
+            print(f"{s['name']}: locked profit ${s['locked_profit']:.4f}, pair cost {s['pair_cost']:.3f}")
+    finally:
+        manager.close()
@@ -0,0 +1,58 @@
+import datetime
+import os
+import time
+from decoders import dumps
+
+# Distinguishes ETags across restarts, since versions start over at 1
+BOOT_ID = os.urandom(4).hex()
+
+class Snapshot:
+    """
+    One published version of a piece of state, already serialized. Never
+    modified after it is built, so a reader holding one sees a consistent view.
+    """
+    __slots__ = ("version", "body", "etag", "published_at")
+
+    def __init__(self, version, body, boot_id=BOOT_ID):
+        self.version = version
+        self.body = body
+        self.etag = f'"{boot_id}-{version}"'
+        self.published_at = time.time()
+
+    def matches(self, if_none_match):
+        """
+        True when an If-None-Match header already names this version.
+        """
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        return self.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+class SnapshotCell:
+    """
+    Latest Snapshot of some state. The writer (the event loop) calls publish()
+    once per tick; readers on any thread take `cell.current` once and use only
+    that object. Publishing swaps a single reference, so there is no lock and
+    no torn read. State that serializes to the same bytes keeps its version,
+    so clients revalidating with If-None-Match get a 304.
+    """
+    def __init__(self, initial=None):
+        self.key = dumps(initial)
+        self.current = Snapshot(1, self.key)
+
+    def publish(self, state, stamp_key=None):
+        """
+        Publishes `state` if it differs from the current version. With
+        stamp_key, the published copy also gets that key set to the time of
+        the change (ISO format), which is left out of the comparison.
+        """
+        key = dumps(state)
+        if key == self.key:
+            return self.current
+        body = key
+        if stamp_key:
+            body = dumps(dict(state, **{stamp_key: datetime.datetime.now().isoformat()}))
+        self.key = key
+        self.current = Snapshot(self.current.version + 1, body)
+        return self.current
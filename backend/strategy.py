@@ -0,0 +1,167 @@
+import datetime
+import numpy as np
+from ring_buffer import RollingWindow
+
+class StrategySimulator:
+    def __init__(self, buy_size=0.05, safety_margin=0.99, window_size=10, min_price_threshold=0.05,
+                 cheap_offset=0.005, keep_history=True):
+        # Portfolio State
+        self.qty_yes = 0
+        self.qty_no = 0
+        self.total_cost_yes = 0.0
+        self.total_cost_no = 0.0
+        
+        self.buy_size = buy_size
+        self.safety_margin = safety_margin
+        self.window_size = window_size
+        self.min_price_threshold = min_price_threshold
+        self.cheap_offset = cheap_offset  # How far under the recent mean counts as "cheap"
+        
+        self.price_history_yes = RollingWindow(window_size)
+        self.price_history_no = RollingWindow(window_size)
+        self.history = []
+        self.keep_history = keep_history  # Backtests turn the per-trade log off
+        self.fills = 0
+
+    @property
+    def avg_cost_yes(self):
+        return (self.total_cost_yes / self.qty_yes) if self.qty_yes > 0 else 0.0
+
+    @property
+    def avg_cost_no(self):
+        return (self.total_cost_no / self.qty_no) if self.qty_no > 0 else 0.0
+
+    @property
+    def pair_cost(self):
+        return self.avg_cost_yes + self.avg_cost_no
+
+    @property
+    def locked_profit(self):
+        matched_pairs = min(self.qty_yes, self.qty_no)
+        if matched_pairs == 0: return 0.0
+        cost_of_pairs = matched_pairs * self.pair_cost
+        return matched_pairs - cost_of_pairs
+
+    def tick(self, market_data):
+        if not market_data or 'prices' not in market_data:
+            return "No Data"
+
+        price_yes = market_data['prices'].get('Up')
+        price_no = market_data['prices'].get('Down')
+        
+        if price_yes is None or price_no is None:  
+            return "No liquidity"
+
+        # Update Price History
+        self.price_history_yes.push(price_yes)
+        self.price_history_no.push(price_no)
+
+        action = "Hold"
+        
+        # 1. Identify "Cheapness"
+        avg_recent_yes = self.price_history_yes.mean
+        avg_recent_no = self.price_history_no.mean
+        
+        is_cheap_yes = price_yes < (avg_recent_yes - self.cheap_offset) 
+        is_cheap_no = price_no < (avg_recent_no - self.cheap_offset)
+        
+        if price_yes < self.min_price_threshold: is_cheap_yes = False
+        if price_no < self.min_price_threshold: is_cheap_no = False
+        
+        return self._decide(price_yes, price_no, is_cheap_yes, is_cheap_no) or action
+
+    def tick_batch(self, prices_yes, prices_no, timestamps=None):
+        """
+        Same as calling tick() once per price pair, for backtests: the cheapness
+        signal is computed for the whole batch with NumPy and Python only runs on
+        the ticks that are cheap on either side. Rows with a NaN price are skipped
+        like "No liquidity" ticks. Returns the number of trades.
+        """
+        prices_yes = np.asarray(prices_yes, dtype=np.float64)
+        prices_no = np.asarray(prices_no, dtype=np.float64)
+        valid = ~(np.isnan(prices_yes) | np.isnan(prices_no))
+        if not valid.all():
+            prices_yes = prices_yes[valid]
+            prices_no = prices_no[valid]
+            if timestamps is not None:
+                timestamps = np.asarray(timestamps)[valid]
+        if len(prices_yes) == 0:
+            return 0
+
+        mean_yes = self._rolling_mean(self.price_history_yes, prices_yes)
+        mean_no = self._rolling_mean(self.price_history_no, prices_no)
+        cheap_yes = (prices_yes < mean_yes - self.cheap_offset) & (prices_yes >= self.min_price_threshold)
+        cheap_no = (prices_no < mean_no - self.cheap_offset) & (prices_no >= self.min_price_threshold)
+
+        fills = self.fills
+        for i in np.flatnonzero(cheap_yes | cheap_no):
+            timestamp = timestamps[i] if timestamps is not None else None
+            self._decide(float(prices_yes[i]), float(prices_no[i]), cheap_yes[i], cheap_no[i], timestamp)
+
+        self.price_history_yes.extend(prices_yes)
+        self.price_history_no.extend(prices_no)
+        return self.fills - fills
+
+    def _rolling_mean(self, window, prices):
+        """
+        Mean of the last window_size prices (including the current one) at every
+        position of `prices`, continuing from what is already in `window`.
+        """
+        history = window.values()
+        series = np.concatenate((history, prices))
+        sums = np.concatenate(([0.0], np.cumsum(series)))
+        ends = np.arange(len(history) + 1, len(series) + 1)
+        starts = np.maximum(ends - self.window_size, 0)
+        return (sums[ends] - sums[starts]) / (ends - starts)
+
+    def _decide(self, price_yes, price_no, is_cheap_yes, is_cheap_no, timestamp=None):
+        # 2. Check Pair Cost Impact
+        if is_cheap_yes:
+            cost = price_yes * self.buy_size
+            potential_pair_cost = ((self.total_cost_yes + cost)/(self.qty_yes + self.buy_size)) + self.avg_cost_no if self.qty_no > 0 else 0
+            
+            if self.qty_no == 0 or potential_pair_cost < self.safety_margin:
+                self._execute_trade("YES", price_yes, timestamp)
+                return f"Bought YES @ {price_yes:.3f}"
+
+        elif is_cheap_no:
+            cost = price_no * self.buy_size
+            potential_pair_cost = self.avg_cost_yes + ((self.total_cost_no + cost)/(self.qty_no + self.buy_size)) if self.qty_yes > 0 else 0
+            
+            if self.qty_yes == 0 or potential_pair_cost < self.safety_margin:
+                self._execute_trade("NO", price_no, timestamp)
+                return f"Bought NO @ {price_no:.3f}"
+        
+        return None
+
+    def _execute_trade(self, side, price, timestamp=None):
+        cost = price * self.buy_size
+        
+        if side == "YES":
+            self.qty_yes += self.buy_size
+            self.total_cost_yes += cost
+        else:
+            self.qty_no += self.buy_size
+            self.total_cost_no += cost
+        self.fills += 1
+        if not self.keep_history:
+            return
+            
+        when = datetime.datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.datetime.now()
+        self.history.append({
+            "timestamp": when.strftime("%H:%M:%S"),
+            "side": side,
+            "price": price,
+            "size": self.buy_size
+        })
+
+    def get_state(self):
+        return {
+            "qty_yes": self.qty_yes,
+            "qty_no": self.qty_no,
+            "avg_cost_yes": self.avg_cost_yes,
+            "avg_cost_no": self.avg_cost_no,
+            "pair_cost": self.pair_cost,
+            "locked_profit": self.locked_profit, 
+            "history": self.history[-10:]
+        }
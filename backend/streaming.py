@@ -0,0 +1,350 @@
+import abc
+import asyncio
+import json
+import datetime
+import websockets
+from order_book import OrderBook, BID, ASK
+from fetch_current_polymarket import CLOB_TICK_SIZE, fill_clob_book
+from fetch_current_kalshi import KALSHI_TICK_SIZE, fill_kalshi_book
+from decoders import KalshiMarket, loads
+
+# Endpoints
+POLYMARKET_WS_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+KALSHI_WS_URL = "wss://api.elections.kalshi.com/trade-api/ws/v2"
+BINANCE_WS_URL = "wss://stream.binance.com:9443/ws"
+
+RECONNECT_DELAY = 0.5
+MAX_RECONNECT_DELAY = 30.0
+
+class SequenceGap(Exception):
+    pass
+
+# --- BOOKS ---
+
+class BookListener:
+    def __init__(self):
+        self.changed = set()
+        self._event = asyncio.Event()
+
+    def notify(self, instrument):
+        self.changed.add(instrument)
+        self._event.set()
+
+    async def wait(self):
+        """
+        Waits for the next book change and returns every instrument changed since
+        the last call. Bursts of deltas are coalesced into one wake-up.
+        """
+        await self._event.wait()
+        self._event.clear()
+        changed, self.changed = self.changed, set()
+        return changed
+
+class BookStore:
+    """
+    In-memory books per instrument plus last trade prices, shared by all feeds.
+    Consumers call subscribe() and await listener.wait() instead of sleeping.
+    """
+    def __init__(self):
+        self.books = {}
+        self.last_prices = {}
+        self.listeners = []
+
+    def book(self, instrument, tick_size=None):
+        """
+        Returns the book for an instrument, creating it on first use.
+        Feeds register their books up front with the venue's tick size.
+        """
+        if instrument not in self.books:
+            self.books[instrument] = OrderBook(tick_size or CLOB_TICK_SIZE)
+        return self.books[instrument]
+
+    def set_last_price(self, instrument, price):
+        self.last_prices[instrument] = price
+        self.mark_changed(instrument)
+
+    def subscribe(self):
+        listener = BookListener()
+        self.listeners.append(listener)
+        return listener
+
+    def mark_changed(self, instrument):
+        for listener in self.listeners:
+            listener.notify(instrument)
+
+# --- FEEDS ---
+
+class Feed(abc.ABC):
+    """
+    Reconnecting WebSocket feed. Subclasses send their subscription in
+    subscribe() and apply messages to the store in handle(). Raising
+    SequenceGap from handle() drops the affected books and resubscribes,
+    which makes the venue send fresh snapshots.
+    """
+    name = "feed"
+
+    def __init__(self, store, url, headers=None, record_path=None):
+        self.store = store
+        self.url = url
+        self.headers = headers
+        self.record_path = record_path
+        self.messages = 0
+        self.resyncs = 0
+        self.running = True
+
+    async def subscribe(self, ws):
+        pass
+
+    @abc.abstractmethod
+    def handle(self, msg):
+        """
+        Applies one decoded message to the store.
+        """
+
+    def instruments(self):
+        return []
+
+    def invalidate(self):
+        for instrument in self.instruments():
+            self.store.book(instrument).clear()
+            self.store.mark_changed(instrument)
+
+    async def run(self):
+        delay = RECONNECT_DELAY
+        record = open(self.record_path, "a") if self.record_path else None
+        try:
+            while self.running:
+                try:
+                    async with websockets.connect(self.url, additional_headers=self.headers) as ws:
+                        await self.subscribe(ws)
+                        delay = RECONNECT_DELAY
+                        async for raw in ws:
+                            if record:
+                                record.write(raw if isinstance(raw, str) else raw.decode())
+                                record.write("\n")
+                            self.messages += 1
+                            self.handle(loads(raw))
+                except SequenceGap as e:
+                    print(f"[{self.name}] Sequence gap ({e}), resyncing...")
+                    self.resyncs += 1
+                    delay = RECONNECT_DELAY
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"[{self.name}] Connection error: {e}")
+                self.invalidate()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+        finally:
+            if record:
+                record.close()
+
+    def stop(self):
+        self.running = False
+
+class PolymarketMarketFeed(Feed):
+    """
+    Polymarket CLOB market channel. Books are keyed by token id, priced in dollars.
+    The channel has no sequence numbers, so a delta for a token we have no
+    snapshot for is treated as a gap.
+    """
+    name = "polymarket"
+
+    def __init__(self, store, token_ids, url=POLYMARKET_WS_URL, **kwargs):
+        super().__init__(store, url, **kwargs)
+        self.token_ids = list(token_ids)
+        for token_id in self.token_ids:
+            store.book(token_id, CLOB_TICK_SIZE)
+
+    def instruments(self):
+        return self.token_ids
+
+    async def subscribe(self, ws):
+        await ws.send(json.dumps({"assets_ids": self.token_ids, "type": "market"}))
+
+    def handle(self, msg):
+        events = msg if isinstance(msg, list) else [msg]
+        for event in events:
+            event_type = event.get("event_type")
+            if event_type == "book":
+                asset_id = event["asset_id"]
+                fill_clob_book(self.store.book(asset_id, CLOB_TICK_SIZE), event)
+                self.store.mark_changed(asset_id)
+            elif event_type == "price_change":
+                # Older payloads carry one asset with `changes`, newer ones carry `price_changes`
+                changes = event.get("price_changes")
+                if changes is None:
+                    changes = [dict(c, asset_id=event["asset_id"]) for c in event.get("changes", [])]
+                for change in changes:
+                    asset_id = change["asset_id"]
+                    book = self.store.book(asset_id)
+                    if not book.synced:
+                        raise SequenceGap(f"delta before snapshot for {asset_id}")
+                    side = BID if change["side"] == "BUY" else ASK
+                    book.set_level(side, float(change["price"]), float(change["size"]))
+                    self.store.mark_changed(asset_id)
+
+class KalshiOrderbookFeed(Feed):
+    """
+    Kalshi orderbook_delta channel. Books are keyed by market ticker, in cents.
+    Kalshi only publishes bids, so a NO bid at p is stored as a YES ask at 100 - p:
+    best_ask() is the YES ask and 100 - best_bid() is the NO ask.
+    The handshake needs Kalshi's signed API-key headers (pass them as `headers`).
+    """
+    name = "kalshi"
+
+    def __init__(self, store, tickers, url=KALSHI_WS_URL, **kwargs):
+        super().__init__(store, url, **kwargs)
+        self.tickers = list(tickers)
+        self.last_seq = {}
+        for ticker in self.tickers:
+            store.book(ticker, KALSHI_TICK_SIZE)
+
+    def instruments(self):
+        return self.tickers
+
+    async def subscribe(self, ws):
+        self.last_seq = {}
+        await ws.send(json.dumps({
+            "id": 1,
+            "cmd": "subscribe",
+            "params": {"channels": ["orderbook_delta"], "market_tickers": self.tickers}
+        }))
+
+    def check_seq(self, sid, seq):
+        last = self.last_seq.get(sid)
+        if last is not None and seq != last + 1:
+            raise SequenceGap(f"sid {sid}: expected {last + 1}, got {seq}")
+        self.last_seq[sid] = seq
+
+    def handle(self, msg):
+        msg_type = msg.get("type")
+        if msg_type == "orderbook_snapshot":
+            self.check_seq(msg["sid"], msg["seq"])
+            body = msg["msg"]
+            ticker = body["market_ticker"]
+            fill_kalshi_book(self.store.book(ticker, KALSHI_TICK_SIZE), body)
+            self.store.mark_changed(ticker)
+        elif msg_type == "orderbook_delta":
+            self.check_seq(msg["sid"], msg["seq"])
+            body = msg["msg"]
+            ticker = body["market_ticker"]
+            book = self.store.book(ticker)
+            if not book.synced:
+                raise SequenceGap(f"delta before snapshot for {ticker}")
+            if body["side"] == "yes":
+                book.add_to_level(BID, body["price"], body["delta"])
+            else:
+                book.add_to_level(ASK, 100 - body["price"], body["delta"])
+            self.store.mark_changed(ticker)
+        elif msg_type == "error":
+            print(f"[{self.name}] Error: {msg.get('msg')}")
+
+class BinanceTradeFeed(Feed):
+    """
+    Binance trade stream. Keeps the last trade price under the symbol name.
+    Trade ids are consecutive, so skipped ids are counted as gaps; a missed
+    trade does not invalidate the last price, so there is nothing to resync.
+    """
+    name = "binance"
+
+    def __init__(self, store, symbol, url=BINANCE_WS_URL, **kwargs):
+        super().__init__(store, f"{url}/{symbol.lower()}@trade", **kwargs)
+        self.symbol = symbol
+        self.last_trade_id = None
+        self.gaps = 0
+
+    def handle(self, msg):
+        if msg.get("e") != "trade":
+            return
+        trade_id = msg["t"]
+        if self.last_trade_id is not None and trade_id != self.last_trade_id + 1:
+            self.gaps += 1
+        self.last_trade_id = trade_id
+        self.store.set_last_price(self.symbol, float(msg["p"]))
+
+# --- MARKET DATA VIEWS ---
+
+def build_polymarket_data(store, slug, outcome_tokens, price_to_beat=None):
+    """
+    Builds the same dict fetch_polymarket_data_struct returns, from the live books.
+    outcome_tokens maps outcome name ("Up"/"Down") to CLOB token id. An outcome
+    whose book has no asks is priced None.
+    """
+    prices = {outcome: store.book(token_id).best_ask() for outcome, token_id in outcome_tokens.items()}
+    return {
+        "prices": prices,
+        "slug": slug,
+        "target_time_utc": datetime.datetime.now().isoformat(),
+        "price_to_beat": price_to_beat,
+        "token_ids": outcome_tokens
+    }
+
+def build_kalshi_data(store, event_ticker, markets, symbol=None):
+    """
+    Builds the same dict fetch_kalshi_data_struct returns, from the live books.
+    `markets` is the KalshiMarket list from discovery; only strike, subtitle and ticker are used.
+    """
+    market_data = []
+    for m in markets:
+        book = store.book(m.ticker)
+        best_bid = book.best_bid()
+        best_ask = book.best_ask()
+        market_data.append(KalshiMarket(
+            m.ticker, m.subtitle, m.strike,
+            best_bid or 0,
+            best_ask or 0,
+            (100 - best_ask) if best_ask is not None else 0,
+            (100 - best_bid) if best_bid is not None else 0
+        ))
+    return {
+        "event_ticker": event_ticker,
+        "current_price": store.last_prices.get(symbol),
+        "markets": market_data
+    }
+
+# --- FAKE FEED ---
+
+def load_messages(path):
+    """
+    Loads a feed recording (one raw message per line, as written by record_path).
+    """
+    with open(path) as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+class ReplayFeedServer:
+    """
+    Local WebSocket server that replays recorded messages to every client.
+    Point any Feed at `server.url` to run it without touching a venue:
+
+        async with ReplayFeedServer(load_messages("poly.jsonl")) as server:
+            feed = PolymarketMarketFeed(store, tokens, url=server.url)
+    """
+    def __init__(self, messages, interval=0.0, host="127.0.0.1", port=0):
+        self.messages = [m if isinstance(m, str) else json.dumps(m) for m in messages]
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self.server = None
+        self.connections = 0
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def _serve(self, ws):
+        self.connections += 1
+        for message in self.messages:
+            await ws.send(message)
+            if self.interval:
+                await asyncio.sleep(self.interval)
+        await ws.wait_closed()
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self._serve, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
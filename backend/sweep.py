@@ -0,0 +1,185 @@
+import argparse
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from backtest import load_series, backtest_series, SERIES_DTYPE
+from sim_manager import POLYMARKET, param_grid
+
+# Search space: (low, high) for random/bayes, the lists in DEFAULT_GRID for grid mode
+SEARCH_SPACE = {
+    "buy_size": (0.01, 0.5),
+    "safety_margin": (0.90, 1.0),
+    "window_size": (3, 500),
+    "min_price_threshold": (0.0, 0.2),
+    "cheap_offset": (0.0, 0.03),
+}
+INT_PARAMS = {"window_size"}
+
+DEFAULT_GRID = {
+    "buy_size": [0.05, 0.1, 0.25],
+    "safety_margin": [0.96, 0.97, 0.98, 0.99],
+    "window_size": [5, 10, 30, 100, 300],
+    "min_price_threshold": [0.05],
+    "cheap_offset": [0.0, 0.005, 0.01, 0.02],
+}
+
+# --- SHARED DATASET ---
+
+class SharedSeries:
+    """
+    A market series copied once into a shared memory block. Workers attach to it
+    by name and read it as a NumPy array, so the dataset is never pickled per task.
+    """
+    def __init__(self, series):
+        self.length = len(series)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(series.nbytes, 1))
+        np.ndarray(self.length, dtype=SERIES_DTYPE, buffer=self.shm.buf)[:] = series
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+# Set in each worker by _attach
+_worker = {}
+
+def _attach(shm_name, length, spans, resolutions):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker["shm"] = shm  # Keep the mapping alive for the life of the worker
+    _worker["series"] = np.ndarray(length, dtype=SERIES_DTYPE, buffer=shm.buf)
+    _worker["spans"] = spans
+    _worker["resolutions"] = resolutions
+
+def _evaluate(params):
+    report = backtest_series(_worker["series"], _worker["spans"], _worker["resolutions"], **params)
+    return {
+        "params": params,
+        "locked_profit": report["total_locked_profit"],
+        "pnl": report["total_pnl"],
+        "max_drawdown": report["max_drawdown"],
+        "fills": report["total_fills"],
+        "avg_pair_cost": report["avg_pair_cost"],
+        "unsettled_hours": report["unsettled_hours"]
+    }
+
+# --- SEARCH ---
+
+def _to_params(unit_points):
+    """
+    Maps points in [0, 1]^d onto SEARCH_SPACE.
+    """
+    names = list(SEARCH_SPACE)
+    results = []
+    for point in unit_points:
+        params = {}
+        for name, u in zip(names, point):
+            low, high = SEARCH_SPACE[name]
+            value = low + float(u) * (high - low)
+            params[name] = int(round(value)) if name in INT_PARAMS else value
+        results.append(params)
+    return results
+
+def _to_unit(params):
+    return [(params[name] - low) / (high - low) for name, (low, high) in SEARCH_SPACE.items()]
+
+def random_params(n, rng):
+    return _to_params(rng.random((n, len(SEARCH_SPACE))))
+
+def expected_improvement(x_seen, y_seen, candidates, length_scale=0.2, noise=1e-6):
+    """
+    Gaussian-process (RBF kernel) expected improvement of each candidate over the
+    best score seen so far. Inputs live in [0, 1]^d.
+    """
+    from math import erf, sqrt, pi
+    mean_y, std_y = y_seen.mean(), y_seen.std() or 1.0
+    y = (y_seen - mean_y) / std_y
+
+    def kernel(a, b):
+        d2 = ((a[:, None, :] - b[None, :, :]) ** 2).sum(-1)
+        return np.exp(-0.5 * d2 / length_scale ** 2)
+
+    K = kernel(x_seen, x_seen) + noise * np.eye(len(x_seen))
+    L = np.linalg.cholesky(K)
+    alpha = np.linalg.solve(L.T, np.linalg.solve(L, y))
+    Ks = kernel(candidates, x_seen)
+    mu = Ks @ alpha
+    v = np.linalg.solve(L, Ks.T)
+    sigma = np.sqrt(np.maximum(1.0 - (v * v).sum(0), 1e-12))
+
+    z = (mu - y.max()) / sigma
+    cdf = 0.5 * (1.0 + np.vectorize(erf)(z / sqrt(2.0)))
+    pdf = np.exp(-0.5 * z * z) / sqrt(2.0 * pi)
+    return (mu - y.max()) * cdf + sigma * pdf
+
+def rank(results):
+    """
+    Best locked profit first; ties go to the smaller drawdown.
+    """
+    return sorted(results, key=lambda r: (-r["locked_profit"], r["max_drawdown"]))
+
+def run_sweep(path, mode="grid", samples=200, workers=None, market=POLYMARKET, resolutions=None,
+              grid=None, batch=None, seed=0):
+    """
+    Evaluates parameter sets for StrategySimulator on a recorded tick file and
+    returns the results ranked by locked profit and drawdown.
+
+    grid:   every combination of `grid` (DEFAULT_GRID by default)
+    random: `samples` uniform draws from SEARCH_SPACE
+    bayes:  a random first batch, then batches picked by GP expected improvement
+            on locked profit, until `samples` sets have been evaluated
+    """
+    series, spans = load_series(path, market)
+    shared = SharedSeries(series)
+    del series
+    workers = workers or os.cpu_count()
+    batch = batch or workers * 4
+    rng = np.random.default_rng(seed)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shared.name, shared.length, spans, resolutions or {})) as pool:
+            if mode == "grid":
+                candidates = param_grid(**(grid or DEFAULT_GRID))
+                return rank(pool.map(_evaluate, candidates, chunksize=max(1, len(candidates) // (workers * 8))))
+            if mode == "random":
+                candidates = random_params(samples, rng)
+                return rank(pool.map(_evaluate, candidates, chunksize=max(1, samples // (workers * 8))))
+            if mode == "bayes":
+                results = list(pool.map(_evaluate, random_params(min(batch, samples), rng)))
+                while len(results) < samples:
+                    x_seen = np.array([_to_unit(r["params"]) for r in results])
+                    y_seen = np.array([r["locked_profit"] for r in results])
+                    pool_points = rng.random((4096, len(SEARCH_SPACE)))
+                    ei = expected_improvement(x_seen, y_seen, pool_points)
+                    best = pool_points[np.argsort(-ei)[:min(batch, samples - len(results))]]
+                    results.extend(pool.map(_evaluate, _to_params(best)))
+                return rank(results)
+            raise ValueError(f"Unknown sweep mode: {mode}")
+    finally:
+        shared.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep StrategySimulator parameters over recorded ticks.")
+    parser.add_argument("path", help="Tick CSV or recorder directory (see backtest.py)")
+    parser.add_argument("--mode", choices=["grid", "random", "bayes"], default="grid")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--market", default=POLYMARKET)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    results = run_sweep(args.path, mode=args.mode, samples=args.samples, workers=args.workers, market=args.market)
+    print(f"Evaluated {len(results)} parameter sets.")
+    if results and results[0]["unsettled_hours"]:
+        print(f"{results[0]['unsettled_hours']} hour(s) had no strike or resolution price and are left out of PnL.")
+    print("-" * 50)
+    for r in results[:args.top]:
+        params = ", ".join(f"{k}={v:.4g}" for k, v in r["params"].items())
+        print(f"Locked: ${r['locked_profit']:9.3f} | PnL: ${r['pnl']:+9.3f} | DD: ${r['max_drawdown']:8.3f} | "
+              f"Fills: {r['fills']:7d} | {params}")
+
+if __name__ == "__main__":
+    main()
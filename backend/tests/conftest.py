@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The backend is a flat set of modules run from backend/; make them importable
+# when pytest is started from the repo root or from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,33 @@
+import asyncio
+import numpy as np
+import api
+import backtest
+from recorder import TickRecorder
+
+SLUG = "bitcoin-up-or-down-december-5-9pm-et"
+
+def test_polled_hour_round_trips_with_its_strike(tmp_path, monkeypatch):
+    async def fetch_poly(client):
+        return {"prices": {"Up": 0.48, "Down": 0.51}, "slug": SLUG, "target_time_utc": "2025-12-05T21:00:00"}, None
+
+    async def fetch_open(client, target_time):
+        return 97000.0, None
+
+    monkeypatch.setattr(api, "fetch_polymarket_data_struct_async", fetch_poly)
+    monkeypatch.setattr(api, "get_binance_hour_open_async", fetch_open)
+    monkeypatch.setattr(api, "recorder", TickRecorder(str(tmp_path)))
+
+    async def poll():
+        data, err = await api.fetch_market_data(None)
+        assert err is None
+        await api.process_market_data(data)
+
+    asyncio.run(poll())
+    api.recorder.flush()
+    api.recorder.close()
+
+    series, spans = backtest.load_recorded_series(str(tmp_path))
+    assert [slug for slug, _, _ in spans] == [SLUG]
+    assert np.isfinite(series["strike"]).all()
+    report = backtest.backtest_series(series, spans, {SLUG: 97100.0})
+    assert report["unsettled_hours"] == 0
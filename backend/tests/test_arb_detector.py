@@ -0,0 +1,129 @@
+import random
+import pytest
+from arb_detector import ArbDetector, OPEN, CLOSE
+from arb_scanner import KalshiLadder, POLY_DOWN_KALSHI_YES, POLY_UP_KALSHI_NO, scan_pairs, find_opportunities
+
+POLY_STRIKE = 97000.0
+STRIKES = [96500.0, 96750.0, 97000.0, 97250.0, 97500.0]
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def rescan(poly_up, poly_down, quotes, min_margin=0.0):
+    """
+    Open pairs by brute force: every pair priced again with arb_scanner. Prices
+    sit on the mil grid, so the epsilon only keeps float noise out of a tie at $1.
+    """
+    strikes = sorted(quotes)
+    ladder = KalshiLadder(strikes, [quotes[s][0] for s in strikes], [quotes[s][1] for s in strikes])
+    pairs = find_opportunities(scan_pairs(POLY_STRIKE, poly_up, poly_down, ladder), min_margin + 1e-9)
+    return {(int(p["strategy"]), float(p["strike"])) for p in pairs}
+
+def evaluated(detector):
+    """
+    Records the (strategy, strike) pairs each update re-checks.
+    """
+    calls = []
+    set_pair = detector._set
+
+    def recording(strategy, strike, is_open, now):
+        calls.append((strategy, strike))
+        return set_pair(strategy, strike, is_open, now)
+    detector._set = recording
+    return calls
+
+def seeded(clock=None):
+    quotes = {96500.0: (0.60, 0.42), 96750.0: (0.55, 0.47), 97000.0: (0.50, 0.52),
+              97250.0: (0.44, 0.58), 97500.0: (0.38, 0.64)}
+    detector = ArbDetector(clock=clock or Clock())
+    detector.reset(POLY_STRIKE, 0.49, 0.50, [(s, y, n) for s, (y, n) in quotes.items()])
+    return detector, quotes
+
+def test_random_updates_match_a_full_rescan():
+    rng = random.Random(7)
+    detector = ArbDetector(clock=Clock())
+    up, down = 0.5, 0.5
+    quotes = {s: (0.5, 0.5) for s in STRIKES}
+    detector.reset(POLY_STRIKE, up, down, [(s, y, n) for s, (y, n) in quotes.items()])
+    opened = set(detector.open)
+    for _ in range(2000):
+        if rng.random() < 0.3:
+            up, down = rng.choice([0.0, rng.randint(1, 999) / 1000]), rng.choice([0.0, rng.randint(1, 999) / 1000])
+            events = detector.update_poly(up=up, down=down)
+        else:
+            strike = rng.choice(STRIKES)
+            quotes[strike] = (rng.choice([0.0, rng.randint(1, 99) / 100]), rng.choice([0.0, rng.randint(1, 99) / 100]))
+            events = detector.update_kalshi(strike, *quotes[strike])
+        for e in events:
+            key = (e.strategy, e.strike)
+            if e.kind == OPEN:
+                assert key not in opened
+                opened.add(key)
+            else:
+                assert key in opened
+                opened.remove(key)
+        assert set(detector.open) == opened == rescan(up, down, quotes)
+
+def test_min_margin_matches_a_rescan():
+    detector = ArbDetector(min_margin=0.03, clock=Clock())
+    quotes = {s: (0.5, 0.5) for s in STRIKES}
+    detector.reset(POLY_STRIKE, 0.45, 0.48, [(s, y, n) for s, (y, n) in quotes.items()])
+    assert set(detector.open) == rescan(0.45, 0.48, quotes, 0.03) == {
+        (POLY_UP_KALSHI_NO, s) for s in STRIKES if s >= POLY_STRIKE}
+
+def test_poly_up_change_only_checks_strikes_at_or_above_the_price_to_beat():
+    detector, _ = seeded()
+    calls = evaluated(detector)
+    detector.update_poly(up=0.30)
+    assert calls
+    assert all(strategy == POLY_UP_KALSHI_NO and strike >= POLY_STRIKE for strategy, strike in calls)
+
+def test_poly_down_change_only_checks_strikes_at_or_below_the_price_to_beat():
+    detector, _ = seeded()
+    calls = evaluated(detector)
+    detector.update_poly(down=0.30)
+    assert calls
+    assert all(strategy == POLY_DOWN_KALSHI_YES and strike <= POLY_STRIKE for strategy, strike in calls)
+
+def test_kalshi_change_only_checks_that_strike():
+    detector, _ = seeded()
+    calls = evaluated(detector)
+    detector.update_kalshi(96750.0, 0.40, 0.47)
+    assert {strike for _, strike in calls} == {96750.0}
+    calls.clear()
+    detector.update_kalshi(97000.0, 0.40, 0.40)
+    assert set(calls) == {(POLY_DOWN_KALSHI_YES, 97000.0), (POLY_UP_KALSHI_NO, 97000.0)}
+
+def test_open_and_close_fire_once_with_timestamps():
+    clock = Clock()
+    detector, _ = seeded(clock)
+    assert detector.open == {}
+
+    clock.now = 1010.0
+    (event,) = detector.update_kalshi(97250.0, 0.44, 0.45)
+    assert (event.kind, event.strategy, event.strike) == (OPEN, POLY_UP_KALSHI_NO, 97250.0)
+    assert (event.ts, event.opened_at) == (1010.0, 1010.0)
+    assert event.margin == pytest.approx(0.06)
+    assert detector.update_kalshi(97250.0, 0.44, 0.45) == []
+    assert detector.update_kalshi(97250.0, 0.44, 0.46) == []  # Still open, cheaper or not
+
+    clock.now = 1025.0
+    (event,) = detector.update_kalshi(97250.0, 0.44, 0.52)
+    assert (event.kind, event.ts, event.opened_at) == (CLOSE, 1025.0, 1010.0)
+    assert detector.update_kalshi(97250.0, 0.44, 0.60) == []
+
+def test_no_ask_leg_closes_open_pairs():
+    detector, _ = seeded()
+    detector.update_kalshi(97250.0, 0.44, 0.45)
+    detector.update_kalshi(96750.0, 0.45, 0.47)
+    assert set(detector.open) == {(POLY_UP_KALSHI_NO, 97250.0), (POLY_DOWN_KALSHI_YES, 96750.0)}
+
+    (event,) = detector.update_poly(up=0)
+    assert (event.kind, event.strategy, event.strike) == (CLOSE, POLY_UP_KALSHI_NO, 97250.0)
+    (event,) = detector.update_kalshi(96750.0, 0, 0.47)
+    assert (event.kind, event.strategy, event.strike) == (CLOSE, POLY_DOWN_KALSHI_YES, 96750.0)
+    assert detector.open == {}
@@ -0,0 +1,71 @@
+import random
+import pytest
+from arb_scanner import (KalshiLadder, POLY_DOWN_KALSHI_YES, POLY_UP_KALSHI_NO, scan_events, scan_pairs,
+                         find_opportunities)
+from arbitrage_bot import evaluate_arbitrage
+from decoders import KalshiMarket
+
+def scalar_scan(poly_strike, poly_up, poly_down, markets):
+    """
+    The per-strike loop check_arbitrage used before the scan was vectorized:
+    Down + YES below the price to beat, Up + NO above it, both at equal
+    strikes, an opportunity when the pair costs under $1. A leg priced 0 has
+    no ask to buy, so it is not an opportunity.
+    """
+    found = set()
+    for m in markets:
+        yes, no = m.yes_ask / 100.0, m.no_ask / 100.0
+        checks = []
+        if poly_strike >= m.strike:
+            checks.append((POLY_DOWN_KALSHI_YES, poly_down, yes))
+        if poly_strike <= m.strike:
+            checks.append((POLY_UP_KALSHI_NO, poly_up, no))
+        for strategy, poly_cost, kalshi_cost in checks:
+            if poly_cost > 0 and kalshi_cost > 0 and poly_cost + kalshi_cost < 1.00:
+                found.add((strategy, m.strike, round(poly_cost + kalshi_cost, 9)))
+    return found
+
+def as_set(pairs):
+    return {(int(p["strategy"]), float(p["strike"]), round(float(p["total_cost"]), 9)) for p in pairs}
+
+def random_event(rng):
+    strikes = [96000.0 + 250 * i for i in range(rng.randint(1, 12))]
+    # Often exactly on a strike, to hit the equal-strike boundary
+    poly_strike = rng.choice(strikes) if rng.random() < 0.5 else rng.uniform(95500, 99500)
+    markets = [KalshiMarket(f"T{s:.0f}", "", s, 0, rng.choice([0, rng.randint(1, 99)]), 0,
+                            rng.choice([0, rng.randint(1, 99)])) for s in strikes]
+    poly_up = rng.choice([0.0, rng.randint(1, 999) / 1000])
+    poly_down = rng.choice([0.0, rng.randint(1, 999) / 1000])
+    return poly_strike, poly_up, poly_down, markets
+
+def test_vectorized_scan_matches_the_scalar_loop():
+    rng = random.Random(5)
+    for _ in range(500):
+        poly_strike, up, down, markets = random_event(rng)
+        pairs = scan_pairs(poly_strike, up, down, KalshiLadder.from_markets(markets))
+        assert as_set(find_opportunities(pairs)) == scalar_scan(poly_strike, up, down, markets)
+        assert list(pairs["margin"]) == sorted(pairs["margin"], reverse=True)
+
+def test_batched_events_match_one_scan_each():
+    rng = random.Random(9)
+    events = [random_event(rng) for _ in range(20)]
+    pairs = find_opportunities(scan_events([(s, u, d, KalshiLadder.from_markets(m)) for s, u, d, m in events]))
+    for i, (poly_strike, up, down, markets) in enumerate(events):
+        assert as_set(pairs[pairs["event"] == i]) == scalar_scan(poly_strike, up, down, markets)
+
+def test_equal_strike_checks_both_pairs_and_skips_no_ask_legs():
+    markets = [KalshiMarket("A", "", 97000.0, 0, 45, 0, 0), KalshiMarket("B", "", 97250.0, 0, 0, 0, 40)]
+    pairs = scan_pairs(97000.0, 0.50, 0.50, KalshiLadder.from_markets(markets))
+    # 97000 has no NO ask, so only its Down + YES pair is priced
+    assert [(int(p["strategy"]), p["strike"]) for p in pairs] == [
+        (POLY_UP_KALSHI_NO, 97250.0), (POLY_DOWN_KALSHI_YES, 97000.0)]
+    assert pairs["margin"] == pytest.approx([0.10, 0.05])
+    assert len(scan_pairs(97000.0, 0.0, 0.0, KalshiLadder.from_markets(markets))) == 0
+
+def test_evaluate_arbitrage_reports_the_scalar_opportunities():
+    rng = random.Random(3)
+    for _ in range(50):
+        poly_strike, up, down, markets = random_event(rng)
+        poly_data = {"price_to_beat": poly_strike, "prices": {"Up": up, "Down": down}}
+        opportunities = evaluate_arbitrage(poly_data, None, {"markets": markets}, None)
+        assert as_set(opportunities) == scalar_scan(poly_strike, up, down, markets)
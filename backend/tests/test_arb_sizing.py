@@ -0,0 +1,89 @@
+import random
+import pytest
+from arb_scanner import POLY_DOWN_KALSHI_YES, POLY_UP_KALSHI_NO
+from arb_sizing import ladder_arrays, size_legs, size_pair
+from order_book import OrderBook
+
+def naive_walk(levels_a, levels_b, payout=1.0):
+    """
+    Buys one leg of each ladder at a time, level by level, while a pair costs
+    less than the payout. Returns (size, cost).
+    """
+    a, b = [list(l) for l in levels_a], [list(l) for l in levels_b]
+    size = cost = 0.0
+    while a and b and a[0][0] + b[0][0] < payout:
+        take = min(a[0][1], b[0][1])
+        size += take
+        cost += take * (a[0][0] + b[0][0])
+        for ladder in (a, b):
+            ladder[0][1] -= take
+            if ladder[0][1] == 0:
+                ladder.pop(0)
+    return size, cost
+
+def with_fee(levels, rate):
+    return [(p + rate * p * (1 - p), s) for p, s in levels]
+
+def sized(levels_a, levels_b):
+    return size_legs(*ladder_arrays(levels_a), *ladder_arrays(levels_b))
+
+def test_uneven_depth_matches_a_naive_walk():
+    a = [(0.40, 5), (0.45, 10), (0.50, 2)]
+    b = [(0.50, 3), (0.52, 4), (0.54, 20)]
+    arb = sized(a, b)
+    size, cost = naive_walk(a, b)
+    assert size == 15  # The last Poly level (0.50) meets 0.54 and costs $1.04
+    assert (arb.max_size, arb.total_cost) == pytest.approx((size, cost))
+    assert arb.avg_cost == pytest.approx(cost / size)
+    assert list(arb.curve_size) == [0, 3, 5, 7, 15]
+
+def test_payout_crossed_in_the_middle_of_a_level():
+    # 0.45 + 0.54 still pays; the third b level (0.56) stops it after 2 of the 10 at 0.45
+    a = [(0.40, 5), (0.45, 10)]
+    b = [(0.50, 3), (0.54, 4), (0.56, 20)]
+    arb = sized(a, b)
+    assert (arb.max_size, arb.total_cost) == pytest.approx(naive_walk(a, b))
+    assert arb.max_size == 7
+    assert arb.profit == pytest.approx(7 - (3 * 0.90 + 2 * 0.94 + 2 * 0.99))
+
+def test_fee_pushes_a_level_over_the_payout():
+    poly = OrderBook(0.001)
+    poly.apply_snapshot([], [(0.49, 10), (0.50, 10)])
+    kalshi = OrderBook(1)
+    kalshi.apply_snapshot([], [(50, 12), (51, 30)])  # YES asks in cents
+    arb = size_pair(POLY_DOWN_KALSHI_YES, poly, kalshi, kalshi_fee_rate=0.07)
+    # 0.49 + 0.50 pays, but the 0.0175 fee on the Kalshi leg takes it over $1
+    assert arb.max_size == 0
+    assert size_pair(POLY_DOWN_KALSHI_YES, poly, kalshi, kalshi_fee_rate=0.0).max_size == 10
+
+    kalshi.apply_snapshot([], [(40, 12), (51, 30)])
+    expected = naive_walk(poly.levels("ask"), with_fee([(0.40, 12), (0.51, 30)], 0.07))
+    arb = size_pair(POLY_DOWN_KALSHI_YES, poly, kalshi, kalshi_fee_rate=0.07)
+    assert (arb.max_size, arb.total_cost) == pytest.approx(expected)
+    assert arb.max_size == 12
+
+def test_no_asks_come_from_yes_bids():
+    poly = OrderBook(0.001)
+    poly.apply_snapshot([], [(0.45, 10)])
+    kalshi = OrderBook(1)
+    kalshi.apply_snapshot([(52, 4), (50, 20)], [])  # NO asks at 48 and 50 cents
+    arb = size_pair(POLY_UP_KALSHI_NO, poly, kalshi, kalshi_fee_rate=0.0)
+    assert (arb.max_size, arb.total_cost) == pytest.approx((10, 4 * 0.93 + 6 * 0.95))
+
+def test_one_side_empty_sizes_to_zero():
+    for a, b in (([], [(0.40, 5)]), ([(0.40, 5)], [])):
+        arb = sized(a, b)
+        assert (arb.max_size, arb.total_cost, arb.profit, arb.avg_cost) == (0.0, 0.0, 0.0, 0.0)
+    poly = OrderBook(0.001)
+    poly.apply_snapshot([], [(0.40, 5)])
+    assert size_pair(POLY_UP_KALSHI_NO, poly, OrderBook(1)).max_size == 0
+
+def test_random_ladders_match_a_naive_walk():
+    rng = random.Random(11)
+    for _ in range(500):
+        ladders = []
+        for _ in range(2):
+            prices = sorted(rng.sample(range(20, 80), rng.randint(1, 6)))
+            ladders.append([(p / 100, rng.randint(1, 50)) for p in prices])
+        arb = sized(*ladders)
+        assert (arb.max_size, arb.total_cost) == pytest.approx(naive_walk(*ladders))
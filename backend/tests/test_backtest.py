@@ -0,0 +1,41 @@
+import numpy as np
+import backtest
+from decoders import KalshiMarket
+from recorder import TickRecorder
+from sim_manager import kalshi_key
+from strategy import StrategySimulator
+
+def holding(qty_yes, qty_no, cost):
+    sim = StrategySimulator(keep_history=False)
+    sim.qty_yes, sim.qty_no = qty_yes, qty_no
+    sim.total_cost_yes = cost
+    return sim
+
+def test_settle_pays_the_winning_side():
+    sim = holding(2.0, 1.0, 1.5)
+    assert backtest.settle(sim, 97000.0, 97000.0) == ("Up", 0.5)
+    assert backtest.settle(sim, 97000.0, 96999.0) == ("Down", -0.5)
+
+def test_settle_without_strike_or_resolution_is_unsettled():
+    sim = holding(2.0, 1.0, 1.5)
+    assert backtest.settle(sim, np.nan, 97000.0) == (backtest.UNSETTLED, None)
+    assert backtest.settle(sim, 97000.0, np.nan) == (backtest.UNSETTLED, None)
+
+def test_unsettled_hours_are_left_out_of_pnl():
+    settled = {"ticks": 1, "fills": 1, "qty_yes": 1, "qty_no": 0, "pair_cost": 0.0, "locked_profit": 0.0, "pnl": 0.4}
+    unsettled = dict(settled, pnl=None)
+    report = backtest.summarize([settled, unsettled])
+    assert report["total_pnl"] == 0.4
+    assert report["unsettled_hours"] == 1
+
+def test_recorded_kalshi_strikes_load_exactly(tmp_path):
+    rec = TickRecorder(str(tmp_path))
+    rec.record_kalshi({"event_ticker": "KXBTCD-25DEC0522", "current_price": 97000.0, "markets": [
+        KalshiMarket("A", "", 97250.0, 40, 45, 55, 60),
+        KalshiMarket("B", "", 97250.5, 30, 35, 65, 70),
+    ]}, ts=1764986400.0)
+    rec.close()
+    series, spans = backtest.load_recorded_series(str(tmp_path), kalshi_key(97250.5))
+    assert len(series) == 1
+    assert series["strike"][0] == 97250.5
+    assert series["up"][0] == 0.35
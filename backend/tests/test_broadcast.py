@@ -0,0 +1,48 @@
+import asyncio
+import json
+from broadcast import Broadcaster, SNAPSHOT, DELTA
+
+def first_frames(broadcaster, last_seq):
+    """
+    (event, id, payload) of each frame the broadcaster sends first to a client resuming from last_seq.
+    """
+    async def read():
+        stream = broadcaster.frames(last_seq)
+        chunk = await stream.__anext__()
+        await stream.aclose()
+        return chunk
+    frames = []
+    for block in asyncio.run(read()).decode().strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        frames.append((fields["event"], int(fields["id"]), json.loads(fields["data"])))
+    return frames
+
+def test_resume_replays_missed_deltas():
+    b = Broadcaster()
+    b.publish({"x": 1})
+    b.publish({"x": 2}, ["fill"])
+    b.publish({"x": 3})
+    frames = first_frames(b, 1)
+    assert [(kind, seq) for kind, seq, _ in frames] == [(DELTA, 2), (DELTA, 3)]
+    assert frames[0][2]["events"] == ["fill"]
+
+def test_mirrored_ids_resume_across_broadcasters():
+    # Two workers mirroring one upstream; the second never saw version 6
+    a, b = Broadcaster(), Broadcaster()
+    for version, x in ((5, 1), (6, 2), (7, 3)):
+        a.publish({"x": x}, seq=version)
+    b.publish({"x": 1}, snapshot=True, seq=5)
+    b.publish({"x": 3}, seq=7)
+
+    assert [(kind, seq) for kind, seq, _ in first_frames(b, 5)] == [(DELTA, 7)]
+    (kind, seq, payload), = first_frames(b, 6)
+    assert (kind, seq, payload["state"]) == (SNAPSHOT, 7, {"x": 3})
+    assert first_frames(a, 6)[0][:2] == (DELTA, 7)
+
+def test_upstream_restart_forgets_old_ids():
+    b = Broadcaster()
+    b.publish({"x": 1}, snapshot=True, seq=40)
+    b.publish({"x": 2}, seq=41)
+    b.publish({"x": 0}, snapshot=True, seq=2)
+    (kind, seq, payload), = first_frames(b, 40)
+    assert (kind, seq, payload["state"]) == (SNAPSHOT, 2, {"x": 0})
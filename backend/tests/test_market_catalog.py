@@ -0,0 +1,47 @@
+import io
+import json
+import market_catalog
+import venue_client
+from market_catalog import MarketCatalog, END_CURSOR
+
+class PageResponse:
+    def __init__(self, page):
+        self.raw = io.BytesIO(json.dumps(page).encode())
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.raw.close()
+
+def clob_market(condition_id, slug):
+    return {"condition_id": condition_id, "question": slug.replace("-", " "), "market_slug": slug,
+            "active": True, "closed": False, "tokens": [{"outcome": "Up", "token_id": condition_id + "-up"}]}
+
+def test_index_live_pages_through_the_venue_client(monkeypatch):
+    pages = {
+        "": {"data": [clob_market("0x1", "bitcoin-up-or-down")], "next_cursor": "MQ=="},
+        "MQ==": {"data": [clob_market("0x2", "ethereum-up-or-down")], "next_cursor": END_CURSOR},
+    }
+    calls = []
+
+    def get(url, params=None, timeout=None, stream=False):
+        calls.append((url, params["next_cursor"], stream))
+        return PageResponse(pages[params["next_cursor"]])
+    monkeypatch.setattr(venue_client, "get", get)
+
+    catalog = MarketCatalog(":memory:")
+    assert catalog.index_live() == (2, END_CURSOR)
+    assert calls == [(market_catalog.CLOB_MARKETS_URL, "", True), (market_catalog.CLOB_MARKETS_URL, "MQ==", True)]
+    assert catalog.get("0x2")["slug"] == "ethereum-up-or-down"
+
+def test_multibyte_character_split_across_reads():
+    data = json.dumps({"data": [clob_market("0x1", "café-up-or-down")], "next_cursor": END_CURSOR},
+                      ensure_ascii=False).encode()
+    i = data.index("é".encode())
+    chunks = [data[:i], data[i:i + 1], data[i + 1:]]
+    markets = list(market_catalog.iter_markets(lambda n: chunks.pop(0) if chunks else b""))
+    assert [m["slug"] for m in markets] == ["café-up-or-down"]
@@ -0,0 +1,82 @@
+import random
+from order_book import OrderBook, BID, ASK
+
+def test_snapshot_replaces_both_sides_best_first():
+    book = OrderBook(0.01)
+    book.apply_snapshot([(0.45, 10), (0.47, 5), (0.40, 0)], [(0.52, 3), (0.49, 7)])
+    assert book.synced
+    assert (book.best_bid(), book.best_ask()) == (0.47, 0.49)
+    assert book.levels(BID) == [(0.47, 5), (0.45, 10)]
+    assert book.levels(ASK) == [(0.49, 7), (0.52, 3)]
+    assert book.levels(ASK, depth=1) == [(0.49, 7)]
+
+    book.apply_snapshot([(0.30, 1)], [])
+    assert book.levels(BID) == [(0.30, 1)]
+    assert book.best_ask() is None
+
+def test_empty_sides():
+    book = OrderBook(0.01)
+    assert (book.best_bid(), book.best_ask()) == (None, None)
+    assert (book.best_bid_ticks(), book.best_ask_ticks()) == (None, None)
+    assert book.levels(BID) == book.levels(ASK) == []
+    assert not book.synced
+    assert book.cost_to_buy(5) == (0.0, 0.0)
+
+def test_size_zero_deletes_the_level():
+    book = OrderBook(0.01)
+    book.apply_snapshot([(0.45, 10), (0.47, 5)], [(0.49, 7)])
+    book.set_level(BID, 0.47, 0)
+    assert book.levels(BID) == [(0.45, 10)]
+    book.set_level(ASK, 0.49, 0)
+    assert book.best_ask() is None
+    book.set_level(BID, 0.33, 0)  # Deleting a missing level is a no-op
+    assert book.levels(BID) == [(0.45, 10)]
+    assert (book.bid_keys, book.ask_keys, book.ask_sizes) == ([45], [], {})
+
+def test_add_to_level_at_or_below_zero_removes_it():
+    book = OrderBook(1)
+    book.apply_snapshot([(40, 10)], [(45, 10)])
+    book.add_to_level(BID, 42, 5)
+    assert book.levels(BID) == [(42, 5), (40, 10)]
+    book.add_to_level(BID, 42, -5)
+    assert book.levels(BID) == [(40, 10)]
+    book.add_to_level(ASK, 45, -12)
+    assert book.best_ask() is None
+    assert book.ask_sizes == {}
+
+def test_prices_round_to_the_nearest_tick():
+    cents = OrderBook(0.01)
+    # 0.29 / 0.01 is 28.999999999999996 in floats
+    cents.set_level(BID, 0.29, 1)
+    cents.set_level(BID, 0.294, 2)
+    cents.set_level(ASK, 0.296, 3)
+    assert cents.bid_sizes == {29: 2}
+    assert (cents.best_bid(), cents.best_ask()) == (0.29, 0.3)
+
+    kalshi = OrderBook(1)
+    kalshi.set_level(ASK, 55, 4)
+    kalshi.set_level(ASK, 55.0, 6)
+    assert kalshi.levels(ASK) == [(55, 6)]
+    assert isinstance(kalshi.best_ask(), int)
+
+def test_random_updates_match_a_dict_of_levels():
+    rng = random.Random(2)
+    book = OrderBook(0.001)
+    expected = {BID: {}, ASK: {}}
+    for _ in range(5000):
+        side = rng.choice([BID, ASK])
+        ticks = rng.randint(1, 60)
+        size = rng.choice([0, rng.randint(1, 100)])
+        if rng.random() < 0.5:
+            book.set_level(side, ticks / 1000, size)
+            new = size
+        else:
+            delta = rng.randint(-50, 50)
+            book.add_to_level(side, ticks / 1000, delta)
+            new = expected[side].get(ticks, 0) + delta
+        if new > 0:
+            expected[side][ticks] = new
+        else:
+            expected[side].pop(ticks, None)
+        assert book.levels(BID) == [(t / 1000, s) for t, s in sorted(expected[BID].items(), reverse=True)]
+        assert book.levels(ASK) == [(t / 1000, s) for t, s in sorted(expected[ASK].items())]
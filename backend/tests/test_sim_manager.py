@@ -0,0 +1,58 @@
+import asyncio
+from decoders import KalshiMarket
+from sim_manager import SimulatorManager, kalshi_key, market_views
+
+def kalshi_data(event_ticker, strikes):
+    return {"event_ticker": event_ticker, "current_price": 97000.0,
+            "markets": [KalshiMarket(f"{event_ticker}-{s}", "", s, 40, 45, 55, 60) for s in strikes]}
+
+def run_hours(manager, *hours):
+    async def run():
+        for data in hours:
+            views = market_views(kalshi_data=data)
+            for market in views:
+                manager.add_sweep(market, window_size=[10, 30])
+            await manager.tick(views)
+    asyncio.run(run())
+
+def test_fractional_strikes_keep_their_own_key():
+    assert kalshi_key(97250.5) != kalshi_key(97250.0)
+    assert kalshi_key(97250) == kalshi_key(97250.0)
+
+def test_strikes_missing_after_rollover_are_dropped():
+    manager = SimulatorManager()
+    run_hours(manager, kalshi_data("KXBTCD-25DEC0521", [97000.0, 97250.5]),
+              kalshi_data("KXBTCD-25DEC0522", [97250.5, 97500.0]))
+    markets = {s['market'] for s in manager.summaries()}
+    assert markets == {kalshi_key(97250.5), kalshi_key(97500.0)}
+    assert len(manager) == 4
+
+def test_missing_venue_does_not_expire_its_markets():
+    manager = SimulatorManager()
+    run_hours(manager, kalshi_data("KXBTCD-25DEC0521", [97000.0]))
+    asyncio.run(manager.tick({}))
+    assert len(manager) == 2
+
+def test_worker_summaries_come_back_with_the_tick():
+    manager = SimulatorManager(processes=2)
+    try:
+        run_hours(manager, kalshi_data("KXBTCD-25DEC0521", [97000.0]),
+                  kalshi_data("KXBTCD-25DEC0522", [97500.0]))
+        summaries = manager.summaries()
+        assert {s['market'] for s in summaries} == {kalshi_key(97500.0)}
+        assert all(s['slug'] == "KXBTCD-25DEC0522" for s in summaries)
+    finally:
+        manager.close()
+
+def test_kalshi_side_without_an_ask_is_no_liquidity():
+    data = kalshi_data("KXBTCD-25DEC0522", [97000.0])
+    data["markets"].append(KalshiMarket("KXBTCD-25DEC0522-97250", "", 97250.0, 40, 0, 100, 0))
+    views = market_views(kalshi_data=data)
+    assert views[kalshi_key(97000.0)]["prices"] == {"Up": 0.45, "Down": 0.6}
+    assert views[kalshi_key(97250.0)]["prices"] == {"Up": None, "Down": None}
+
+    manager = SimulatorManager()
+    manager.add("empty", kalshi_key(97250.0))
+    actions = asyncio.run(manager.tick(views))
+    assert actions == {"empty": "No liquidity"}
+    assert manager.local.instances["empty"].sim.qty_yes == 0
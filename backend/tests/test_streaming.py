@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+import streaming
+from arb_detector import ArbDetector, OPEN
+from arb_scanner import POLY_DOWN_KALSHI_YES
+from arbitrage_bot import kalshi_quotes
+from decoders import KalshiMarket
+from streaming import (BookStore, Feed, PolymarketMarketFeed, KalshiOrderbookFeed, ReplayFeedServer,
+                       build_polymarket_data, build_kalshi_data)
+
+TICKER = "KXBTCD-25DEC0522-T97000"
+
+def poly_book(asset_id, bid, ask):
+    return {"event_type": "book", "asset_id": asset_id,
+            "bids": [{"price": str(bid), "size": "10"}], "asks": [{"price": str(ask), "size": "10"}]}
+
+def kalshi_snapshot(seq, yes_bid, no_bid):
+    return {"type": "orderbook_snapshot", "sid": 1, "seq": seq,
+            "msg": {"market_ticker": TICKER, "yes": [[yes_bid, 10]], "no": [[no_bid, 10]]}}
+
+def kalshi_delta(seq, side, price, delta):
+    return {"type": "orderbook_delta", "sid": 1, "seq": seq,
+            "msg": {"market_ticker": TICKER, "side": side, "price": price, "delta": delta}}
+
+@pytest.fixture(autouse=True)
+def fast_reconnect(monkeypatch):
+    monkeypatch.setattr(streaming, "RECONNECT_DELAY", 0.01)
+
+async def run_until(feeds, done, timeout=5.0):
+    """
+    Runs the feeds until done() is true, checking after every book change.
+    """
+    listener = feeds[0].store.subscribe()
+    tasks = [asyncio.create_task(feed.run()) for feed in feeds]
+    try:
+        async def wait():
+            while not done():
+                await listener.wait()
+        await asyncio.wait_for(wait(), timeout)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def test_empty_book_is_priced_none():
+    store = BookStore()
+    store.book("up-token").apply_snapshot([(0.47, 10)], [(0.49, 10)])
+    store.book("down-token").apply_snapshot([(0.5, 10)], [])
+    data = build_polymarket_data(store, "slug", {"Up": "up-token", "Down": "down-token"}, 97000.0)
+    assert data["prices"] == {"Up": 0.49, "Down": None}
+    assert data["token_ids"] == {"Up": "up-token", "Down": "down-token"}
+
+def test_feed_needs_a_handler():
+    with pytest.raises(TypeError):
+        Feed(BookStore(), "ws://127.0.0.1")
+
+def test_polymarket_snapshots_and_deltas():
+    messages = [
+        [poly_book("up", 0.45, 0.48), poly_book("down", 0.49, 0.52)],
+        {"event_type": "price_change", "price_changes": [{"asset_id": "up", "side": "SELL", "price": "0.47", "size": "5"}]},
+        {"event_type": "price_change", "asset_id": "down",
+         "changes": [{"side": "SELL", "price": "0.52", "size": "0"}, {"side": "SELL", "price": "0.5", "size": "3"}]},
+    ]
+    store = BookStore()
+
+    async def run():
+        async with ReplayFeedServer(messages) as server:
+            feed = PolymarketMarketFeed(store, ["up", "down"], url=server.url)
+            await run_until([feed], lambda: feed.messages == len(messages))
+    asyncio.run(run())
+    assert store.book("up").best_ask() == 0.47
+    assert store.book("down").best_ask() == 0.5
+    assert store.book("down").best_bid() == 0.49
+
+def test_kalshi_sequence_gap_resubscribes_from_a_snapshot():
+    messages = [kalshi_snapshot(1, 40, 55), kalshi_delta(2, "no", 58, 5), kalshi_delta(4, "yes", 41, 5)]
+    store = BookStore()
+    asks = []
+
+    async def run():
+        async with ReplayFeedServer(messages) as server:
+            feed = KalshiOrderbookFeed(store, [TICKER], url=server.url)
+            handle = feed.handle
+
+            def recording(msg):
+                handle(msg)
+                asks.append(store.book(TICKER).best_ask())
+            feed.handle = recording
+            await run_until([feed], lambda: server.connections >= 2 and len(asks) >= 4)
+            return feed
+    feed = asyncio.run(run())
+    assert feed.resyncs >= 1
+    # The gap dropped the book; the next connection started over from its snapshot
+    assert asks[:4] == [45, 42, 45, 42]
+
+def test_feeds_drive_the_detector():
+    poly_messages = [[poly_book("up", 0.45, 0.48), poly_book("down", 0.49, 0.52)]]
+    kalshi_messages = [kalshi_snapshot(1, 30, 55), kalshi_delta(2, "no", 60, 5)]
+    markets = [KalshiMarket(TICKER, "$97,000 or above", 97000.0, 0, 0, 0, 0)]
+    store = BookStore()
+    detector = ArbDetector()
+    events = []
+
+    def synced():
+        return all(store.book(i).synced for i in ("up", "down", TICKER))
+
+    async def run():
+        async with ReplayFeedServer(poly_messages) as poly, ReplayFeedServer(kalshi_messages) as kalshi:
+            poly_feed = PolymarketMarketFeed(store, ["up", "down"], url=poly.url)
+            kalshi_feed = KalshiOrderbookFeed(store, [TICKER], url=kalshi.url)
+            await run_until([poly_feed, kalshi_feed], lambda: synced() and kalshi_feed.messages == 2)
+    asyncio.run(run())
+
+    prices = build_polymarket_data(store, "slug", {"Up": "up", "Down": "down"}, 97000.0)["prices"]
+    kalshi_data = build_kalshi_data(store, "KXBTCD-25DEC0522", markets)
+    events += detector.reset(97000.0, prices["Up"], prices["Down"], kalshi_quotes(kalshi_data["markets"]), market="slug")
+    # The NO bid at 60 is a YES ask at 40 cents, which pairs with Down at 0.52
+    assert [(e.kind, e.strategy, e.strike) for e in events] == [(OPEN, POLY_DOWN_KALSHI_YES, 97000.0)]
+    assert events[0].margin == pytest.approx(0.08)
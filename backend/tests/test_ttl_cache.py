@@ -0,0 +1,48 @@
+import asyncio
+from ttl_cache import TTLCache
+
+def counting_loader(result, delay=0.01):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+    return load, calls
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache("test_single_flight")
+    load, calls = counting_loader(("book", None))
+
+    async def run():
+        return await asyncio.gather(*(cache.get_async("token", load) for _ in range(5)))
+    assert asyncio.run(run()) == [("book", None)] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+    assert cache.loading == {}
+
+def test_errors_are_shared_but_not_cached():
+    cache = TTLCache("test_single_flight_errors")
+    load, calls = counting_loader((None, "timeout"))
+
+    async def run():
+        first = await asyncio.gather(cache.get_async("token", load), cache.get_async("token", load))
+        return first, await cache.get_async("token", load)
+    first, second = asyncio.run(run())
+    assert first == [(None, "timeout")] * 2
+    assert second == (None, "timeout")
+    assert len(calls) == 2
+
+def test_cancelled_caller_does_not_cancel_the_shared_load():
+    cache = TTLCache("test_single_flight_cancel")
+    load, calls = counting_loader(("book", None), delay=0.05)
+
+    async def run():
+        impatient = asyncio.create_task(cache.get_async("token", load))
+        patient = asyncio.create_task(cache.get_async("token", load))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await patient
+    assert asyncio.run(run()) == ("book", None)
+    assert len(calls) == 1
+    assert cache.peek("token") == "book"
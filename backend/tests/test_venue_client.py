@@ -0,0 +1,123 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+import venue_client
+from async_fetch import get_json, gather_results
+
+class StubVenue:
+    """
+    Local HTTP server answering each request with the next (status, headers)
+    of a script, then 200 once the script runs out. Counts the requests.
+    """
+    def __init__(self, *script):
+        self.script = list(script)
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                status, headers = stub.script.pop(0) if stub.script else (200, {})
+                body = json.dumps({"status": status}).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/book"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub():
+    venues = []
+
+    def start(*script):
+        venues.append(StubVenue(*script))
+        return venues[-1]
+    yield start
+    for venue in venues:
+        venue.close()
+
+def closed_port_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}/book"
+
+def fetch(coro_fn, *args):
+    async def run():
+        async with venue_client.create_async_client() as client:
+            return await coro_fn(client, *args)
+    return asyncio.run(run())
+
+def test_async_retries_retryable_statuses_with_backoff(stub):
+    venue = stub((503, {}), (429, {}))
+    started = time.monotonic()
+    response = fetch(venue_client.get_async, venue.url)
+    assert response.status_code == 200
+    assert venue.requests == 3
+    assert time.monotonic() - started >= venue_client.RETRY_BACKOFF * (1 + 2)
+
+def test_async_returns_the_last_response_when_retries_run_out(stub):
+    venue = stub(*[(502, {})] * (venue_client.RETRY_TOTAL + 1))
+    response = fetch(venue_client.get_async, venue.url)
+    assert response.status_code == 502
+    assert venue.requests == venue_client.RETRY_TOTAL + 1
+
+def test_async_does_not_retry_client_errors(stub):
+    venue = stub((404, {}))
+    with pytest.raises(httpx.HTTPStatusError):
+        fetch(get_json, venue.url)
+    assert venue.requests == 1
+
+def test_async_transport_error_is_raised_after_retries():
+    with pytest.raises(httpx.TransportError):
+        fetch(venue_client.get_async, closed_port_url())
+
+def test_gather_results_turns_errors_into_results(stub):
+    venue = stub()
+
+    async def ok(client):
+        return await get_json(client, venue.url), None
+
+    async def broken(client):
+        return await get_json(client, closed_port_url()), None
+
+    async def run():
+        async with venue_client.create_async_client() as client:
+            return await gather_results(ok(client), broken(client))
+    (data, err), (missing, error) = asyncio.run(run())
+    assert (data, err) == ({"status": 200}, None)
+    assert missing is None and error
+
+def test_sync_retries_and_respects_retry_after(stub):
+    venue = stub((503, {}), (429, {"Retry-After": "0"}))
+    response = venue_client.get(venue.url)
+    assert response.status_code == 200
+    assert venue.requests == 3
+
+def test_sync_returns_the_last_response_when_retries_run_out(stub):
+    venue = stub(*[(500, {})] * (venue_client.RETRY_TOTAL + 1))
+    response = venue_client.get(venue.url)
+    assert response.status_code == 500
+    assert venue.requests == venue_client.RETRY_TOTAL + 1
+
+def test_unlisted_hosts_are_not_rate_limited(stub):
+    venue = stub()
+    assert venue_client.bucket_for(venue.url) is None
+    assert venue_client.bucket_for("https://clob.polymarket.com/book") is not None
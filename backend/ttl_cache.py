@@ -0,0 +1,174 @@
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 60.0
+DEFAULT_MAX_SIZE = 1024
+
+# Every cache by name, for cache_stats()
+CACHES = {}
+
+class CacheEntry:
+    def __init__(self, value, ttl, stale_ttl):
+        now = time.monotonic()
+        self.value = value
+        self.expires_at = now + ttl
+        self.stale_until = self.expires_at + stale_ttl
+        self.refreshing = False
+
+class TTLCache:
+    """
+    Keyed cache with per-key TTLs and LRU eviction past max_size.
+
+    get()/get_async() take a loader returning (value, err) like the fetch
+    functions; errors are returned as-is and never cached. Once an entry's TTL
+    has passed it is still served for up to stale_ttl seconds while a single
+    background refresh runs (a thread for get(), a task for get_async()).
+    Concurrent get_async() misses on a key share one loader call.
+    """
+    def __init__(self, name, ttl=DEFAULT_TTL, stale_ttl=0.0, max_size=DEFAULT_MAX_SIZE):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.loading = {}  # key -> task of the get_async() load in flight
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self.errors = 0
+        self.coalesced = 0
+        CACHES[name] = self
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _lookup(self, key):
+        """
+        Returns (entry, needs_refresh); entry is None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            now = time.monotonic()
+            if now < entry.expires_at:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry, False
+            if now < entry.stale_until:
+                self.entries.move_to_end(key)
+                self.stale_hits += 1
+                needs_refresh = not entry.refreshing
+                entry.refreshing = True
+                return entry, needs_refresh
+            del self.entries[key]
+            self.misses += 1
+            return None, False
+
+    def peek(self, key):
+        entry, _ = self._lookup(key)
+        return entry.value if entry else None
+
+    def put(self, key, value, ttl=None):
+        entry = CacheEntry(value, self.ttl if ttl is None else ttl, self.stale_ttl)
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def _store(self, key, result, ttl):
+        value, err = result
+        if err is None:
+            self.put(key, value, ttl)
+        else:
+            self.errors += 1
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False  # Let the next stale hit try again
+        return value, err
+
+    def get(self, key, loader, ttl=None):
+        entry, needs_refresh = self._lookup(key)
+        if entry is None:
+            return self._store(key, loader(), ttl)
+        if needs_refresh:
+            self.refreshes += 1
+            threading.Thread(target=self._refresh, args=(key, loader, ttl), daemon=True).start()
+        return entry.value, None
+
+    async def get_async(self, key, loader, ttl=None):
+        entry, needs_refresh = self._lookup(key)
+        if entry is None:
+            return await self._load_async(key, loader, ttl)
+        if needs_refresh:
+            self.refreshes += 1
+            asyncio.create_task(self._refresh_async(key, loader, ttl))
+        return entry.value, None
+
+    async def _load_async(self, key, loader, ttl):
+        """
+        Loads a missed key, or waits for the load already in flight for it. The
+        load is shielded, so a caller giving up does not cancel it for the others.
+        """
+        task = self.loading.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._load(key, loader, ttl))
+            task.add_done_callback(functools.partial(self._loaded, key))
+            self.loading[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _load(self, key, loader, ttl):
+        return self._store(key, await loader(), ttl)
+
+    def _loaded(self, key, task):
+        if self.loading.get(key) is task:
+            del self.loading[key]
+
+    def _refresh(self, key, loader, ttl):
+        try:
+            self._store(key, loader(), ttl)
+        except Exception as e:
+            self._store(key, (None, str(e)), ttl)
+
+    async def _refresh_async(self, key, loader, ttl):
+        try:
+            self._store(key, await loader(), ttl)
+        except Exception as e:
+            self._store(key, (None, str(e)), ttl)
+
+    def stats(self):
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "coalesced": self.coalesced
+        }
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in CACHES.items()}
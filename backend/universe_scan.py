@@ -0,0 +1,84 @@
+import asyncio
+import datetime
+from async_fetch import gather_results
+from fetch_current_polymarket import get_market_tokens_async, fetch_clob_books_async, outcome_prices
+from fetch_current_kalshi import fetch_kalshi_event_async, get_binance_prices_async, get_binance_open_async
+from market_schedule import schedule_for, PREFETCH_LEAD
+from metrics import timed
+
+# One scan of every tracked market over one shared client. The requests per
+# scan do not grow with the number of markets on the Polymarket and Binance
+# side: all outcome books go in one batched CLOB request and all spot prices
+# in one Binance request. Gamma token ids and prices to beat are cached per
+# contract period, and Kalshi is asked once per distinct event, concurrently.
+
+def current_markets(families):
+    return [schedule_for(f).current() for f in families]
+
+def upcoming_markets(families, lead=PREFETCH_LEAD):
+    """
+    Next period's markets of the families that roll over within `lead` seconds.
+    """
+    return [schedule_for(f).next() for f in families if schedule_for(f).seconds_to_rollover() <= lead]
+
+async def resolve_tokens_async(client, markets):
+    """
+    {poly_slug: ({outcome: token_id}, err)} for every market, from the Gamma cache.
+    """
+    results = await gather_results(*(get_market_tokens_async(client, m) for m in markets))
+    return {m.poly_slug: r for m, r in zip(markets, results)}
+
+@timed("universe_fetch")
+async def fetch_universe_async(client, families):
+    """
+    Fetches every current market of `families` and returns a list of
+    (market, poly_data, kalshi_data, err), with poly_data and kalshi_data
+    shaped like the single-market fetchers' results. kalshi_data is None
+    for families Kalshi does not list.
+    """
+    markets = current_markets(families)
+    tokens, _ = await asyncio.gather(resolve_tokens_async(client, markets),
+                                     resolve_tokens_async(client, upcoming_markets(families)))
+
+    token_ids = [t for outcome_tokens, err in tokens.values() if not err for t in outcome_tokens.values()]
+    events = sorted({m.kalshi_event_ticker for m in markets if m.kalshi_event_ticker})
+    opens = sorted({(m.symbol, m.target_time_utc) for m in markets})
+    books, (spot, _), *rest = await gather_results(
+        fetch_clob_books_async(client, token_ids),
+        get_binance_prices_async(client, [m.symbol for m in markets]),
+        *(fetch_kalshi_event_async(client, e) for e in events),
+        *(get_binance_open_async(client, symbol, start) for symbol, start in opens)
+    )
+    kalshi = dict(zip(events, rest[:len(events)]))
+    price_to_beat = dict(zip(opens, (value for value, _ in rest[len(events):])))
+    spot = spot or {}
+    if isinstance(books, tuple):
+        # gather_results turned an unexpected exception into (None, err)
+        books = {}
+
+    now = datetime.datetime.now().isoformat()
+    results = []
+    for market in markets:
+        outcome_tokens, err = tokens[market.poly_slug]
+        poly_data = kalshi_data = None
+        if not err:
+            missing = [t for t in outcome_tokens.values() if t not in books]
+            prices, err = (None, "CLOB Error: no books") if missing else outcome_prices(outcome_tokens, books)
+        if not err:
+            poly_data = {
+                "prices": prices,
+                "slug": market.poly_slug,
+                "target_time_utc": now,
+                "token_ids": outcome_tokens,
+                "price_to_beat": price_to_beat.get((market.symbol, market.target_time_utc))
+            }
+        if market.kalshi_event_ticker and not err:
+            markets_data, err = kalshi[market.kalshi_event_ticker]
+            if not err:
+                kalshi_data = {
+                    "event_ticker": market.kalshi_event_ticker,
+                    "current_price": spot.get(market.symbol),
+                    "markets": markets_data
+                }
+        results.append((market, poly_data, kalshi_data, err))
+    return results
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import metrics
+from scheduler import TokenBucket
+
+try:
+    import h2  # noqa: F401  (httpx only needs it importable for HTTP/2)
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# Configuration
+POOL_MAXSIZE = 10          # Keep-alive connections kept per host
+POOL_HOSTS = 10            # Number of per-host pools kept by the adapter
+KEEPALIVE_EXPIRY = 60.0    # Seconds an idle async connection is kept open
+
+RETRY_TOTAL = 2
+RETRY_BACKOFF = 0.1        # 0.1s, 0.2s, ...
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# (connect, read) timeouts per venue host. Connects should be fast on a warm pool,
+# so a slow connect means the venue is in trouble and we would rather retry.
+DEFAULT_TIMEOUT = (2.0, 5.0)
+VENUE_TIMEOUTS = {
+    "gamma-api.polymarket.com": (2.0, 5.0),
+    "clob.polymarket.com": (1.0, 2.0),
+    "api.elections.kalshi.com": (1.0, 3.0),
+    "api.binance.com": (1.0, 2.0),
+}
+
+# (requests per second, burst) we allow ourselves per venue host, below the
+# venues' published limits. Every loop in the process shares one budget per
+# host; other hosts (e.g. local stand-ins) are not limited.
+VENUE_RATE_LIMITS = {
+    "gamma-api.polymarket.com": (4.0, 10),
+    "clob.polymarket.com": (15.0, 30),
+    "api.elections.kalshi.com": (8.0, 10),
+    "api.binance.com": (10.0, 20),
+}
+_buckets = {}
+
+# httpcore trace steps timed per request. connect_tcp includes the DNS lookup;
+# both only fire when a request has to open a new connection.
+TRACED_STEPS = {
+    "connection.connect_tcp": "tcp_connect",
+    "connection.start_tls": "tls_handshake",
+    "http11.receive_response_headers": "response_headers",
+    "http2.receive_response_headers": "response_headers",
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+def timeout_for(url):
+    return VENUE_TIMEOUTS.get(urlparse(url).hostname, DEFAULT_TIMEOUT)
+
+def bucket_for(url):
+    """
+    The process-wide TokenBucket of a URL's host, or None when the host has no limit.
+    """
+    host = urlparse(url).hostname
+    if host not in _buckets:
+        limit = VENUE_RATE_LIMITS.get(host)
+        _buckets[host] = TokenBucket(*limit) if limit else None
+    return _buckets[host]
+
+def rate_limit_stats():
+    return {host: bucket.stats() for host, bucket in _buckets.items() if bucket}
+
+def take_token(url):
+    bucket = bucket_for(url)
+    if bucket:
+        bucket.take_sync()
+
+def _build_session():
+    retry = Retry(
+        total=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False  # Callers still see the final response and check it themselves
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session():
+    """
+    Returns the process-wide requests.Session. It keeps one keep-alive pool
+    per venue host, so repeated polls skip the TCP+TLS handshake.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def get(url, params=None, timeout=None, stream=False):
+    take_token(url)
+    return get_session().get(url, params=params, timeout=timeout or timeout_for(url), stream=stream)
+
+def post(url, json=None, timeout=None):
+    take_token(url)
+    return get_session().post(url, json=json, timeout=timeout or timeout_for(url))
+
+# --- ASYNC ---
+
+def create_async_client():
+    """
+    Creates a pooled httpx.AsyncClient with keep-alive, HTTP/2 when `h2` is
+    installed (all of our venues negotiate it) and connect-level retries.
+    The caller owns it and should close it with `await client.aclose()`.
+    """
+    connect, read = DEFAULT_TIMEOUT
+    transport = httpx.AsyncHTTPTransport(http2=HTTP2_ENABLED, retries=RETRY_TOTAL)
+    return httpx.AsyncClient(
+        http2=HTTP2_ENABLED,
+        transport=transport,
+        timeout=httpx.Timeout(read, connect=connect),
+        limits=httpx.Limits(
+            max_connections=POOL_HOSTS * POOL_MAXSIZE,
+            max_keepalive_connections=POOL_HOSTS * POOL_MAXSIZE,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        )
+    )
+
+def trace_extensions():
+    """
+    Request extensions whose httpcore trace callback feeds TRACED_STEPS into metrics.
+    """
+    if not metrics.METRICS_ENABLED:
+        return None
+    started = {}
+
+    async def trace(event, info):
+        step, _, phase = event.rpartition(".")
+        stage = TRACED_STEPS.get(step)
+        if stage is None:
+            return
+        if phase == "started":
+            started[step] = time.perf_counter()
+        elif phase == "complete" and step in started:
+            metrics.record(stage, time.perf_counter() - started.pop(step))
+    return {"trace": trace}
+
+async def request_async(client, method, url, params=None, json=None):
+    """
+    Sends a request on the async client, retrying with backoff on
+    429/5xx and transport errors. Returns the final response.
+    """
+    connect, read = timeout_for(url)
+    timeout = httpx.Timeout(read, connect=connect)
+    bucket = bucket_for(url)
+    for attempt in range(RETRY_TOTAL + 1):
+        last_try = attempt == RETRY_TOTAL
+        if bucket:
+            await bucket.take()
+        try:
+            response = await client.request(method, url, params=params, json=json, timeout=timeout,
+                                            extensions=trace_extensions())
+        except httpx.TransportError:
+            if last_try:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or last_try:
+                return response
+        await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+
+async def get_async(client, url, params=None):
+    return await request_async(client, "GET", url, params=params)
+
+async def post_async(client, url, json=None):
+    return await request_async(client, "POST", url, json=json)
@@ -13,26 +13,40 @@ import {
 } from "@/components/ui/table";
 import { Button } from "@/components/ui/button";
 import { RotateCcw, TrendingUp, DollarSign } from "lucide-react";
+import { applyDelta } from "@/lib/utils";
+
+const API_URL = "http://localhost:8000";
+// Fills kept client-side, matching the snapshot the server sends
+const MAX_FILLS = 10;
 
 export default function Dashboard() {
   const [data, setData] = useState<any>(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    const interval = setInterval(() => {
-      fetch("http://localhost:8000/simulation")
-        .then((res) => res.json())
-        .then((data) => {
-          setData(data);
-          setLoading(false);
-        })
-        .catch((err) => console.error(err));
-    }, 1000);
-    return () => clearInterval(interval);
+    // The server pushes a snapshot, then only what changed. EventSource
+    // reconnects on its own and resumes from the last event id.
+    const source = new EventSource(`${API_URL}/stream`);
+    source.addEventListener("snapshot", (event) => {
+      const msg = JSON.parse((event as MessageEvent).data);
+      setData({ ...msg.state, fills: msg.events });
+      setLoading(false);
+    });
+    source.addEventListener("delta", (event) => {
+      const msg = JSON.parse((event as MessageEvent).data);
+      setData((prev: any) =>
+        prev && {
+          ...applyDelta(prev, msg.state),
+          fills: [...prev.fills, ...msg.events].slice(-MAX_FILLS),
+        }
+      );
+    });
+    source.onerror = (err) => console.error(err);
+    return () => source.close();
   }, []);
 
   const handleReset = async () => {
-    await fetch("http://localhost:8000/reset", { method: "POST" });
+    await fetch(`${API_URL}/reset`, { method: "POST" });
   };
 
   if (loading || !data || !data.market) {
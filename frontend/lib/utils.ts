@@ -4,3 +4,16 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
 }
+
+// Merges a streamed delta into the current state: nested objects are merged
+// key by key, everything else (including null for removed keys) replaces.
+export function applyDelta(state: any, delta: any): any {
+  if (!state || typeof state !== "object" || !delta || typeof delta !== "object" || Array.isArray(delta)) {
+    return delta
+  }
+  const merged = { ...state }
+  for (const [key, value] of Object.entries(delta)) {
+    merged[key] = applyDelta(state[key], value)
+  }
+  return merged
+}